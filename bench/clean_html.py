@@ -0,0 +1,130 @@
+# -*- coding: utf-8 -*-
+"""clean_html 단일 패스 vs 기존 다중 정규식 비교
+
+    python -m bench.clean_html [--repeat 20] [--scale 200] [--fuzz 100000]
+
+fixtures/*.html 과 SEAM_CASES 각각에 대해 출력이 같은지 확인하고, fixture 를 scale 배 이어붙인
+큰 문서(멀티 MB 페이지 근사)에서 처리량(MB/s)을 잰다.
+
+--fuzz N: 태그 조각을 무작위로 이은 문서 N 개로 clean_html 출력이 더 지울 것이 없는 상태(고정점)인지
+확인한다. 겹친 태그(<script><style></script>...</style>)는 다중 정규식이 패턴 순서대로 지우므로
+결과가 다를 수 있어서 그 개수는 참고로만 출력한다.
+"""
+import argparse, random, re, sys, time
+from pathlib import Path
+from crawler.utils.html import (
+    COMMENT_PATTERN, LINK_PATTERN, META_PATTERN, STYLE_PATTERN,
+    clean_html, replace_base64_images, replace_svg,
+)
+
+FIXTURES = Path(__file__).parent / "fixtures"
+OPTIONS = [dict(), dict(clean_svg=True), dict(clean_base64=True), dict(clean_svg=True, clean_base64=True)]
+
+# 지운 자리에서 새 태그가 만들어지는 입력 (다중 정규식은 script 를 고정점까지 지웠음)
+SEAM_CASES = {
+    "seam_comment_in_script": '<p>a</p><scr<!-- c -->ipt>alert(1)</script><p>b</p>',
+    "seam_script_in_script": '<scr<script>a</script>ipt>alert(2)</script>',
+    "seam_script_orphan": '<scr<script>a</script>ipt src="x.js">',
+    "seam_nested_twice": '<scr<scr<script></script>ipt></script>ipt>alert(3)</script>',
+    "seam_upper": '<SCR<!---->IPT>alert(4)</SCRIPT>',
+    "seam_meta": '<me<!-- x -->ta name="robots" content="noindex">',
+    "seam_link": '<li<!-- -->nk rel="stylesheet" href="x.css"><p>c</p>',
+}
+_FUZZ_PARTS = ["<", ">", "/", " ", "x", "scr", "ipt", "sty", "le", "script", "style", "link", "meta", "svg", "img",
+               "<!--", "-->", "<script>", "</script>", "<style>", "</style>", "<svg>", "</svg>",
+               ' src="data:image/png;base64,AAA"', "property='article:published_time'"]
+
+_FLAGS = re.IGNORECASE | re.MULTILINE | re.DOTALL
+_PUBLISHED_TIME_RE = re.compile(r'property=["\']article:published_time["\']', re.IGNORECASE)
+# <script>...</script> 쌍 먼저 제거
+_SCRIPT_PAIR_RE = re.compile(r'(?is)<script\b[^>]*?>.*?</script\s*>')
+# 남은 고아(open-only)/self-closing <script ...> 제거
+_SCRIPT_ORPHAN_RE = re.compile(r'(?is)<script\b[^>]*?/?>')
+
+def _strip_scripts(html: str) -> str:
+    """스크립트 블록을 쌍 → 고아 순서로 반복 제거"""
+    prev = None
+    while prev != html:
+        prev = html
+        html = _SCRIPT_PAIR_RE.sub('', html)
+    html = _SCRIPT_ORPHAN_RE.sub('', html)
+    return html
+
+def _filter_meta(match):
+    tag = match.group(0)
+    return tag if _PUBLISHED_TIME_RE.search(tag) else ''
+
+def clean_html_multipass(html: str, clean_svg: bool = False, clean_base64: bool = False):
+    """단일 패스 이전의 다중 정규식 구현 (동일성·속도 비교 기준)"""
+    html = re.sub(STYLE_PATTERN, '', html, flags=_FLAGS)
+    html = re.sub(COMMENT_PATTERN, '', html, flags=_FLAGS)
+    html = re.sub(LINK_PATTERN, '', html, flags=_FLAGS)
+    html = _strip_scripts(html)
+    html = re.sub(META_PATTERN, _filter_meta, html, flags=re.IGNORECASE)
+    if clean_svg:
+        html = replace_svg(html)
+    if clean_base64:
+        html = replace_base64_images(html)
+    return html
+
+def load_fixtures():
+    return {p.name: p.read_text(encoding="utf-8") for p in sorted(FIXTURES.glob("*.html"))}
+
+def check_equivalence(docs) -> int:
+    bad = 0
+    for name, html in docs.items():
+        for opt in OPTIONS:
+            if clean_html(html, **opt) != clean_html_multipass(html, **opt):
+                print(f"[DIFF] {name} {opt}")
+                bad += 1
+    return bad
+
+def fuzz(n: int, seed: int = 0) -> int:
+    rnd = random.Random(seed)
+    not_fixed = differs = 0
+    for _ in range(n):
+        doc = "".join(rnd.choice(_FUZZ_PARTS) for _ in range(rnd.randrange(1, 16)))
+        for opt in OPTIONS:
+            out = clean_html(doc, **opt)
+            if clean_html(out, **opt) != out:
+                if not_fixed < 10:
+                    print(f"[NOT-FIXED] {opt} {doc!r} → {out!r}")
+                not_fixed += 1
+            differs += out != clean_html_multipass(doc, **opt)
+    print(f"[INFO] fuzz: {n} docs x {len(OPTIONS)} options, not fixed point {not_fixed}, "
+          f"differs from multipass {differs} (overlapping tags)")
+    return not_fixed
+
+def best_of(fn, html, repeat) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn(html)
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--repeat", type=int, default=20)
+    ap.add_argument("--scale", type=int, default=200)
+    ap.add_argument("--fuzz", type=int, default=0, help="무작위 문서 수 (0 = 생략)")
+    args = ap.parse_args()
+
+    docs = load_fixtures()
+    cases = {**docs, **SEAM_CASES}
+    bad = check_equivalence(cases)
+    print(f"[INFO] equivalence: {len(cases) * len(OPTIONS) - bad}/{len(cases) * len(OPTIONS)} identical")
+    if args.fuzz:
+        bad += fuzz(args.fuzz)
+
+    print(f"{'fixture':<20} {'MB':>6} {'multipass MB/s':>15} {'single MB/s':>12} {'speedup':>8}")
+    for name, html in docs.items():
+        big = html * args.scale
+        mb = len(big.encode("utf-8")) / 1e6
+        t_old = best_of(clean_html_multipass, big, args.repeat)
+        t_new = best_of(clean_html, big, args.repeat)
+        print(f"{name:<20} {mb:6.2f} {mb / t_old:15.1f} {mb / t_new:12.1f} {t_old / t_new:7.2f}x")
+    return 1 if bad else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
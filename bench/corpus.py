@@ -0,0 +1,174 @@
+# -*- coding: utf-8 -*-
+"""오프라인 벤치마크용 HTML 코퍼스 (실제 페이지 모양을 본뜬 합성 문서)
+
+    python -m bench.corpus [--out DIR]
+
+문서는 고정 seed 로 생성되므로 같은 CORPUS_VERSION 이면 항상 같은 바이트다. 생성기를 바꿔서
+출력이 달라지면 CORPUS_VERSION 을 올리고 골든(bench/golden/suite.json)을 다시 만든다.
+fixtures/*.html (손으로 만든 작은 문서) 도 같이 포함하고, --out 을 주면 파일로 저장해서 볼 수 있다.
+"""
+import argparse, base64, random, sys
+from pathlib import Path
+from typing import Callable, Dict, List
+from .clean_html import load_fixtures
+
+CORPUS_VERSION = "1"
+
+_KO = "가나다라마바사아자차카타파하고노도로모보소오조초코토포호구누두루무부수우주추쿠투푸후기니디리미비시이지치키티피히한국서울경제정부시장기업발표관계자설명"
+_EN = ("the of and to in is for on with as by at from that this data system page user report market "
+       "price service update network result value policy growth").split()
+
+def _ko_words(rng: random.Random, n: int) -> str:
+    return " ".join("".join(rng.choice(_KO) for _ in range(rng.randint(2, 5))) for _ in range(n))
+
+def _en_words(rng: random.Random, n: int) -> str:
+    return " ".join(rng.choice(_EN) for _ in range(n))
+
+def _page(title: str, body: str, head: str = "") -> str:
+    return (f"<!doctype html><html lang=\"ko\"><head><meta charset=\"utf-8\"><title>{title}</title>{head}</head>"
+            f"<body>{body}</body></html>")
+
+def _nav(rng: random.Random, n: int) -> str:
+    items = "".join(f"<li><a href=\"/section/{i}\">{_ko_words(rng, 1)}</a></li>" for i in range(n))
+    return f"<header><nav class=\"gnb\"><ul>{items}</ul></nav></header>"
+
+def huge_table(rng: random.Random) -> str:
+    head = "".join(f"<th>{_ko_words(rng, 1)}</th>" for _ in range(8))
+    rows = []
+    for i in range(2500):
+        cells = [f"<td>{i}</td>", f"<td><a href=\"/item/{i}\">{_ko_words(rng, 2)}</a></td>"]
+        cells += [f"<td>{rng.randint(0, 10**6):,}</td>" for _ in range(4)]
+        cells.append(f"<td>{rng.uniform(-10, 10):.2f}%</td>")
+        cells.append(f"<td colspan=\"1\"><span class=\"tag\">{_en_words(rng, 2)}</span></td>")
+        rows.append("<tr>" + "".join(cells) + "</tr>")
+    body = (_nav(rng, 30) + "<main><h1>시세표</h1><table class=\"data\"><thead><tr>" + head + "</tr></thead><tbody>"
+            + "".join(rows) + "</tbody></table></main>")
+    return _page("huge table", body)
+
+def nested_lists(rng: random.Random) -> str:
+    budget = [4000]
+
+    def lst(depth: int) -> str:
+        tag = "ol" if depth % 2 else "ul"
+        out = []
+        for _ in range(rng.randint(2, 5)):
+            if budget[0] <= 0:
+                break
+            budget[0] -= 1
+            text = f"<a href=\"/n/{budget[0]}\">{_en_words(rng, 3)}</a> <strong>{_ko_words(rng, 2)}</strong> <code>x{depth}</code>"
+            child = lst(depth + 1) if depth < 8 and rng.random() < 0.6 else ""
+            out.append(f"<li>{text}{child}</li>")
+        return f"<{tag}>{''.join(out)}</{tag}>"
+
+    sections = []
+    while budget[0] > 0:
+        sections.append(f"<h2>{_en_words(rng, 4)}</h2>" + lst(0))
+    return _page("nested lists", "<main>" + "".join(sections) + "</main>")
+
+def base64_images(rng: random.Random) -> str:
+    parts = []
+    for i in range(40):
+        blob = base64.b64encode(bytes(rng.getrandbits(8) for _ in range(24_000))).decode("ascii")
+        parts.append(f"<p>{_ko_words(rng, 60)}</p><figure><img alt=\"그림 {i}\" src=\"data:image/png;base64,{blob}\">"
+                     f"<figcaption>{_ko_words(rng, 5)}</figcaption></figure>")
+    return _page("base64 images", _nav(rng, 20) + "<article><h1>사진 기사</h1>" + "".join(parts) + "</article>")
+
+def heavy_svg(rng: random.Random) -> str:
+    def path() -> str:
+        return "M" + " ".join(f"{rng.uniform(0, 24):.3f},{rng.uniform(0, 24):.3f}" for _ in range(60)) + "Z"
+    sprite = "<svg style=\"display:none\">" + "".join(
+        f"<symbol id=\"i{i}\" viewBox=\"0 0 24 24\"><path d=\"{path()}\"/></symbol>" for i in range(150)) + "</svg>"
+    items = []
+    for i in range(400):
+        icon = (f"<svg width=\"24\" height=\"24\" viewBox=\"0 0 24 24\"><g fill=\"none\" stroke=\"currentColor\">"
+                f"<path d=\"{path()}\"/><path d=\"{path()}\"/></g></svg>")
+        items.append(f"<li><a href=\"/menu/{i}\">{icon}<span>{_ko_words(rng, 2)}</span></a></li>")
+    body = sprite + "<nav><ul>" + "".join(items) + "</ul></nav><main><h1>아이콘 메뉴</h1><p>" + _ko_words(rng, 200) + "</p></main>"
+    return _page("heavy svg", body)
+
+def script_spa(rng: random.Random) -> str:
+    def js(n: int) -> str:
+        return ";".join(f"var {rng.choice('abcdefgh')}{i}=function(e,t){{return e[\"{_en_words(rng, 1)}\"]+t*{i}}}"
+                        for i in range(n))
+    scripts = "".join(f"<script>{js(900)}</script>" for _ in range(8))
+    state = "{" + ",".join(f"\"k{i}\":{{\"title\":\"{_ko_words(rng, 4)}\",\"n\":{i}}}" for i in range(6000)) + "}"
+    body = (f"<div id=\"__next\"><div class=\"app\"><header>{_nav(rng, 15)}</header><main><h1>{_ko_words(rng, 3)}</h1>"
+            + "".join(f"<p>{_ko_words(rng, 40)}</p>" for _ in range(10)) + "</main></div></div>"
+            f"<script id=\"__NEXT_DATA__\" type=\"application/json\">{state}</script>" + scripts
+            + "<noscript>자바스크립트를 켜 주세요</noscript>")
+    return _page("spa", body, head="<style>" + ".c{color:red}" * 3000 + "</style>")
+
+def news_ko(rng: random.Random) -> str:
+    paras = "".join(f"<p>{_ko_words(rng, rng.randint(30, 90))}</p>" for _ in range(60))
+    related = "".join(f"<li><a href=\"/news/{i}\"><img src=\"/thumb/{i}.jpg\" alt=\"\">{_ko_words(rng, 6)}</a></li>" for i in range(60))
+    comments = "".join(f"<div class=\"comment\"><b>user{i}</b><p>{_ko_words(rng, 15)}</p></div>" for i in range(120))
+    ads = "".join(f"<div class=\"ad\"><iframe src=\"https://ads.example.com/{i}\"></iframe></div>" for i in range(12))
+    body = (_nav(rng, 120) + ads + f"<article><h1>{_ko_words(rng, 8)}</h1><div class=\"byline\">기자 {_ko_words(rng, 1)}</div>"
+            + paras + "</article><aside><h2>관련 기사</h2><ul>" + related + "</ul></aside><section class=\"comments\">"
+            + comments + "</section><footer>" + _ko_words(rng, 80) + "</footer>")
+    return _page("news ko", body)
+
+def legacy_layout(rng: random.Random) -> str:
+    def table(depth: int) -> str:
+        if depth == 0:
+            return f"<font face=\"굴림\" size=\"2\">{_ko_words(rng, 20)}</font><br><br>"
+        cells = "".join(f"<td valign=\"top\">{table(depth - 1)}</td>" for _ in range(2))
+        return f"<table border=\"0\" cellpadding=\"0\" cellspacing=\"0\"><tr>{cells}</tr></table>"
+    return _page("legacy", "<center>" + "".join(table(6) for _ in range(4)) + "</center>")
+
+def docs_code(rng: random.Random) -> str:
+    parts = []
+    for i in range(80):
+        code = "\n".join(f"    {_en_words(rng, 1)}_{j} = compute({_en_words(rng, 1)!r}, {j}) &lt;&lt; 2" for j in range(15))
+        parts.append(f"<h2 id=\"s{i}\">{_en_words(rng, 4)}</h2><p>{_en_words(rng, 50)} <code>{_en_words(rng, 1)}()</code></p>"
+                     f"<pre><code class=\"language-python\">{code}</code></pre>"
+                     f"<table><tr><th>param</th><th>type</th></tr><tr><td>{_en_words(rng, 1)}</td><td>int</td></tr></table>")
+    toc = "".join(f"<li><a href=\"#s{i}\">section {i}</a></li>" for i in range(80))
+    return _page("docs", f"<aside><ul>{toc}</ul></aside><main>" + "".join(parts) + "</main>")
+
+GENERATORS: Dict[str, Callable[[random.Random], str]] = {
+    "huge_table": huge_table,
+    "nested_lists": nested_lists,
+    "base64_images": base64_images,
+    "heavy_svg": heavy_svg,
+    "script_spa": script_spa,
+    "news_ko": news_ko,
+    "legacy_layout": legacy_layout,
+    "docs_code": docs_code,
+}
+
+def generate(names: List[str] = None) -> Dict[str, str]:
+    """{문서 이름: HTML}. 이름별로 seed 를 고정해서 하나만 골라도 같은 문서가 나옴"""
+    out = {}
+    for name, gen in GENERATORS.items():
+        if names and name not in names:
+            continue
+        out[f"gen/{name}.html"] = gen(random.Random(f"{CORPUS_VERSION}:{name}"))
+    return out
+
+def load_corpus(extra_dir: Path = None, names: List[str] = None) -> Dict[str, str]:
+    """fixtures + 생성 문서 (+ extra_dir 의 저장된 실제 페이지 *.html)"""
+    docs = {f"fixtures/{k}": v for k, v in load_fixtures().items()}
+    docs.update(generate(names))
+    if extra_dir:
+        for p in sorted(Path(extra_dir).glob("*.html")):
+            docs[f"extra/{p.name}"] = p.read_text(encoding="utf-8", errors="replace")
+    if names:
+        docs = {k: v for k, v in docs.items() if Path(k).stem in names}
+    return docs
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--out", type=str, default=None, help="생성 문서를 저장할 디렉터리")
+    args = ap.parse_args()
+    docs = generate()
+    for name, html in docs.items():
+        print(f"{name:<28} {len(html.encode('utf-8')) / 1024:9.1f} KB")
+        if args.out:
+            p = Path(args.out) / Path(name).name
+            p.parent.mkdir(parents=True, exist_ok=True)
+            p.write_text(html, encoding="utf-8")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+"""HTTP fast path 판정 확인용 로컬 서버 + 실행 스크립트
+
+    python -m bench.fastpath [--repeat 20] [--browser]
+
+127.0.0.1 에 정적 페이지/SPA/noscript/PDF/403 페이지를 띄우고 HttpFastPath 가 각 URL 을
+HTTP 로 끝내는지(route=http) 브라우저로 넘기는지(browser:<사유>) 기대값과 비교한다.
+--browser 를 주면 넘겨진 URL 을 실제 Chromium(CapturePipeline)으로 캡처해서 두 경로를 모두 돈다.
+"""
+import argparse, asyncio, sys, tempfile, threading, time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from playwright.async_api import async_playwright
+from crawler.config import Settings
+from crawler.pipeline.fastpath import HttpFastPath
+from .clean_html import load_fixtures
+
+_SPA = """<!doctype html><html><head><title>spa</title></head><body>
+<div id="root"></div>
+<script>document.getElementById('root').innerHTML = '<main><h1>Rendered</h1><p>' + 'client text '.repeat(80) + '</p></main>';</script>
+</body></html>"""
+
+_NOSCRIPT = """<!doctype html><html><body><main><h1>Shop</h1><p>{}</p></main>
+<noscript>이 사이트를 이용하려면 자바스크립트를 활성화해 주세요.</noscript></body></html>""".format("상품 설명 " * 60)
+
+_THIN = "<!doctype html><html><body><p>Loading…</p><script src='/app.js'></script></body></html>"
+
+# path → (status, content-type, body, 기대 route)
+def _pages():
+    fx = load_fixtures()
+    return {
+        "/article": (200, "text/html; charset=utf-8", fx["docs_page.html"], "http"),
+        "/news": (200, "text/html; charset=utf-8", fx["news_ko.html"], "http"),
+        "/spa": (200, "text/html; charset=utf-8", _SPA, "browser:spa_root"),
+        "/thin": (200, "text/html; charset=utf-8", _THIN, "browser:thin_text"),
+        "/noscript": (200, "text/html; charset=utf-8", _NOSCRIPT, "browser:noscript_warning"),
+        "/file": (200, "application/pdf", "%PDF-1.4\n", "browser:content_type:application/pdf"),
+        "/blocked": (403, "text/html", "<html><body>Forbidden</body></html>", "browser:http_403"),
+    }
+
+def start_server(pages):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # keep-alive
+        wbufsize = 1 << 16   # 헤더와 본문을 한 번에 보냄 (Nagle + delayed ACK 지연 방지)
+        def do_GET(self):
+            status, ctype, body, _ = pages.get(self.path, (404, "text/plain", "not found", None))
+            data = body.encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", ctype)
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+        def log_message(self, *a):
+            pass
+    srv = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=srv.serve_forever, daemon=True).start()
+    return srv
+
+async def run(args) -> int:
+    pages = _pages()
+    srv = start_server(pages)
+    base = f"http://127.0.0.1:{srv.server_address[1]}"
+    tmp = Path(tempfile.mkdtemp())
+    settings = Settings(urls_path=tmp / "urls.txt", out_ok_html=tmp / "h.jsonl", out_ok_md=tmp / "m.jsonl",
+                        out_err=tmp / "e.jsonl", headful=False, nav_learning=False,
+                        fast_path=True, fast_path_learn_after=10**9)
+    bad = 0
+    async with async_playwright() as pw:
+        request = await pw.request.new_context()
+        fast = HttpFastPath(request, settings)
+        escalated = []
+        print(f"{'path':<10} {'route':<40} {'ms':>7}  expect")
+        for path, (_, _, _, expect) in pages.items():
+            best = float("inf")
+            for _ in range(args.repeat):
+                t0 = time.perf_counter()
+                reason, html, timings, status, err = await fast.fetch(base + path)
+                best = min(best, time.perf_counter() - t0)
+            route = "http" if reason is None else f"browser:{reason}"
+            ok = route == expect
+            bad += not ok
+            if reason is not None:
+                escalated.append(path)
+            print(f"{path:<10} {route:<40} {best * 1000:7.2f}  {'ok' if ok else 'MISMATCH (' + expect + ')'}")
+        await request.dispose()
+
+        if args.browser:
+            from crawler.pipeline.capture import CapturePipeline
+            browser = await pw.chromium.launch(headless=True)
+            context = await browser.new_context()
+            cap = CapturePipeline(settings)
+            page = await context.new_page()
+            print("\nbrowser tier:")
+            for path in escalated:
+                t0 = time.perf_counter()
+                html, timings, status, err = await cap.goto_and_capture(page, base + path, retries=0)
+                print(f"{path:<10} status={status} err={err} html={len(html or '')} "
+                      f"{(time.perf_counter() - t0) * 1000:.0f}ms")
+            await browser.close()
+    srv.shutdown()
+    return 1 if bad else 0
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--repeat", type=int, default=20)
+    ap.add_argument("--browser", action="store_true", help="넘겨진 URL 을 Chromium 으로 캡처 (playwright install 필요)")
+    return asyncio.run(run(ap.parse_args()))
+
+if __name__ == "__main__":
+    sys.exit(main())
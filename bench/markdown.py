@@ -0,0 +1,46 @@
+# -*- coding: utf-8 -*-
+"""html_to_markdown_with_prep 골든 출력 확인 + 처리 시간
+
+    python -m bench.markdown [--repeat 5] [--update-golden]
+
+fixtures/*.html → clean_html → html_to_markdown_with_prep 결과를 golden/*.md 와 비교한다.
+"""
+import argparse, sys, time
+from pathlib import Path
+from crawler.utils.html import clean_html, html_to_markdown_with_prep
+from .clean_html import load_fixtures
+
+GOLDEN = Path(__file__).parent / "golden"
+BASE_URL = "https://example.com/dir/page.html"
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--update-golden", action="store_true")
+    args = ap.parse_args()
+
+    bad = 0
+    print(f"{'fixture':<20} {'KB':>7} {'ms':>8}  golden")
+    for name, html in load_fixtures().items():
+        clean = clean_html(html)
+        best = float("inf")
+        for _ in range(args.repeat):
+            t0 = time.perf_counter()
+            md = html_to_markdown_with_prep(clean, BASE_URL)
+            best = min(best, time.perf_counter() - t0)
+        golden = GOLDEN / (Path(name).stem + ".md")
+        if args.update_golden:
+            golden.write_text(md, encoding="utf-8")
+            status = "updated"
+        elif not golden.exists():
+            status = "missing"
+        elif golden.read_text(encoding="utf-8") == md:
+            status = "ok"
+        else:
+            status = "DIFF"
+            bad += 1
+        print(f"{name:<20} {len(clean) / 1024:7.1f} {best * 1000:8.2f}  {status}")
+    return 1 if bad else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,172 @@
+# -*- coding: utf-8 -*-
+"""route handler 차단 규칙 처리량 측정
+
+    python -m bench.router [--domains 50000] [--patterns 5000] [--urls 20000] [--rules easylist.txt] [--browser]
+
+합성 규칙(또는 --rules 로 준 실제 EasyList/hosts 파일)과 URL 목록으로
+- 기존 방식(`any(b in url for b in 규칙)`)과 컴파일된 Blocklist.match 의 초당 판정 수
+- setup_speed_routes 가 등록한 handler 를 가짜 route/request 로 호출한 초당 요청 수
+를 출력한다. 두 방식의 판정이 도메인 규칙에서 다르면 MISMATCH 로 실패.
+--browser 를 주면 로컬 페이지(서브리소스 다수)를 Chromium 으로 열어 CDP 차단 유무에 따른 로딩 시간을 비교한다.
+"""
+import argparse, asyncio, random, string, sys, threading, time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from crawler.browser.blocklist import Blocklist
+from crawler.browser.routing import setup_speed_routes, setup_browser_blocking
+from crawler.constants import BLOCK_DOMAINS
+
+_TLDS = ("com", "net", "org", "io", "co.kr", "de")
+
+def _word(rng: random.Random, lo=4, hi=10) -> str:
+    return "".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(lo, hi)))
+
+def make_rules(n_domains: int, n_patterns: int, seed: int = 1):
+    rng = random.Random(seed)
+    domains = [f"{_word(rng)}.{rng.choice(_TLDS)}" for _ in range(n_domains)]
+    patterns = [f"/{_word(rng)}/{_word(rng)}*" for _ in range(n_patterns)]
+    return domains, patterns
+
+def make_urls(n: int, domains, patterns, seed: int = 2):
+    rng = random.Random(seed)
+    urls = []
+    for _ in range(n):
+        r = rng.random()
+        if r < 0.2 and domains:
+            host = f"cdn{rng.randint(1, 9)}.{rng.choice(domains)}"       # 차단 도메인의 서브도메인
+        else:
+            host = f"www.{_word(rng)}.{rng.choice(_TLDS)}"
+        path = "/".join(_word(rng, 3, 8) for _ in range(rng.randint(1, 4)))
+        if 0.2 <= r < 0.25 and patterns:
+            path = rng.choice(patterns).strip("/*") + "x/" + path        # 경로 패턴 적중
+        urls.append(f"https://{host}/{path}.js?v={rng.randint(0, 10**6)}")
+    return urls
+
+def _rate(fn, items, min_s: float = 0.5):
+    n, t0 = 0, time.perf_counter()
+    while True:
+        for x in items:
+            fn(x)
+        n += len(items)
+        dt = time.perf_counter() - t0
+        if dt >= min_s:
+            return n / dt
+
+class _FakeRequest:
+    __slots__ = ("url", "resource_type", "method", "headers")
+    def __init__(self, url):
+        self.url, self.resource_type, self.method, self.headers = url, "script", "GET", {}
+
+class _FakeRoute:
+    async def abort(self): pass
+    async def continue_(self): pass
+
+class _FakeContext:
+    async def route(self, pattern, handler):
+        self.handler = handler
+
+async def _handler_rate(blocklist: Blocklist, urls, min_s: float = 0.5) -> float:
+    ctx = _FakeContext()
+    await setup_speed_routes(ctx, blocklist)
+    reqs = [_FakeRequest(u) for u in urls]
+    route = _FakeRoute()
+    n, t0 = 0, time.perf_counter()
+    while time.perf_counter() - t0 < min_s:
+        for r in reqs:
+            await ctx.handler(route, r)
+        n += len(reqs)
+    return n / (time.perf_counter() - t0)
+
+def _page(n_assets: int, blocked_hosts):
+    tags = []
+    for i in range(n_assets):
+        if i % 2 and blocked_hosts:
+            # 차단 도메인은 존재하지 않는 주소라 차단되지 않으면 DNS 실패까지 기다림
+            tags.append(f"<script async src='http://{blocked_hosts[i % len(blocked_hosts)]}/t{i}.js'></script>")
+        else:
+            tags.append(f"<script src='/a{i}.js'></script>")
+    return "<!doctype html><html><body><main>bench</main>" + "".join(tags) + "</body></html>"
+
+async def _browser_bench(blocklist: Blocklist, n_assets: int, repeat: int):
+    from playwright.async_api import async_playwright
+    hosts = [f"ads{i}.{d}" for i, d in enumerate(sorted(blocklist.domains)[:50])]
+    html = _page(n_assets, hosts).encode()
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        wbufsize = 1 << 16
+        def do_GET(self):
+            body, ctype = (html, "text/html") if self.path == "/" else (b"void 0;", "application/javascript")
+            self.send_response(200)
+            self.send_header("Content-Type", ctype)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        def log_message(self, *a):
+            pass
+    srv = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=srv.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{srv.server_address[1]}/"
+    async with async_playwright() as pw:
+        browser = await pw.chromium.launch(headless=True)
+        for label, pushdown in (("route only", False), ("route + CDP", True)):
+            context = await browser.new_context()
+            await setup_speed_routes(context, blocklist)
+            if pushdown:
+                await setup_browser_blocking(context, blocklist.browser_patterns(20_000))
+            page = await context.new_page()
+            await asyncio.sleep(0.1)
+            best = float("inf")
+            for _ in range(repeat):
+                t0 = time.perf_counter()
+                await page.goto(base, wait_until="load")
+                best = min(best, time.perf_counter() - t0)
+            print(f"{label:<14} load={best * 1000:8.1f}ms  ({n_assets} scripts, half blocked)")
+            await context.close()
+        await browser.close()
+    srv.shutdown()
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--domains", type=int, default=50_000)
+    ap.add_argument("--patterns", type=int, default=5_000)
+    ap.add_argument("--urls", type=int, default=20_000)
+    ap.add_argument("--rules", action="append", default=None, help="실제 규칙 파일 (EasyList/hosts)")
+    ap.add_argument("--linear-max", type=int, default=5_000, help="기존 방식은 이 규칙 수까지만 측정 (느림)")
+    ap.add_argument("--browser", action="store_true", help="Chromium 으로 CDP 차단 효과 측정 (playwright install 필요)")
+    ap.add_argument("--assets", type=int, default=60)
+    ap.add_argument("--repeat", type=int, default=3)
+    args = ap.parse_args()
+
+    if args.rules:
+        t0 = time.perf_counter()
+        bl = Blocklist.from_sources(BLOCK_DOMAINS, args.rules)
+        domains, patterns = sorted(bl.domains), []
+        print(f"loaded {len(bl)} rules ({bl.skipped} skipped) in {(time.perf_counter() - t0) * 1000:.0f}ms")
+    else:
+        domains, patterns = make_rules(args.domains, args.patterns)
+        t0 = time.perf_counter()
+        bl = Blocklist.from_sources(domains)
+        bl.add_lines(patterns)
+        print(f"compiled {len(bl)} rules in {(time.perf_counter() - t0) * 1000:.0f}ms")
+    urls = make_urls(args.urls, domains, patterns)
+
+    bad = 0
+    linear_rules = domains[:args.linear_max]
+    linear = lambda u: any(b in u for b in linear_rules)
+    small = Blocklist.from_sources(linear_rules)
+    for u in urls[:2000]:
+        # 도메인 규칙만 비교 (기존 방식은 경로/쿼리의 부분 문자열도 잡으므로 host 로 제한)
+        if small.match(u) != linear(u.split("/")[2]):
+            bad += 1
+    blocked = sum(bl.match(u) for u in urls)
+    print(f"{'matcher':<28} {'rules':>7} {'urls/s':>12}")
+    print(f"{'any(b in url) (legacy)':<28} {len(linear_rules):>7} {_rate(linear, urls):>12,.0f}")
+    print(f"{'Blocklist.match':<28} {len(bl):>7} {_rate(bl.match, urls):>12,.0f}")
+    print(f"{'route handler (fake route)':<28} {len(bl):>7} {asyncio.run(_handler_rate(bl, urls)):>12,.0f}")
+    print(f"blocked {blocked}/{len(urls)}  legacy agreement: {'ok' if not bad else f'MISMATCH ({bad})'}")
+
+    if args.browser:
+        asyncio.run(_browser_bench(bl, args.assets, args.repeat))
+    return 1 if bad else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
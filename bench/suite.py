@@ -0,0 +1,193 @@
+# -*- coding: utf-8 -*-
+"""오프라인 변환 벤치마크 (네트워크 없음): clean_html / markdown / 전체 변환 단계별 처리량과 지연
+
+    python -m bench.suite [--repeat 3] [--only huge_table,news_ko] [--corpus-dir saved_pages/]
+    python -m bench.suite --save-baseline bench_baseline.json
+    python -m bench.suite --compare bench_baseline.json [--max-regression 0.10]
+    python -m bench.suite --update-golden
+
+코퍼스는 bench.corpus (fixtures + 생성 문서 + --corpus-dir 의 저장된 페이지). 단계마다 새 프로세스에서
+재서 단계별 최대 RSS 를 따로 보고, 결과가 골든(bench/golden/suite.json 의 sha256)과 다르면 실패한다.
+속도만 바뀌고 Markdown 은 그대로인지 확인하는 용도. --compare 는 처리량이 max-regression 보다
+떨어진 단계가 있으면 실패(exit 1).
+"""
+import argparse, hashlib, json, os, platform, sys, time
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing as mp
+from pathlib import Path
+from typing import Dict, List, Optional
+
+try:
+    import resource
+except ImportError:  # Windows: RSS 는 보고하지 않음
+    resource = None
+
+from .corpus import CORPUS_VERSION, load_corpus
+
+GOLDEN = Path(__file__).parent / "golden" / "suite.json"
+BASE_URL = "https://example.com/dir/page.html"
+STAGES = ("clean_html", "markdown", "convert")
+
+def _sha(text: Optional[str]) -> str:
+    return hashlib.sha256((text or "").encode("utf-8")).hexdigest()[:16]
+
+def _rss_mb() -> Optional[float]:
+    if resource is None:
+        return None
+    kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return kb / (1 << 20) if sys.platform == "darwin" else kb / 1024  # macOS 는 바이트 단위
+
+def _percentile(values: List[float], q: float) -> float:
+    s = sorted(values)
+    return s[min(len(s) - 1, int(round(q * (len(s) - 1))))] if s else 0.0
+
+def _run_stage(stage: str, repeat: int, corpus_dir: Optional[str], only: List[str]) -> dict:
+    """자식 프로세스에서 실행: 한 단계만 반복해서 잰다 (RSS 는 이 단계에서 늘어난 만큼만)"""
+    from crawler.pipeline.convert import convert_html
+    from crawler.utils.html import clean_html, html_to_markdown_with_prep
+    docs = load_corpus(Path(corpus_dir) if corpus_dir else None, only)
+    inputs = {name: clean_html(html) if stage == "markdown" else html for name, html in docs.items()}
+    fn = {
+        "clean_html": lambda h: clean_html(h),
+        "markdown": lambda h: html_to_markdown_with_prep(h, BASE_URL),
+        "convert": lambda h: convert_html(h, BASE_URL),
+    }[stage]
+    fn(next(iter(inputs.values())))  # import/정규식 컴파일 등 첫 호출 비용은 빼고
+    rss_before = _rss_mb()
+    lat, per_doc, total = [], {}, 0.0
+    for _ in range(repeat):
+        for name, html in inputs.items():
+            t0 = time.perf_counter()
+            fn(html)
+            dt = time.perf_counter() - t0
+            lat.append(dt * 1000)
+            per_doc[name] = min(per_doc.get(name, float("inf")), dt * 1000)
+            total += dt
+    nbytes = sum(len(h.encode("utf-8")) for h in inputs.values()) * repeat
+    rss_after = _rss_mb()
+    return {
+        "mb_s": nbytes / 1e6 / total if total else 0.0,
+        "pages_s": len(lat) / total if total else 0.0,
+        "p50_ms": _percentile(lat, 0.50),
+        "p99_ms": _percentile(lat, 0.99),
+        "peak_rss_mb": rss_after,
+        "rss_growth_mb": (rss_after - rss_before) if rss_after is not None else None,
+        "docs_ms": per_doc,
+    }
+
+def measure(repeat: int, corpus_dir: Optional[str], only: List[str]) -> Dict[str, dict]:
+    ctx = mp.get_context("spawn")
+    out = {}
+    for stage in STAGES:
+        with ProcessPoolExecutor(max_workers=1, mp_context=ctx) as ex:
+            out[stage] = ex.submit(_run_stage, stage, repeat, corpus_dir, only).result()
+    return out
+
+def check_golden(docs: Dict[str, str], update: bool, dump_dir: Optional[Path]) -> int:
+    """문서별 (html, clean, markdown) sha256 를 골든과 비교. 생성 문서 자체가 바뀐 경우는 따로 표시"""
+    from crawler.utils.html import clean_html, html_to_markdown_with_prep
+    golden = json.loads(GOLDEN.read_text(encoding="utf-8")) if GOLDEN.exists() else {}
+    if golden.get("corpus_version") not in (None, CORPUS_VERSION) and not update:
+        print(f"[WARN] golden 은 corpus v{golden.get('corpus_version')} 기준, 현재 v{CORPUS_VERSION} → --update-golden")
+    entries = golden.get("docs", {})
+    bad = 0
+    for name, html in docs.items():
+        clean = clean_html(html)
+        md = html_to_markdown_with_prep(clean, BASE_URL)
+        cur = {"html": _sha(html), "clean": _sha(clean), "markdown": _sha(md)}
+        if update:
+            entries[name] = cur
+            continue
+        want = entries.get(name)
+        if want is None:
+            status = "missing"
+        elif want["html"] != cur["html"]:
+            status = "INPUT CHANGED"  # 생성기/저장 페이지가 바뀜: CORPUS_VERSION 을 올리고 골든 갱신
+            bad += 1
+        elif want != cur:
+            status = "DIFF " + ",".join(k for k in ("clean", "markdown") if want[k] != cur[k])
+            bad += 1
+            if dump_dir:
+                p = dump_dir / (Path(name).stem + ".md")
+                p.parent.mkdir(parents=True, exist_ok=True)
+                p.write_text(md, encoding="utf-8")
+        else:
+            continue
+        print(f"[GOLDEN] {name}: {status}")
+    if update:
+        GOLDEN.write_text(json.dumps({"corpus_version": CORPUS_VERSION, "docs": entries}, indent=1, sort_keys=True) + "\n",
+                          encoding="utf-8")
+        print(f"[INFO] golden updated: {GOLDEN} ({len(entries)} docs)")
+    else:
+        print(f"[INFO] golden: {len(docs) - bad}/{len(docs)} ok")
+    return bad
+
+def _fmt(v, spec: str) -> str:
+    return "n/a" if v is None else format(v, spec)
+
+def print_table(results: Dict[str, dict], base: Optional[Dict[str, dict]] = None):
+    print(f"{'stage':<11} {'MB/s':>8} {'pages/s':>9} {'p50 ms':>8} {'p99 ms':>9} {'peak RSS':>9} {'+RSS':>7}" + ("  vs baseline" if base else ""))
+    for stage, r in results.items():
+        line = (f"{stage:<11} {r['mb_s']:8.2f} {r['pages_s']:9.1f} {r['p50_ms']:8.2f} {r['p99_ms']:9.2f} "
+                f"{_fmt(r['peak_rss_mb'], '8.0f')}M {_fmt(r['rss_growth_mb'], '6.0f')}M")
+        b = (base or {}).get(stage)
+        if b:
+            line += f"  MB/s {r['mb_s'] / b['mb_s'] - 1:+.1%}  p99 {r['p99_ms'] / b['p99_ms'] - 1 if b['p99_ms'] else 0:+.1%}"
+        print(line)
+
+def compare(results: Dict[str, dict], base: Dict[str, dict], max_regression: float) -> int:
+    bad = 0
+    for stage, r in results.items():
+        b = base.get(stage)
+        if not b:
+            continue
+        if r["mb_s"] < b["mb_s"] * (1 - max_regression):
+            print(f"[REGRESSION] {stage}: {b['mb_s']:.2f} → {r['mb_s']:.2f} MB/s")
+            bad += 1
+        slow = [n for n, ms in r["docs_ms"].items()
+                if n in b.get("docs_ms", {}) and ms > b["docs_ms"][n] * (1 + max_regression) and ms - b["docs_ms"][n] > 1.0]
+        if slow:
+            print(f"[INFO] {stage}: slower docs: {', '.join(Path(n).stem for n in slow)}")
+    return bad
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--only", type=str, default=None, help="문서 이름(확장자 없이) 쉼표 목록")
+    ap.add_argument("--corpus-dir", type=str, default=None, help="추가로 넣을 저장된 HTML 페이지 디렉터리")
+    ap.add_argument("--update-golden", action="store_true")
+    ap.add_argument("--dump-diff", type=str, default=None, help="골든과 다른 문서의 Markdown 을 저장할 디렉터리")
+    ap.add_argument("--save-baseline", type=str, default=None)
+    ap.add_argument("--compare", type=str, default=None, help="이전 --save-baseline 결과와 비교")
+    ap.add_argument("--max-regression", type=float, default=0.10)
+    args = ap.parse_args()
+    only = [s for s in (args.only or "").split(",") if s]
+
+    docs = load_corpus(Path(args.corpus_dir) if args.corpus_dir else None, only)
+    mb = sum(len(h.encode("utf-8")) for h in docs.values()) / 1e6
+    print(f"[INFO] corpus v{CORPUS_VERSION}: {len(docs)} docs, {mb:.1f} MB")
+    bad = check_golden(docs, args.update_golden, Path(args.dump_diff) if args.dump_diff else None)
+    if args.update_golden:
+        return 0
+
+    results = measure(args.repeat, args.corpus_dir, only)
+    base = None
+    if args.compare:
+        saved = json.loads(Path(args.compare).read_text(encoding="utf-8"))
+        if saved.get("corpus_version") != CORPUS_VERSION or saved.get("only") != only:
+            print("[WARN] baseline 과 코퍼스가 달라 비교가 정확하지 않음")
+        base = saved["stages"]
+    print_table(results, base)
+    if base:
+        bad += compare(results, base, args.max_regression)
+    if args.save_baseline:
+        Path(args.save_baseline).write_text(json.dumps({
+            "corpus_version": CORPUS_VERSION, "only": only, "repeat": args.repeat,
+            "python": platform.python_version(), "platform": platform.platform(), "cpus": os.cpu_count(),
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"), "stages": results,
+        }, indent=1) + "\n", encoding="utf-8")
+        print(f"[INFO] baseline saved: {args.save_baseline}")
+    return 1 if bad else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
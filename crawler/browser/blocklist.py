@@ -0,0 +1,222 @@
+# -*- coding: utf-8 -*-
+import re
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+_TOKEN_RE = re.compile(r"[a-z0-9%]{3,}")
+_HOSTS_PREFIX = ("0.0.0.0", "127.0.0.1", "::", "::1")
+_LOOSE_OPTIONS = {
+    "third-party", "3p", "script", "image", "stylesheet", "subdocument", "xmlhttprequest",
+    "object", "media", "font", "ping", "other", "popup",
+}
+
+def url_host(url: str) -> str:
+    """urlsplit 보다 싼 host 추출 (소문자 URL 전제)"""
+    i = url.find("//")
+    if i < 0:
+        return ""
+    rest = url[i + 2:]
+    end = len(rest)
+    for ch in "/?#":
+        j = rest.find(ch)
+        if 0 <= j < end:
+            end = j
+    host = rest[:end]
+    host = host.rpartition("@")[2]
+    if host.startswith("["):
+        return host.partition("]")[0] + "]"
+    return host.partition(":")[0]
+
+def _safe_tokens(body: str, start_anchored: bool, end_anchored: bool) -> List[str]:
+    """URL 을 토큰으로 잘랐을 때 그대로 나오는 토큰만 (앞뒤가 `*` 이거나 고정되지 않은 끝이면 잘린 토큰일 수 있음)"""
+    out = []
+    for m in _TOKEN_RE.finditer(body):
+        s, e = m.start(), m.end()
+        ok_start = body[s - 1] != "*" if s > 0 else start_anchored
+        ok_end = body[e] != "*" if e < len(body) else end_anchored
+        if ok_start and ok_end:
+            out.append(m.group())
+    return out
+
+def _pattern_regex(pat: str) -> "re.Pattern":
+    """ABP 패턴 → 정규식 (`*` 임의 문자열, `^` 구분 문자 또는 URL 끝, 끝의 `|` 는 URL 끝)"""
+    end = pat.endswith("|")
+    parts = []
+    for ch in pat.rstrip("|"):
+        if ch == "*":
+            parts.append(".*")
+        elif ch == "^":
+            parts.append(r"(?:[/:?=&]|$)")
+        else:
+            parts.append(re.escape(ch))
+    if end:
+        parts.append("$")
+    return re.compile("".join(parts))
+
+class Blocklist:
+    """대용량 차단 규칙 (hosts 파일/도메인 목록/EasyList 기본 문법) 을 컴파일한 매처.
+
+    - 도메인 규칙(`||ads.example.com^`, hosts 항목, 도메인 한 줄)은 suffix set 으로:
+      host 의 label 수만큼만 set 조회한다.
+    - 나머지 URL 패턴은 패턴 안에서 가장 긴 토큰으로 색인해서, URL 의 토큰에 걸린 패턴만
+      실제로 비교한다 (규칙 수와 무관하게 URL 길이에 비례).
+    - `@@` 예외 규칙은 같은 방식으로 따로 들고 있다가 차단보다 우선한다.
+    `$` 옵션은 third-party/리소스 유형만 있을 때 무시하고 적용하며, 그 밖의 옵션(domain= 등)이 붙은 규칙,
+    정규식 규칙(`/.../`), 요소 숨김(`##`) 규칙은 건너뛴다.
+    """
+    def __init__(self):
+        self.domains: Set[str] = set()
+        self.allow_domains: Set[str] = set()
+        self.patterns: Dict[str, List[Tuple[str, object]]] = {}   # token → [(원문, matcher)]
+        self.allow_patterns: Dict[str, List[Tuple[str, object]]] = {}
+        self.untokened: List[Tuple[str, object]] = []  # 토큰을 못 뽑은 짧은 패턴 (항상 비교)
+        self.skipped = 0
+
+    # ---- 적재 ----
+    @classmethod
+    def from_sources(cls, builtin: Iterable[str] = (), paths: Iterable[Path] = ()) -> "Blocklist":
+        bl = cls()
+        for d in builtin:
+            bl.add_domain(d)
+        for p in paths:
+            with open(p, "r", encoding="utf-8", errors="ignore") as f:
+                bl.add_lines(f)
+        return bl
+
+    def add_domain(self, domain: str, allow: bool = False):
+        domain = domain.strip().lower().strip(".")
+        if domain:
+            (self.allow_domains if allow else self.domains).add(domain)
+
+    def add_pattern(self, pat: str, allow: bool = False):
+        pat = pat.lower()
+        if "*" in pat or "^" in pat or pat.startswith("|") or pat.endswith("|"):
+            anchored = pat.startswith("|") and not pat.startswith("||")
+            rx = _pattern_regex(pat.lstrip("|"))
+            matcher = (lambda u, _rx=rx: _rx.match(u) is not None) if anchored else (lambda u, _rx=rx: _rx.search(u) is not None)
+        else:
+            matcher = (lambda u, _p=pat: _p in u)
+        self._index((pat, matcher), _safe_tokens(pat.lstrip("|"), pat.startswith("|"), pat.endswith("|")), allow)
+
+    def _index(self, entry, toks: List[str], allow: bool):
+        if not toks:
+            if allow:
+                self.skipped += 1  # 토큰 없는 예외 규칙은 너무 넓어서 무시
+            else:
+                self.untokened.append(entry)
+            return
+        (self.allow_patterns if allow else self.patterns).setdefault(max(toks, key=len), []).append(entry)
+
+    def add_lines(self, lines: Iterable[str]):
+        for raw in lines:
+            line = raw.strip()
+            if not line or line[0] in "!#[":
+                continue
+            if "##" in line or "#@#" in line or "#?#" in line or (len(line) > 2 and line[0] == line[-1] == "/"):
+                self.skipped += 1
+                continue
+            if "$" in line:
+                line, _, opts = line.rpartition("$")
+                # 유형/third-party 옵션만 있는 규칙은 옵션을 무시하고(더 넓게) 적용, 나머지는 건너뜀
+                if not line or not set(opts.lower().split(",")) <= _LOOSE_OPTIONS:
+                    self.skipped += 1
+                    continue
+            allow = line.startswith("@@")
+            if allow:
+                line = line[2:]
+            first = line.split()[0]
+            if first in _HOSTS_PREFIX:
+                # hosts 파일: "0.0.0.0 ads.example.com"
+                for host in line.split()[1:]:
+                    if host.startswith("#"):
+                        break
+                    if host not in ("localhost", "0.0.0.0"):
+                        self.add_domain(host, allow)
+                continue
+            if line.startswith("||"):
+                body = line[2:]
+                host = body.rstrip("^")
+                if host and not any(c in host for c in "/*^|:?="):
+                    self.add_domain(host, allow)
+                    continue
+                self._add_host_anchored(body, allow)
+                continue
+            if "/" not in line and "." in line and not any(c in line for c in "*^|:?="):
+                self.add_domain(line, allow)
+                continue
+            self.add_pattern(line, allow)
+
+    def _add_host_anchored(self, body: str, allow: bool):
+        # ||example.com/ads/* → 도메인(서브도메인 포함) 뒤에 경로가 이어지는 패턴
+        rx = _pattern_regex(body.lower())
+        matcher = lambda u, _rx=rx: _host_anchored_match(u, _rx)
+        self._index(("||" + body.lower(), matcher), _safe_tokens(body.lower(), True, body.endswith("|")), allow)
+
+    # ---- 매칭 ----
+    @staticmethod
+    def _suffix_hit(host: str, domains: Set[str]) -> bool:
+        if not domains or not host:
+            return False
+        if host in domains:
+            return True
+        i = host.find(".")
+        while i >= 0:
+            if host[i + 1:] in domains:
+                return True
+            i = host.find(".", i + 1)
+        return False
+
+    @staticmethod
+    def _pattern_hit(url: str, index: Dict[str, List[Tuple[str, object]]]) -> bool:
+        if not index:
+            return False
+        for tok in set(_TOKEN_RE.findall(url)):
+            for _, m in index.get(tok, ()):
+                if m(url):
+                    return True
+        return False
+
+    def match(self, url: str, host: Optional[str] = None) -> bool:
+        """소문자 URL 을 받아 차단 여부"""
+        if host is None:
+            host = url_host(url)
+        blocked = self._suffix_hit(host, self.domains) or self._pattern_hit(url, self.patterns) \
+            or any(m(url) for _, m in self.untokened)
+        if not blocked:
+            return False
+        return not (self._suffix_hit(host, self.allow_domains) or self._pattern_hit(url, self.allow_patterns))
+
+    def browser_patterns(self, limit: int) -> List[str]:
+        """CDP Network.setBlockedURLs 로 넘길 wildcard 패턴 (예외 규칙과 겹치지 않는 도메인 규칙만)"""
+        out: List[str] = []
+        if self.allow_domains or self.allow_patterns:
+            # 예외가 있으면 브라우저 쪽에서는 판단할 수 없으므로 Python 에서만 처리
+            return out
+        for d in sorted(self.domains, key=lambda d: (d.count("."), d)):
+            if len(out) + 2 > limit:
+                break
+            out.append(f"*://{d}/*")
+            out.append(f"*://*.{d}/*")
+        return out
+
+    def __len__(self) -> int:
+        return (len(self.domains) + len(self.allow_domains) + len(self.untokened)
+                + sum(map(len, self.patterns.values())) + sum(map(len, self.allow_patterns.values())))
+
+def _host_anchored_match(url: str, rx) -> bool:
+    # scheme:// 뒤, host 의 label 경계에서 시작하는 위치에서만 비교
+    i = url.find("//")
+    if i < 0:
+        return False
+    start = i + 2
+    end = url.find("/", start)
+    end = len(url) if end < 0 else end
+    pos = start
+    while pos < end:
+        if rx.match(url, pos):
+            return True
+        nxt = url.find(".", pos, end)
+        if nxt < 0:
+            break
+        pos = nxt + 1
+    return False
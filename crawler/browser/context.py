@@ -5,8 +5,11 @@ from typing import Optional
 from playwright.async_api import async_playwright, BrowserContext, Browser
 from ..config import Settings
 from .profiles import guess_default_chrome_profile_win
-from ..constants import BLOCK_DOMAIN_SUBSTR
-from .routing import setup_speed_routes
+from ..constants import BLOCK_DOMAINS
+from .routing import setup_speed_routes, setup_browser_blocking
+from .blocklist import Blocklist
+from .rescache import ResourceCache
+from ..nav.settle import InflightTracker
 
 class ContextManager:
     def __init__(self, settings: Settings):
@@ -14,6 +17,8 @@ class ContextManager:
         self.play = None
         self.browser: Optional[Browser] = None
         self.context: Optional[BrowserContext] = None
+        self.cache: Optional[ResourceCache] = None
+        self.inflight: Optional[InflightTracker] = None
 
     async def __aenter__(self):
         self.play = await async_playwright().start()
@@ -59,12 +64,30 @@ class ContextManager:
         await self.context.set_extra_http_headers({
             "Accept-Language": "ko-KR,ko;q=0.9,en-US;q=0.8,en;q=0.7",
         })
-        await setup_speed_routes(self.context, BLOCK_DOMAIN_SUBSTR)
+        if self.s.resource_cache_dir:
+            self.cache = ResourceCache(self.s.resource_cache_dir, self.s.resource_cache_max_mb << 20)
+            if self.s.resource_cache_warm_from:
+                try:
+                    n = self.cache.warm_from(self.s.resource_cache_warm_from)
+                    print(f"[INFO] resource cache: {n} entries from {self.s.resource_cache_warm_from}")
+                except Exception as e:
+                    print(f"[WARN] resource cache warm failed: {e}")
+        blocklist = Blocklist.from_sources(BLOCK_DOMAINS, self.s.blocklist_paths)
+        if self.s.blocklist_paths:
+            print(f"[INFO] blocklist: {len(blocklist)} rules ({blocklist.skipped} unsupported skipped)")
+        await setup_speed_routes(self.context, blocklist, self.cache)
+        if self.s.browser_blocking:
+            await setup_browser_blocking(self.context, blocklist.browser_patterns(self.s.browser_blocking_max_patterns))
+        self.inflight = InflightTracker()
+        await self.inflight.install(self.context)
         return self.context
 
     async def __aexit__(self, exc_type, exc, tb):
         if self.context:
             await self.context.close()
+        if self.cache:
+            print(f"[INFO] resource cache: {self.cache.summary()}")
+            self.cache.close()
         if self.browser:
             await self.browser.close()
         if self.play:
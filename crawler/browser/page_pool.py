@@ -1,28 +1,150 @@
 # -*- coding: utf-8 -*-
-import asyncio, contextlib
+import asyncio, contextlib, time
+from typing import Dict, Optional, Set
 from playwright.async_api import BrowserContext, Page
 
+_HEAP_JS = "(() => (performance.memory && performance.memory.usedJSHeapSize) || 0)()"
+
+class PagePoolEmpty(RuntimeError):
+    """살아 있는 탭이 하나도 없음 (브라우저/컨텍스트가 죽음) → 더 크롤할 수 없으므로 실행을 멈춰야 함"""
+
 class PagePool:
-    def __init__(self, context: BrowserContext, size: int):
+    """실행 전체에서 재사용하는 페이지 풀.
+
+    - 반납 시 about:blank 로 초기화해서 이전 페이지의 타이머/요청이 다음 작업에 새지 않게 함
+    - max_uses 회 탐색했거나 JS heap 이 max_heap_mb 를 넘으면 페이지를 새로 만듦
+    - 크래시/닫힌 페이지는 꺼낼 때나 반납할 때 교체
+    초기화는 백그라운드 태스크로 돌려서 반납하는 쪽은 기다리지 않음.
+    교체할 탭을 (backoff 재시도 후에도) 못 만들면 그 슬롯은 없어지고 live 가 줄어든다.
+    live 가 0 이 되면 acquire 는 기다리지 않고 PagePoolEmpty 를 던진다 (브라우저/컨텍스트가 죽은 경우).
+    """
+    def __init__(self, context: BrowserContext, size: int, max_uses: int = 200, max_heap_mb: int = 512,
+                 new_page_attempts: int = 3, new_page_backoff_s: float = 0.5):
         self.context = context
         self.size = size
+        self.live = 0  # 풀에 있거나 빌려 간 페이지 수
+        self.new_page_attempts = max(1, new_page_attempts)
+        self.new_page_backoff_s = new_page_backoff_s
+        self.max_uses = max_uses
+        self.max_heap_mb = max_heap_mb
         self.pool = asyncio.Queue()
+        self.uses: Dict[Page, int] = {}
+        self.crashed: Set[Page] = set()
+        self.resets: Set[asyncio.Task] = set()
+        self.stats = {
+            "acquired": 0, "reused": 0, "recycled": 0, "replaced": 0,
+            "wait_ms_total": 0.0, "wait_ms_max": 0.0,
+        }
+
+    async def _new_page(self) -> Page:
+        p = await self.context.new_page()
+        p.set_default_navigation_timeout(30_000)
+        p.set_default_timeout(10_000)
+        p.on("crash", lambda _p: self.crashed.add(p))
+        self.uses[p] = 0
+        return p
+
+    async def _replacement(self) -> Optional[Page]:
+        """새 탭을 backoff 하며 만들어 봄. 끝내 실패하면 슬롯을 없애고 None"""
+        delay = self.new_page_backoff_s
+        for attempt in range(self.new_page_attempts):
+            try:
+                return await self._new_page()
+            except Exception as e:
+                err = e
+            if attempt + 1 < self.new_page_attempts:
+                await asyncio.sleep(delay)
+                delay *= 2
+        self.live -= 1
+        print(f"[WARN] page pool: new page failed ({err}), {self.live}/{self.size} pages left")
+        if self.live <= 0:
+            self.pool.put_nowait(None)  # acquire 에서 기다리는 쪽을 깨움
+        return None
+
+    async def _discard(self, page: Page):
+        self.uses.pop(page, None)
+        self.crashed.discard(page)
+        with contextlib.suppress(Exception):
+            await page.close()
+
+    def _broken(self, page: Page) -> bool:
+        return page in self.crashed or page.is_closed()
 
     async def init(self):
         for _ in range(self.size):
-            p = await self.context.new_page()
-            p.set_default_navigation_timeout(30_000)
-            p.set_default_timeout(10_000)
-            await self.pool.put(p)
+            self.live += 1
+            page = await self._replacement()
+            if page is not None:
+                await self.pool.put(page)
+        if self.live <= 0:
+            raise PagePoolEmpty("page pool: could not open any page")
 
     async def acquire(self) -> Page:
-        return await self.pool.get()
+        t0 = time.perf_counter()
+        while True:
+            if self.live <= 0:
+                raise PagePoolEmpty("page pool is empty: no page could be (re)created")
+            page = await self.pool.get()
+            if page is None:
+                self.pool.put_nowait(None)  # 다른 대기자도 깨어나서 실패하도록
+                continue
+            if self._broken(page):
+                self.stats["replaced"] += 1
+                await self._discard(page)
+                page = await self._replacement()
+                if page is None:
+                    continue
+            break
+        wait_ms = (time.perf_counter() - t0) * 1000
+        self.stats["acquired"] += 1
+        self.stats["wait_ms_total"] += wait_ms
+        self.stats["wait_ms_max"] = max(self.stats["wait_ms_max"], wait_ms)
+        if self.uses.get(page):
+            self.stats["reused"] += 1
+        return page
 
     async def release(self, page: Page):
-        await self.pool.put(page)
+        self.uses[page] = self.uses.get(page, 0) + 1
+        t = asyncio.create_task(self._reset(page))
+        self.resets.add(t)
+        t.add_done_callback(self.resets.discard)
+
+    async def _heap_mb(self, page: Page) -> float:
+        with contextlib.suppress(Exception):
+            return (await page.evaluate(_HEAP_JS)) / (1 << 20)
+        return 0.0
+
+    async def _reset(self, page: Page):
+        if self._broken(page):
+            self.stats["replaced"] += 1
+            await self._discard(page)
+            page = await self._replacement()
+        elif self.uses[page] >= self.max_uses or (
+            self.max_heap_mb and await self._heap_mb(page) > self.max_heap_mb
+        ):
+            self.stats["recycled"] += 1
+            await self._discard(page)
+            page = await self._replacement()
+        else:
+            try:
+                await page.goto("about:blank", timeout=5_000)
+            except Exception:
+                self.stats["replaced"] += 1
+                await self._discard(page)
+                page = await self._replacement()
+        if page is not None:
+            await self.pool.put(page)
+
+    def summary(self) -> str:
+        st = self.stats
+        avg = st["wait_ms_total"] / st["acquired"] if st["acquired"] else 0.0
+        return (f"live={self.live}/{self.size} acquired={st['acquired']} reused={st['reused']} recycled={st['recycled']} "
+                f"replaced={st['replaced']} wait_avg={avg:.1f}ms wait_max={st['wait_ms_max']:.1f}ms")
 
     async def close(self):
+        if self.resets:
+            await asyncio.gather(*self.resets, return_exceptions=True)
         while not self.pool.empty():
             p = await self.pool.get()
-            with contextlib.suppress(Exception):
-                await p.close()
+            if p is not None:
+                await self._discard(p)
@@ -0,0 +1,202 @@
+# -*- coding: utf-8 -*-
+import hashlib, json, os, sqlite3, threading, time
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+from typing import Dict, NamedTuple, Optional
+
+# fulfill 할 때 그대로 돌려줄 헤더 (본문은 이미 디코딩돼 있으므로 content-encoding/length 는 제외)
+_KEEP_HEADERS = ("content-type", "cache-control", "expires", "etag", "last-modified")
+# 요청한 origin 에 따라 서버가 다르게 줄 수 있는 헤더 → CORS 요청(Origin 헤더 있음)의 항목에만 저장
+_CORS_HEADERS = ("access-control-allow-origin", "access-control-allow-credentials", "timing-allow-origin")
+_HEURISTIC_MAX_S = 86_400  # Last-Modified 만 있을 때 최대 신선도
+
+class CachedResponse(NamedTuple):
+    headers: Dict[str, str]
+    body: bytes
+    fresh: bool
+
+def _cache_control(headers: Dict[str, str]) -> Dict[str, str]:
+    out = {}
+    for part in (headers.get("cache-control") or "").lower().split(","):
+        k, _, v = part.strip().partition("=")
+        if k:
+            out[k] = v.strip('"')
+    return out
+
+def _http_date(v: Optional[str]) -> Optional[float]:
+    if not v:
+        return None
+    try:
+        return parsedate_to_datetime(v).timestamp()
+    except Exception:
+        return None
+
+def expires_at(headers: Dict[str, str], now: float) -> Optional[float]:
+    """Cache-Control/Expires/Last-Modified 로 계산한 만료 시각. 저장하면 안 되면 None"""
+    cc = _cache_control(headers)
+    validators = "etag" in headers or "last-modified" in headers
+    if "no-store" in cc:
+        return None
+    if "no-cache" in cc:
+        # 저장은 하되 매번 재검증 (검증자가 없으면 저장할 의미가 없음)
+        return now if validators else None
+    for key in ("s-maxage", "max-age"):
+        if cc.get(key, "").isdigit():
+            exp = now + int(cc[key])
+            return exp if exp > now or validators else None
+    exp = _http_date(headers.get("expires"))
+    if exp is not None:
+        return exp if exp > now or validators else None
+    lm = _http_date(headers.get("last-modified"))
+    if lm is not None:
+        return now + min(max(0.0, now - lm) * 0.1, _HEURISTIC_MAX_S)
+    return None
+
+def cache_key(url: str, origin: Optional[str] = None) -> str:
+    """CORS 요청은 요청한 origin 별로 따로 저장 (A 에게 준 Access-Control-Allow-Origin 을 B 에게 주지 않게).
+    no-cors 요청(일반 <script>/<link>)은 CORS 헤더 없이 URL 하나로 공유"""
+    return url if not origin else f"{url}\t{origin}"
+
+class ResourceCache:
+    """스크립트/스타일시트 응답 디스크 캐시 (route handler 에서 바로 fulfill).
+
+    본문은 sha256 이름의 파일로 저장해서(content-addressed) 같은 번들을 여러 URL 이 공유하고,
+    cache_key → (hash, 헤더, 만료 시각, 마지막 사용 시각) 은 sqlite 에 둔다.
+    전체 크기가 max_bytes 를 넘으면 오래 안 쓴 항목부터 지운다 (LRU). 전체 크기는 trigger 로
+    usage 행에 누적해 두므로 저장할 때마다 테이블을 훑지 않는다 (같은 캐시를 쓰는 여러 프로세스 공통).
+    """
+    def __init__(self, root: Path, max_bytes: int = 1 << 30):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        (self.root / "blobs").mkdir(parents=True, exist_ok=True)
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(str(self.root / "index.sqlite"), timeout=30,
+                                  isolation_level=None, check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=OFF")
+        self.db.execute("""CREATE TABLE IF NOT EXISTS entries (
+            url TEXT PRIMARY KEY, hash TEXT NOT NULL, size INTEGER NOT NULL, headers TEXT NOT NULL,
+            expires REAL NOT NULL, last_access REAL NOT NULL)""")
+        self.db.execute("CREATE INDEX IF NOT EXISTS entries_access ON entries(last_access)")
+        # INSERT OR REPLACE 로 지워지는 기존 행에도 delete trigger 가 돌도록
+        self.db.execute("PRAGMA recursive_triggers=ON")
+        self.db.executescript("""
+            CREATE TABLE IF NOT EXISTS usage (id INTEGER PRIMARY KEY CHECK (id = 0), bytes INTEGER NOT NULL);
+            CREATE TRIGGER IF NOT EXISTS entries_add AFTER INSERT ON entries
+                BEGIN UPDATE usage SET bytes = bytes + NEW.size; END;
+            CREATE TRIGGER IF NOT EXISTS entries_drop AFTER DELETE ON entries
+                BEGIN UPDATE usage SET bytes = bytes - OLD.size; END;
+        """)
+        # usage 가 없던 캐시 디렉터리: 한 번만 합계를 구해서 채움 (trigger 를 만든 뒤라 사이에 들어온 행도 포함)
+        self.db.execute("INSERT OR IGNORE INTO usage SELECT 0, COALESCE(SUM(size), 0) FROM entries")
+        self.stats = {"hits": 0, "misses": 0, "revalidated": 0, "stored": 0, "bytes_saved": 0, "evicted": 0}
+
+    def _blob(self, h: str) -> Path:
+        return self.root / "blobs" / h[:2] / h
+
+    def total_bytes(self) -> int:
+        with self.lock:
+            return self.db.execute("SELECT bytes FROM usage").fetchone()[0]
+
+    def lookup(self, url: str, origin: Optional[str] = None) -> Optional[CachedResponse]:
+        key = cache_key(url, origin)
+        with self.lock:
+            row = self.db.execute("SELECT hash, headers, expires FROM entries WHERE url=?", (key,)).fetchone()
+        if not row:
+            return None
+        h, headers, exp = row
+        try:
+            body = self._blob(h).read_bytes()
+        except FileNotFoundError:
+            with self.lock:
+                self.db.execute("DELETE FROM entries WHERE url=?", (key,))
+            return None
+        now = time.time()
+        with self.lock:
+            self.db.execute("UPDATE entries SET last_access=? WHERE url=?", (now, key))
+        return CachedResponse(json.loads(headers), body, exp > now)
+
+    def store(self, url: str, headers: Dict[str, str], body: bytes, origin: Optional[str] = None) -> bool:
+        now = time.time()
+        headers = {k.lower(): v for k, v in headers.items()}
+        exp = expires_at(headers, now)
+        if exp is None or len(body) > self.max_bytes // 10:
+            return False
+        h = hashlib.sha256(body).hexdigest()
+        blob = self._blob(h)
+        if not blob.exists():
+            blob.parent.mkdir(exist_ok=True)
+            tmp = blob.with_name(f"{h}.{os.getpid()}.{threading.get_ident()}.tmp")
+            tmp.write_bytes(body)
+            os.replace(tmp, blob)
+        keep = _KEEP_HEADERS + _CORS_HEADERS if origin else _KEEP_HEADERS
+        kept = {k: v for k, v in headers.items() if k in keep}
+        with self.lock:
+            self.db.execute("INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?)",
+                            (cache_key(url, origin), h, len(body), json.dumps(kept), exp, now))
+        self.stats["stored"] += 1
+        self._evict()
+        return True
+
+    def refresh(self, url: str, headers: Dict[str, str], origin: Optional[str] = None):
+        """304 응답: 본문은 그대로 두고 만료 시각만 갱신"""
+        now = time.time()
+        exp = expires_at({k.lower(): v for k, v in headers.items()}, now)
+        with self.lock:
+            self.db.execute("UPDATE entries SET expires=?, last_access=? WHERE url=?",
+                            (exp or now, now, cache_key(url, origin)))
+
+    def _evict(self):
+        with self.lock:
+            total = self.db.execute("SELECT bytes FROM usage").fetchone()[0]
+            if total <= self.max_bytes:
+                return
+            # 한 번에 여유를 두고(90%) 지워서 매 저장마다 evict 하지 않게
+            target = int(self.max_bytes * 0.9)
+            dropped = set()
+            for url, h, size in self.db.execute("SELECT url, hash, size FROM entries ORDER BY last_access").fetchall():
+                if total <= target:
+                    break
+                self.db.execute("DELETE FROM entries WHERE url=?", (url,))
+                total -= size
+                dropped.add(h)
+                self.stats["evicted"] += 1
+            for h in dropped:
+                if not self.db.execute("SELECT 1 FROM entries WHERE hash=? LIMIT 1", (h,)).fetchone():
+                    self._blob(h).unlink(missing_ok=True)
+
+    def warm_from(self, other_root: Path) -> int:
+        """다른(이전 실행의) 캐시 디렉터리에서 아직 없는 항목을 가져옴"""
+        other = sqlite3.connect((Path(other_root) / "index.sqlite").resolve().as_uri() + "?mode=ro", uri=True)
+        n = 0
+        try:
+            for url, h, size, headers, exp, last in other.execute("SELECT * FROM entries"):
+                with self.lock:
+                    if self.db.execute("SELECT 1 FROM entries WHERE url=?", (url,)).fetchone():
+                        continue
+                src = Path(other_root) / "blobs" / h[:2] / h
+                dst = self._blob(h)
+                if not dst.exists():
+                    if not src.exists():
+                        continue
+                    dst.parent.mkdir(exist_ok=True)
+                    tmp = dst.with_name(f"{h}.{os.getpid()}.tmp")
+                    tmp.write_bytes(src.read_bytes())
+                    os.replace(tmp, dst)
+                with self.lock:
+                    self.db.execute("INSERT OR IGNORE INTO entries VALUES (?, ?, ?, ?, ?, ?)",
+                                    (url, h, size, headers, exp, last))
+                n += 1
+        finally:
+            other.close()
+        self._evict()
+        return n
+
+    def summary(self) -> str:
+        st = self.stats
+        return (f"hits={st['hits']} misses={st['misses']} revalidated={st['revalidated']} stored={st['stored']} "
+                f"saved={st['bytes_saved'] / (1 << 20):.1f}MB evicted={st['evicted']}")
+
+    def close(self):
+        with self.lock:
+            self.db.close()
@@ -1,16 +1,80 @@
 # -*- coding: utf-8 -*-
-from playwright.async_api import BrowserContext
+import asyncio
+from typing import List, Optional
+from playwright.async_api import BrowserContext, Page
+from .blocklist import Blocklist, url_host
+from .rescache import ResourceCache
 
-async def setup_speed_routes(context: BrowserContext, blocked_substrings):
+CACHEABLE_TYPES = ("script", "stylesheet")
+
+async def _serve_cached(route, request, cache: ResourceCache):
+    url = request.url
+    # CORS 요청(module script, crossorigin 속성)만 Origin 헤더가 붙음 → 그 origin 의 항목만 사용
+    origin = request.headers.get("origin")
+    hit = await asyncio.to_thread(cache.lookup, url, origin)
+    if hit and hit.fresh:
+        cache.stats["hits"] += 1
+        cache.stats["bytes_saved"] += len(hit.body)
+        return await route.fulfill(status=200, headers=hit.headers, body=hit.body)
+
+    headers = dict(request.headers)
+    if hit:
+        # 만료된 항목은 조건부 요청으로 재검증 (304 면 디스크 본문을 그대로 씀)
+        if "etag" in hit.headers:
+            headers["if-none-match"] = hit.headers["etag"]
+        if "last-modified" in hit.headers:
+            headers["if-modified-since"] = hit.headers["last-modified"]
+    try:
+        resp = await route.fetch(headers=headers)
+    except Exception:
+        return await route.continue_()
+    if resp.status == 304 and hit:
+        await asyncio.to_thread(cache.refresh, url, resp.headers, origin)
+        cache.stats["revalidated"] += 1
+        cache.stats["bytes_saved"] += len(hit.body)
+        return await route.fulfill(status=200, headers=hit.headers, body=hit.body)
+    cache.stats["misses"] += 1
+    if resp.status == 200:
+        try:
+            body = await resp.body()
+            await asyncio.to_thread(cache.store, url, resp.headers, body, origin)
+        except Exception as e:
+            print(f"[WARN] resource cache store failed: {url} ({e})")
+    return await route.fulfill(response=resp)
+
+async def setup_speed_routes(context: BrowserContext, blocklist: Blocklist, cache: Optional[ResourceCache] = None):
     async def handler(route, request):
         rtype = (request.resource_type or "").lower()
-        url   = request.url.lower()
 
         if rtype in ("image", "media", "font"):
             return await route.abort()
 
-        if any(b in url for b in blocked_substrings):
+        url = request.url.lower()
+        if blocklist.match(url, url_host(url)):
             return await route.abort()
 
+        if cache is not None and rtype in CACHEABLE_TYPES and request.method == "GET":
+            return await _serve_cached(route, request, cache)
+
         return await route.continue_()
     await context.route("**/*", handler)
+
+async def setup_browser_blocking(context: BrowserContext, patterns: List[str]):
+    """도메인 차단 규칙을 CDP Network.setBlockedURLs 로 렌더러에 넘김.
+    걸린 요청은 브라우저 안에서 바로 취소되어 Python route handler 까지 오지 않는다.
+    (Chromium 전용, worker/OOPIF 요청은 계속 route handler 가 처리)"""
+    if not patterns:
+        return
+    failed = []
+    async def attach(page: Page):
+        try:
+            cdp = await context.new_cdp_session(page)
+            await cdp.send("Network.enable")
+            await cdp.send("Network.setBlockedURLs", {"urls": patterns})
+        except Exception as e:
+            if not failed:
+                print(f"[WARN] browser-side blocking unavailable, route handler only: {e}")
+            failed.append(e)
+    for page in context.pages:
+        await attach(page)
+    context.on("page", attach)
@@ -14,6 +14,7 @@ class Settings:
     proxy: Optional[dict] = None  # playwright proxy dict or None
     concurrency: int = 4
     origin_concurrency: int = 1
+    workers: int = 1  # >1 이면 워커마다 브라우저 프로세스 하나, origin 은 공유 큐에서 나눠 받음 (concurrency 는 워커별)
     jitter_range: Tuple[float, float] = (0.30, 1.10)
 
     use_profile_copy: bool = True
@@ -28,6 +29,86 @@ class Settings:
     prewarm_nav_timeout_ms: int = 12_000
     prewarm_wait_ms_headful: int = 300
     prewarm_wait_ms_headless: int = 150
+    captcha_check_concurrency: int = 8  # headful 에서 origin 캡차 사전 확인 동시 실행 수
+    origin_warm_ttl_s: float = 600.0  # 이 시간 안에 방문한 origin 은 URL 마다 홈을 다시 거치지 않음 (0 = 항상 경유)
+
+    fast_path: bool = False  # 먼저 HTTP 로 받아 보고 JS 가 필요한 URL 만 브라우저로
+    fast_path_timeout_ms: int = 15_000
+    fast_path_min_text: int = 200  # 보이는 텍스트(글자 수)가 이보다 짧으면 브라우저로
+    fast_path_learn_after: int = 3  # HTTP 로 한 번도 안 끝난 origin 이 이만큼 넘어가면 이후엔 바로 브라우저로
+    fast_path_browser_origins: Tuple[str, ...] = ()  # 항상 브라우저로 보낼 origin
+
+    settle_budget_ms: int = 6000  # URL 당 안정화 대기 상한
+    settle_quiet_ms: int = 400    # DOM 변화가 이만큼 없으면 안정된 것으로 봄
+    wait_web_components: bool = False  # 특정 사이트용 custom element 대기 (opt-in)
+    web_component_tags: Tuple[str, ...] = ("attwc-globalnav-header", "att-gnav-header-bootstrap")
+
+    consent_extra_selectors: Tuple[str, ...] = ()  # nav.consent.CONSENT_SELECTORS 에 추가
+    consent_extra_labels: Tuple[str, ...] = ()     # nav.consent.CONSENT_LABELS 에 추가
+
+    nav_learning: bool = True  # origin 별로 효과 없는 캡처 단계를 학습해서 생략
+    nav_profile_path: Optional[Path] = None  # None → <out_ok_md>.navprofiles.json
+    nav_min_samples: int = 3
+    nav_reprobe_rate: float = 0.05
+
+    page_max_uses: int = 200  # 이 횟수만큼 탐색한 페이지는 새로 만듦
+    page_max_heap_mb: int = 512  # JS heap 이 이보다 크면 페이지 교체 (0 = 검사 안 함)
+
+    blocklist_paths: Tuple[Path, ...] = ()  # hosts 파일/도메인 목록/EasyList 형식, constants.BLOCK_DOMAINS 에 추가
+    browser_blocking: bool = True  # 도메인 규칙을 CDP Network.setBlockedURLs 로 브라우저 안에서 차단
+    browser_blocking_max_patterns: int = 20_000
+
+    resource_cache_dir: Optional[Path] = None  # 지정하면 script/stylesheet 응답을 디스크 캐시에서 fulfill (실행 간 유지)
+    resource_cache_max_mb: int = 1024
+    resource_cache_warm_from: Optional[Path] = None  # 시작할 때 다른 캐시 디렉터리 내용을 가져옴
+
+    convert_workers: int = 0  # 0 → os.cpu_count()
+    convert_queue_size: int = 64
+
+    sink_batch_size: int = 64
+    sink_flush_interval_s: float = 1.0
+    sink_queue_size: int = 256
+    sink_fsync: str = "none"  # none | batch | close
+
+    output_format: str = "jsonl"  # jsonl | shards (<path>.shards/ 아래 압축 + 회전 + URL 오프셋 인덱스)
+    output_compression: str = "zstd"  # zstd | gzip | none (zstandard 가 없으면 gzip)
+    shard_max_mb: int = 256  # 압축 전 크기 기준
+    shard_max_records: int = 0  # 0 = 레코드 수로는 회전하지 않음
+    output_parquet: bool = False  # Markdown 출력의 parquet 사본 (pyarrow 필요)
+
+    done_index_path: Optional[Path] = None  # None → <out_ok_md>.done
+    done_index_rebuild: bool = False
+
+    mode: str = "local"  # local | coordinator | worker
+    queue_url: Optional[str] = None  # None → <out_ok_md>.queue.sqlite
+    lease_ttl_s: float = 120.0
+    lease_batch_size: int = 200  # origin 하나를 lease 할 때 가져오는 URL 수
+    lease_origins: int = 8  # worker 가 lease 한 번에 가져오는 origin 수
+    lease_max_attempts: int = 3  # 이만큼 lease 하고도 못 끝낸 URL 은 "lease attempts exhausted" err 레코드로
+
+    incremental: bool = False  # URL 별 ETag/Last-Modified/본문 해시로 바뀐 페이지만 다시 변환·기록
+    refresh_interval_s: float = 86_400.0  # 마지막 확인 후 이 시간이 지난 URL 만 다시 확인
+    refresh_intervals_path: Optional[Path] = None  # {"<origin 또는 URL>": 초} JSON, 기본 간격을 덮어씀
+    refresh_state_path: Optional[Path] = None  # None → <out_ok_md>.state.sqlite
+
+    dedup: str = "off"  # off | tag (duplicate_of 표시) | drop (본문을 버리고 URL/대표 URL 만 기록)
+    dedup_threshold: int = 3  # SimHash hamming 거리가 이 이하면 근접 중복
+    dedup_min_tokens: int = 50  # markdown 단어 수가 이보다 적으면 검사하지 않음 (짧은 글은 오탐이 많음)
+    dedup_index_path: Optional[Path] = None  # None → <out_ok_md>.simhash
+
+    metrics_path: Optional[Path] = None  # Prometheus text 파일 (node_exporter textfile collector 등)
+    metrics_port: int = 0  # >0 이면 127.0.0.1:<port>/metrics 로 제공
+    metrics_interval_s: float = 10.0  # 파일 갱신 주기
+    metrics_max_origins: int = 100  # origin label 최대 개수, 넘으면 _other 로 묶음
+
+    loop_lag_threshold_ms: float = 500.0  # 이벤트 루프가 이보다 오래 막히면 루프 스레드 스택을 로그 (0 = 끔)
+    loop_lag_interval_ms: float = 100.0
+    profile_fraction: float = 0.0  # 이 비율의 URL 만 캡처 스택 샘플 / 변환 cProfile 기록 (0 = 끔)
+    profile_dir: Optional[Path] = None  # None → <out_ok_md>.profiles/
+    profile_sample_ms: float = 5.0  # 캡처 스택 샘플 간격
+
+    stream_urls: bool = False  # URL 목록을 sqlite 로 spill 해서 메모리 사용량 고정
+    url_store_path: Optional[Path] = None  # None → <out_ok_md>.urls.sqlite
 
 def load_default_settings() -> Settings:
     return Settings(
@@ -1,7 +1,9 @@
 # -*- coding: utf-8 -*-
-BLOCK_DOMAIN_SUBSTR = [
+# 기본 차단 도메인. Blocklist 의 도메인 규칙이라 host 가 이 도메인이거나 그 서브도메인일 때만 차단
+# (예전처럼 URL 부분 문자열이 아님: "adsystem.com" 은 amazon-adsystem.com 을 잡지 못하므로 전체 도메인으로)
+BLOCK_DOMAINS = [
     "doubleclick.net", "googletagmanager.com", "google-analytics.com",
-    "adsystem.com", "adservice.google.com", "scorecardresearch.com",
+    "amazon-adsystem.com", "adservice.google.com", "scorecardresearch.com",
     "facebook.net", "pixel.wp.com", "quantserve.com", "criteo.com",
     "taboola.com", "outbrain.com", "tiqcdn.com", "cdn.ampproject.org",
 ]
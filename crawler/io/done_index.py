@@ -0,0 +1,160 @@
+# -*- coding: utf-8 -*-
+import mmap, os, threading
+from array import array
+from bisect import bisect_left
+from hashlib import blake2b
+from pathlib import Path
+from typing import Iterable, List, Optional, Set
+from .jsonl import iter_jsonl_urls
+from .paths import ensure_parent
+from .shard_store import shard_dir
+
+def url_hash(url: str) -> int:
+    return int.from_bytes(blake2b(url.encode("utf-8"), digest_size=8).digest(), "little")
+
+class DoneIndex:
+    """처리 완료 URL 의 64-bit 해시 인덱스.
+
+    <path>      : 정렬된 uint64 배열 (mmap 으로 열고 bisect 로 조회 → 크기와 무관하게 즉시 로드)
+    <path>.log  : 새로 기록된 해시의 append-only 로그 (compaction 때 <path> 로 병합)
+    """
+    def __init__(self, path: Path, compact_threshold: int = 1 << 20):
+        self.path = Path(path)
+        self.log_path = self.path.with_name(self.path.name + ".log")
+        self.compact_threshold = compact_threshold
+        self.lock = threading.Lock()
+        self._fh = None
+        self._mm: Optional[mmap.mmap] = None
+        self._base = memoryview(b"").cast("Q")
+        self.recent: Set[int] = set()   # 로그에 있는 (아직 병합 안 된) 해시
+        self.pending: Set[str] = set()  # 이번 실행에서 처리했지만 아직 기록되지 않은 URL
+
+    @classmethod
+    def open(cls, path: Path, **kw) -> "DoneIndex":
+        idx = cls(path, **kw)
+        idx._map_base()
+        if idx.log_path.exists():
+            log = array("Q")
+            log.frombytes(idx.log_path.read_bytes()[: idx.log_path.stat().st_size // 8 * 8])
+            idx.recent.update(log)
+        if len(idx.recent) >= idx.compact_threshold:
+            idx.compact()
+        return idx
+
+    @classmethod
+    def rebuild(cls, path: Path, *jsonl_paths: Path, **kw) -> "DoneIndex":
+        """기존 JSONL 출력에서 인덱스를 새로 만든다"""
+        hashes = array("Q", sorted({url_hash(u) for u in iter_jsonl_urls(*jsonl_paths)}))
+        path = Path(path)
+        ensure_parent(path)
+        tmp = path.with_name(path.name + ".tmp")
+        tmp.write_bytes(hashes.tobytes())
+        os.replace(tmp, path)
+        log_path = path.with_name(path.name + ".log")
+        if log_path.exists():
+            log_path.unlink()
+        return cls.open(path, **kw)
+
+    def _map_base(self):
+        self._base = memoryview(b"").cast("Q")
+        if self._mm is not None:
+            self._mm.close()
+            self._mm = None
+        if self.path.exists() and self.path.stat().st_size >= 8:
+            with self.path.open("rb") as f:
+                self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            self._base = memoryview(self._mm)[: len(self._mm) // 8 * 8].cast("Q")
+
+    def _in_base(self, h: int) -> bool:
+        i = bisect_left(self._base, h)
+        return i < len(self._base) and self._base[i] == h
+
+    def __contains__(self, url: str) -> bool:
+        if url in self.pending:
+            return True
+        h = url_hash(url)
+        with self.lock:
+            return h in self.recent or self._in_base(h)
+
+    def __len__(self) -> int:
+        return len(self._base) + len(self.recent)
+
+    def add(self, url: str):
+        """이번 실행 안에서만 완료로 취급 (디스크 기록은 on_flush 에서)"""
+        self.pending.add(url)
+
+    def on_flush(self, batch: List[dict]):
+        """JsonlSink flush hook: 파일에 기록된 레코드의 URL 을 로그에 추가"""
+        self.append(o["url"] for o in batch if "url" in o)
+
+    def append(self, urls: Iterable[str]):
+        urls = list(urls)
+        hashes = array("Q", (url_hash(u) for u in urls))
+        with self.lock:
+            if self._fh is None:
+                ensure_parent(self.log_path)
+                self._fh = self.log_path.open("ab")
+            self._fh.write(hashes.tobytes())
+            self._fh.flush()
+            self.recent.update(hashes)
+            self.pending.difference_update(urls)
+            if len(self.recent) >= self.compact_threshold:
+                self._compact_locked()
+
+    def compact(self):
+        with self.lock:
+            self._compact_locked()
+
+    def _compact_locked(self):
+        if not self.recent:
+            return
+        # 정렬된 base 사이에 정렬된 recent 를 끼워 넣음 (구간 복사는 memcpy)
+        base, out, prev = self._base, array("Q"), 0
+        for h in sorted(self.recent):
+            i = bisect_left(base, h, prev)
+            out.frombytes(base[prev:i].tobytes())
+            if i >= len(base) or base[i] != h:
+                out.append(h)
+            prev = i
+        out.frombytes(base[prev:].tobytes())
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        ensure_parent(tmp)
+        tmp.write_bytes(out.tobytes())
+        del base
+        self._base.release()
+        if self._mm is not None:
+            self._mm.close()
+            self._mm = None
+        os.replace(tmp, self.path)
+        if self._fh is not None:
+            self._fh.close()
+            self._fh = None
+        self.log_path.unlink(missing_ok=True)
+        self.recent.clear()
+        self._map_base()
+
+    def close(self):
+        with self.lock:
+            if len(self.recent) >= self.compact_threshold // 4:
+                self._compact_locked()
+            if self._fh is not None:
+                self._fh.close()
+                self._fh = None
+            self._base.release()
+            if self._mm is not None:
+                self._mm.close()
+                self._mm = None
+
+def done_index_path(settings) -> Path:
+    return settings.done_index_path or settings.out_ok_md.with_name(settings.out_ok_md.name + ".done")
+
+def open_done_index(settings, rebuild: bool = False) -> DoneIndex:
+    """인덱스가 없으면(또는 rebuild=True) 기존 JSONL 출력에서 만든다"""
+    path = done_index_path(settings)
+    outputs = (settings.out_ok_html, settings.out_ok_md, settings.out_err)
+    log_path = path.with_name(path.name + ".log")
+    missing = not path.exists() and not log_path.exists()
+    if rebuild or (missing and any(p and (p.exists() or shard_dir(p).exists()) for p in outputs)):
+        print(f"[INFO] done-index 재생성: {path}")
+        return DoneIndex.rebuild(path, *outputs)
+    return DoneIndex.open(path)
@@ -1,21 +1,35 @@
 # -*- coding: utf-8 -*-
 import json
+from json.decoder import scanstring
 from pathlib import Path
+from typing import Iterator
 from .paths import ensure_parent
+from .shard_store import iter_shard_urls
+
+_URL_PREFIX = '{"url": "'
 
 def append_jsonl(path: Path, obj: dict):
     ensure_parent(path)
     with path.open("a", encoding="utf-8", newline="\n") as fw:
         fw.write(json.dumps(obj, ensure_ascii=False) + "\n")
 
-def load_done_urls(*paths: Path) -> set[str]:
-    done = set()
+def iter_jsonl_urls(*paths: Path) -> Iterator[str]:
+    """레코드의 "url" 만 꺼냄. append_jsonl/JsonlSink 레코드는 url 이 첫 키이므로
+    본문(clean_html, markdown)은 파싱하지 않고 url 문자열만 디코딩한다."""
     for p in paths:
-        if not p or not p.exists(): continue
+        if not p: continue
+        # --output-format shards 로 기록된 출력은 샤드 인덱스에서
+        yield from iter_shard_urls(p)
+        if not p.exists(): continue
         with p.open(encoding="utf-8") as f:
             for ln in f:
                 try:
+                    if ln.startswith(_URL_PREFIX):
+                        yield scanstring(ln, len(_URL_PREFIX))[0]
+                        continue
                     obj = json.loads(ln)
-                    if "url" in obj: done.add(obj["url"])
+                    if "url" in obj: yield obj["url"]
                 except: pass
-    return done
+
+def load_done_urls(*paths: Path) -> set[str]:
+    return set(iter_jsonl_urls(*paths))
@@ -0,0 +1,160 @@
+# -*- coding: utf-8 -*-
+import threading, time
+from array import array
+from pathlib import Path
+from typing import List, Optional, Tuple
+from .done_index import url_hash
+from .paths import ensure_parent
+from ..utils.simhash import hamming
+
+_MAX_BAND_BITS = 24  # band 가 이보다 넓으면 하위 비트만 bucket 키로 (같은 band → 같은 키는 그대로 성립)
+
+class NearDupIndex:
+    """64-bit SimHash 근접 중복 인덱스 (LSH band + 배열 기반 체인).
+
+    hamming 거리 ≤ threshold 인 두 서명은 threshold+1 개로 나눈 band 중 적어도 하나가 완전히 같다
+    (비둘기집 원리). band 마다 bucket head 배열(int32)과 문서별 next 배열로 연결 리스트를 만들어
+    후보만 비교한다. URL 해시 → 문서 번호는 open addressing 배열(int32, 절반 이하로 채움)로 찾는다.
+    문서당 메모리: 서명 8 + URL 해시 8 + URL 오프셋 8 + band 수 × 4 + URL 슬롯 ~8 + stale 1 바이트.
+
+    이미 있는 URL 이 같은 서명으로 다시 오면 아무것도 쓰지 않고, 서명이 바뀌었으면 새 레코드를 덧붙이고
+    이전 문서는 stale 로 표시해서 후보에서 뺀다 (다시 열 때도 같은 URL 의 마지막 레코드만 유효).
+
+    <path>      : (simhash, url_hash, url 오프셋) uint64 레코드 append-only
+    <path>.urls : 대표(canonical) URL 목록 (중복으로 판정됐을 때만 오프셋으로 읽음)
+    """
+    def __init__(self, path: Path, threshold: int = 3):
+        self.path = Path(path)
+        self.urls_path = self.path.with_name(self.path.name + ".urls")
+        self.threshold = max(0, threshold)
+        nb = self.threshold + 1
+        self.bands: List[Tuple[int, int]] = []  # (shift, mask)
+        for i in range(nb):
+            lo, hi = i * 64 // nb, (i + 1) * 64 // nb
+            self.bands.append((lo, (1 << min(hi - lo, _MAX_BAND_BITS)) - 1))
+        self.heads = [array("i", [-1]) * (mask + 1) for _, mask in self.bands]
+        self.nexts = [array("i") for _ in self.bands]
+        self.sigs = array("Q")
+        self.url_hashes = array("Q")
+        self.offsets = array("Q")
+        self.stale = bytearray()                # 같은 URL 의 더 새 레코드로 대체된 문서
+        self.slots = array("i", [-1]) * 1024    # url_hash → 문서 번호 (open addressing)
+        self.live = 0
+        self.lock = threading.Lock()
+        self._fh = None
+        self._urls_fh = None
+        self._urls_read = None
+        self.stats = {"docs": 0, "dups": 0, "compared": 0}
+
+    @classmethod
+    def open(cls, path: Path, threshold: int = 3) -> "NearDupIndex":
+        idx = cls(path, threshold)
+        if idx.path.exists():
+            t0 = time.perf_counter()
+            recs = array("Q")
+            recs.frombytes(idx.path.read_bytes()[: idx.path.stat().st_size // 24 * 24])
+            for sig, uh, off in zip(recs[0::3], recs[1::3], recs[2::3]):
+                idx._insert(sig, uh, off)
+            if idx.live:
+                print(f"[INFO] near-dup index: {idx.live} docs ({time.perf_counter() - t0:.1f}s)")
+        return idx
+
+    def _slot(self, uh: int) -> int:
+        """uh 가 있는 슬롯, 없으면 넣을 빈 슬롯"""
+        slots, mask = self.slots, len(self.slots) - 1
+        j = uh & mask
+        while slots[j] >= 0 and self.url_hashes[slots[j]] != uh:
+            j = (j + 1) & mask
+        return j
+
+    def _grow(self):
+        old = self.slots
+        self.slots = array("i", [-1]) * (len(old) * 2)
+        for i in old:
+            if i >= 0:
+                self.slots[self._slot(self.url_hashes[i])] = i
+
+    def _insert(self, sig: int, uh: int, off: int):
+        i = len(self.sigs)
+        j = self._slot(uh)
+        prev = self.slots[j]
+        if prev >= 0:
+            self.stale[prev] = 1
+        else:
+            self.live += 1
+        self.stale.append(0)
+        self.sigs.append(sig)
+        self.url_hashes.append(uh)
+        self.offsets.append(off)
+        for (shift, mask), head, nxt in zip(self.bands, self.heads, self.nexts):
+            key = sig >> shift & mask
+            nxt.append(head[key])
+            head[key] = i
+        self.slots[j] = i
+        if self.live * 2 > len(self.slots):
+            self._grow()
+
+    def _nearest(self, sig: int, uh: int) -> Optional[Tuple[int, int]]:
+        best = None
+        seen = set()
+        for (shift, mask), head, nxt in zip(self.bands, self.heads, self.nexts):
+            i = head[sig >> shift & mask]
+            while i >= 0:
+                if i not in seen:
+                    seen.add(i)
+                    if self.url_hashes[i] != uh and not self.stale[i]:
+                        d = hamming(sig, self.sigs[i])
+                        if d <= self.threshold and (best is None or d < best[1]):
+                            best = (i, d)
+                            if d == 0:
+                                self.stats["compared"] += len(seen)
+                                return best
+                i = nxt[i]
+        self.stats["compared"] += len(seen)
+        return best
+
+    def _url_at(self, i: int) -> str:
+        if self._urls_fh is not None:
+            self._urls_fh.flush()
+        if self._urls_read is None:
+            self._urls_read = self.urls_path.open("rb")
+        self._urls_read.seek(self.offsets[i])
+        return self._urls_read.readline().decode("utf-8").rstrip("\n")
+
+    def check_and_add(self, sig: int, url: str) -> Optional[Tuple[str, int]]:
+        """근접 중복이면 (대표 URL, hamming 거리), 아니면 None 을 돌려주고 이 문서를 대표로 등록.
+        파일에 쓰므로 이벤트 루프에서는 asyncio.to_thread 로 부른다"""
+        uh = url_hash(url)
+        with self.lock:
+            cur = self.slots[self._slot(uh)]
+            if cur >= 0 and self.sigs[cur] == sig:
+                return None  # 이미 대표로 등록된 같은 문서
+            hit = self._nearest(sig, uh)
+            if hit is not None:
+                self.stats["dups"] += 1
+                return self._url_at(hit[0]), hit[1]
+            if self._fh is None:
+                ensure_parent(self.path)
+                self._fh = self.path.open("ab")
+                self._urls_fh = self.urls_path.open("ab")
+            off = self._urls_fh.tell()
+            self._urls_fh.write(url.replace("\n", " ").encode("utf-8") + b"\n")
+            rec = array("Q", (sig, uh, off))
+            self._fh.write(rec.tobytes())
+            self._insert(sig, uh, off)
+            self.stats["docs"] += 1
+            return None
+
+    def summary(self) -> str:
+        st = self.stats
+        return f"docs={self.live} new={st['docs']} dups={st['dups']} compared={st['compared']}"
+
+    def close(self):
+        with self.lock:
+            for fh in (self._fh, self._urls_fh, self._urls_read):
+                if fh is not None:
+                    fh.close()
+            self._fh = self._urls_fh = self._urls_read = None
+
+def near_dup_index_path(settings) -> Path:
+    return settings.dedup_index_path or settings.out_ok_md.with_name(settings.out_ok_md.name + ".simhash")
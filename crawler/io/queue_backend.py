@@ -0,0 +1,285 @@
+# -*- coding: utf-8 -*-
+import json, sqlite3, threading, time
+from pathlib import Path
+from typing import Dict, Iterable, List, Set, Tuple
+from .paths import ensure_parent
+from .urlio import chunked
+
+PENDING, LEASED, DONE, FAILED = 0, 1, 2, 3
+ATTEMPTS_EXHAUSTED = "lease attempts exhausted"
+
+class QueueBackend:
+    """coordinator/worker 가 공유하는 작업 큐 인터페이스.
+
+    URL 은 origin 단위로 lease 한다 (한 origin 은 한 워커만 → origin 동시성 제한 유지).
+    lease 는 lease_until 까지 유효하고, 만료되면 남은 URL 은 다시 대기 상태가 된다.
+    max_attempts 번 lease 하고도 끝나지 않은 URL 은 실패 처리하면서 error 결과 job 을 남긴다
+    (결과를 수거하는 쪽이 err 레코드로 기록 → 출력 어디에도 없이 사라지지 않음).
+    """
+    def seed(self, items: Iterable[Tuple[str, str]], signature: str = "") -> bool:
+        """(origin, url) 적재. 같은 signature 로 이미 적재돼 있으면 건너뛰고 False"""
+        raise NotImplementedError
+
+    def lease(self, owner: str, max_origins: int, per_origin: int, ttl: float) -> Dict[str, List[str]]:
+        raise NotImplementedError
+
+    def renew(self, owner: str, origins: Iterable[str], ttl: float):
+        raise NotImplementedError
+
+    def complete(self, owner: str, items: List[Tuple[str, dict]], keep_results: bool = True) -> Set[str]:
+        """(origin, job) 결과 제출. 진행 중 URL 이 더 없어서 lease 가 풀린 origin 들을 반환.
+        keep_results=False 면 완료 표시만 하고 job 은 저장하지 않음 (결과를 다른 경로로 넘기는 경우)"""
+        raise NotImplementedError
+
+    def release(self, owner: str, origins: Iterable[str]):
+        raise NotImplementedError
+
+    def requeue_expired(self) -> int:
+        raise NotImplementedError
+
+    def requeue_missing(self, written) -> int:
+        """DONE 인데 출력에 없는 URL(coordinator 가 기록 전에 죽은 경우)을 다시 대기 상태로"""
+        raise NotImplementedError
+
+    def fetch_results(self, limit: int) -> List[Tuple[int, dict]]:
+        raise NotImplementedError
+
+    def ack_results(self, ids: List[int]):
+        raise NotImplementedError
+
+    def finished(self) -> bool:
+        """대기/진행 중인 URL 이 없음 (결과 수거 여부와는 별개)"""
+        raise NotImplementedError
+
+    def counts(self) -> Dict[str, int]:
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+class SqliteQueue(QueueBackend):
+    """외부 서비스 없이 sqlite 파일 하나로 동작하는 구현 (WAL, 여러 프로세스가 같은 파일 사용).
+    WAL 은 공유 메모리(-shm)로 잠금을 조정하므로 한 호스트 안의 프로세스끼리만 쓸 수 있다.
+    NFS 등 네트워크 파일시스템에 두고 여러 노드에서 열면 안 된다 (여러 노드는 서버형 backend 필요).
+
+    lease 할 origin 은 pending_origins 테이블(owner 가 없고 대기 URL 이 있는 origin)에서 고른다.
+    origin 이 풀리거나 URL 이 대기 상태로 돌아갈 때마다 _mark_ready 로 다시 넣고, lease 때 빼므로
+    lease 비용이 전체 origin 수와 무관하다."""
+    def __init__(self, path: Path, max_attempts: int = 3):
+        self.path = Path(path)
+        self.max_attempts = max_attempts
+        ensure_parent(self.path)
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(str(self.path), timeout=30, isolation_level=None, check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.executescript("""
+            CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+            CREATE TABLE IF NOT EXISTS origins (
+                origin TEXT PRIMARY KEY, owner TEXT, lease_until REAL NOT NULL DEFAULT 0);
+            CREATE TABLE IF NOT EXISTS urls (
+                id INTEGER PRIMARY KEY, origin TEXT NOT NULL, url TEXT NOT NULL UNIQUE,
+                state INTEGER NOT NULL DEFAULT 0, owner TEXT, attempts INTEGER NOT NULL DEFAULT 0);
+            CREATE INDEX IF NOT EXISTS urls_origin_state ON urls(origin, state);
+            CREATE INDEX IF NOT EXISTS urls_state ON urls(state);
+            CREATE TABLE IF NOT EXISTS results (id INTEGER PRIMARY KEY, payload TEXT NOT NULL);
+            CREATE TABLE IF NOT EXISTS pending_origins (origin TEXT PRIMARY KEY);
+            CREATE INDEX IF NOT EXISTS origins_lease ON origins(lease_until) WHERE owner IS NOT NULL;
+        """)
+        if self.db.execute("SELECT 1 FROM meta WHERE key='pending_origins'").fetchone() is None:
+            # pending_origins 가 없던 이전 버전의 큐 파일: 한 번만 전체를 훑어서 채움
+            self._tx(self._rebuild_ready)
+
+    def _tx(self, fn, *args):
+        # BEGIN IMMEDIATE: 쓰기 잠금을 먼저 잡아서 lease 경쟁 시 같은 origin 을 두 번 주지 않음
+        with self.lock:
+            self.db.execute("BEGIN IMMEDIATE")
+            try:
+                out = fn(*args)
+            except BaseException:
+                self.db.execute("ROLLBACK")
+                raise
+            self.db.execute("COMMIT")
+            return out
+
+    def _rebuild_ready(self):
+        self.db.execute("DELETE FROM pending_origins")
+        self.db.execute(
+            "INSERT INTO pending_origins SELECT o.origin FROM origins o WHERE o.owner IS NULL "
+            "AND EXISTS (SELECT 1 FROM urls u WHERE u.origin = o.origin AND u.state = ?)", (PENDING,))
+        self.db.execute("INSERT OR REPLACE INTO meta VALUES ('pending_origins', '1')")
+
+    def _fail_exhausted(self, origin: str, owner=None):
+        """origin 의 LEASED URL 중 attempts 를 다 쓴 것의 error 결과를 남김 (바로 뒤에 FAILED 로 바뀜)"""
+        sql = "SELECT url FROM urls WHERE origin = ? AND state = ? AND attempts >= ?"
+        args = (origin, LEASED, self.max_attempts)
+        if owner is not None:
+            sql, args = sql + " AND owner = ?", args + (owner,)
+        self.db.executemany("INSERT INTO results (payload) VALUES (?)", (
+            (json.dumps({"url": u, "html": None, "status": None, "timings": {}, "error": ATTEMPTS_EXHAUSTED},
+                        ensure_ascii=False),)
+            for (u,) in self.db.execute(sql, args).fetchall()))
+
+    def _mark_ready(self, origins: Iterable[str]):
+        """lease 가능해졌을 수 있는 origin 을 pending_origins 에 (origin 하나당 인덱스 조회 한 번)"""
+        self.db.executemany(
+            "INSERT OR IGNORE INTO pending_origins SELECT origin FROM origins WHERE origin = ? AND owner IS NULL "
+            "AND EXISTS (SELECT 1 FROM urls WHERE origin = ? AND state = ?)",
+            ((o, o, PENDING) for o in set(origins)))
+
+    def seed(self, items, signature=""):
+        row = self.db.execute("SELECT value FROM meta WHERE key='seed'").fetchone()
+        if signature and row and row[0] == signature:
+            return False
+        for chunk in chunked(items, 50_000):
+            def put(chunk=chunk):
+                self.db.executemany("INSERT OR IGNORE INTO urls (origin, url) VALUES (?, ?)", chunk)
+                origins = {o for o, _ in chunk}
+                self.db.executemany("INSERT OR IGNORE INTO origins (origin) VALUES (?)", ((o,) for o in origins))
+                self._mark_ready(origins)
+            self._tx(put)
+        self._tx(lambda: self.db.execute("INSERT OR REPLACE INTO meta VALUES ('seed', ?)", (signature,)))
+        return True
+
+    def _requeue_expired(self, now: float) -> int:
+        expired = [o for (o,) in self.db.execute(
+            "SELECT origin FROM origins WHERE owner IS NOT NULL AND lease_until < ?", (now,))]
+        n = 0
+        for o in expired:
+            self._fail_exhausted(o)
+            n += self.db.execute(
+                "UPDATE urls SET state = CASE WHEN attempts >= ? THEN ? ELSE ? END, owner = NULL "
+                "WHERE origin = ? AND state = ?",
+                (self.max_attempts, FAILED, PENDING, o, LEASED)).rowcount
+        self.db.executemany("UPDATE origins SET owner = NULL, lease_until = 0 WHERE origin = ?", ((o,) for o in expired))
+        self._mark_ready(expired)
+        return n
+
+    def requeue_expired(self):
+        return self._tx(self._requeue_expired, time.time())
+
+    def lease(self, owner, max_origins, per_origin, ttl):
+        def take():
+            now = time.time()
+            self._requeue_expired(now)
+            out: Dict[str, List[str]] = {}
+            while len(out) < max_origins:
+                rows = self.db.execute("SELECT origin FROM pending_origins LIMIT ?", (max_origins - len(out),)).fetchall()
+                if not rows:
+                    break
+                self.db.executemany("DELETE FROM pending_origins WHERE origin = ?", rows)
+                for (o,) in rows:
+                    picked = self.db.execute(
+                        "SELECT id, url FROM urls WHERE origin = ? AND state = ? LIMIT ?", (o, PENDING, per_origin)).fetchall()
+                    if not picked:  # 대기 URL 이 그새 없어진 origin 은 목록에서 빠지기만 함
+                        continue
+                    self.db.executemany("UPDATE urls SET state = ?, owner = ?, attempts = attempts + 1 WHERE id = ?",
+                                        ((LEASED, owner, i) for i, _ in picked))
+                    self.db.execute("UPDATE origins SET owner = ?, lease_until = ? WHERE origin = ?", (owner, now + ttl, o))
+                    out[o] = [u for _, u in picked]
+            return out
+        return self._tx(take)
+
+    def renew(self, owner, origins, ttl):
+        # 보유 중인 origin 전부를 트랜잭션 하나로 갱신
+        origins = list(origins)
+        if not origins:
+            return
+        until = time.time() + ttl
+        self._tx(lambda: self.db.executemany(
+            "UPDATE origins SET lease_until = ? WHERE origin = ? AND owner = ?",
+            ((until, o, owner) for o in origins)))
+
+    def complete(self, owner, items, keep_results=True):
+        def put():
+            touched = set()
+            for origin, job in items:
+                # lease 가 만료돼서 다른 워커에게 넘어간 URL 의 결과는 버림 (중복 기록 방지)
+                cur = self.db.execute("UPDATE urls SET state = ?, owner = NULL WHERE url = ? AND owner = ? AND state = ?",
+                                      (DONE, job["url"], owner, LEASED))
+                if cur.rowcount and keep_results:
+                    self.db.execute("INSERT INTO results (payload) VALUES (?)", (json.dumps(job, ensure_ascii=False),))
+                touched.add(origin)
+            released = set()
+            for o in touched:
+                cur = self.db.execute(
+                    "UPDATE origins SET owner = NULL, lease_until = 0 WHERE origin = ? AND owner = ? "
+                    "AND NOT EXISTS (SELECT 1 FROM urls WHERE origin = ? AND state = ? AND owner = ?)",
+                    (o, owner, o, LEASED, owner))
+                if cur.rowcount:
+                    released.add(o)
+            # lease_batch_size 보다 URL 이 많은 origin 은 풀리면서 다시 lease 대상이 됨
+            self._mark_ready(released)
+            return released
+        return self._tx(put) if items else set()
+
+    def release(self, owner, origins):
+        origins = list(origins)
+        def put():
+            for o in origins:
+                self._fail_exhausted(o, owner)
+                self.db.execute(
+                    "UPDATE urls SET state = CASE WHEN attempts >= ? THEN ? ELSE ? END, owner = NULL "
+                    "WHERE origin = ? AND owner = ? AND state = ?",
+                    (self.max_attempts, FAILED, PENDING, o, owner, LEASED))
+                self.db.execute("UPDATE origins SET owner = NULL, lease_until = 0 WHERE origin = ? AND owner = ?", (o, owner))
+            self._mark_ready(origins)
+        if origins:
+            self._tx(put)
+
+    def requeue_missing(self, written):
+        n = 0
+        last = 0
+        while True:
+            with self.lock:
+                rows = self.db.execute("SELECT id, url, origin FROM urls WHERE state = ? AND id > ? ORDER BY id LIMIT 50000",
+                                       (DONE, last)).fetchall()
+            if not rows:
+                return n
+            last = rows[-1][0]
+            missing = [(i, o) for i, u, o in rows if u not in written]
+            if missing:
+                def put(missing=missing):
+                    self.db.executemany("UPDATE urls SET state = ?, attempts = 0 WHERE id = ?",
+                                        ((PENDING, i) for i, _ in missing))
+                    self._mark_ready(o for _, o in missing)
+                self._tx(put)
+                n += len(missing)
+
+    def fetch_results(self, limit):
+        with self.lock:
+            rows = self.db.execute("SELECT id, payload FROM results ORDER BY id LIMIT ?", (limit,)).fetchall()
+        return [(i, json.loads(p)) for i, p in rows]
+
+    def ack_results(self, ids):
+        if ids:
+            self._tx(lambda: self.db.executemany("DELETE FROM results WHERE id = ?", ((i,) for i in ids)))
+
+    def finished(self):
+        with self.lock:
+            busy = self.db.execute("SELECT 1 FROM urls WHERE state IN (?, ?) LIMIT 1", (PENDING, LEASED)).fetchone()
+        return not busy
+
+    def counts(self):
+        names = {PENDING: "pending", LEASED: "leased", DONE: "done", FAILED: "failed"}
+        with self.lock:
+            out = {v: 0 for v in names.values()}
+            for st, n in self.db.execute("SELECT state, COUNT(*) FROM urls GROUP BY state"):
+                out[names.get(st, str(st))] = n
+            out["results"] = self.db.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+        return out
+
+    def close(self):
+        with self.lock:
+            self.db.close()
+
+BACKENDS = {"sqlite": SqliteQueue}
+
+def open_queue_backend(spec: str, **kw) -> QueueBackend:
+    """'sqlite:///path/to/queue.sqlite' 또는 경로만 (기본 sqlite)"""
+    scheme, sep, rest = spec.partition("://")
+    if not sep:
+        scheme, rest = "sqlite", spec
+    if scheme not in BACKENDS:
+        raise ValueError(f"unknown queue backend: {scheme} (available: {', '.join(BACKENDS)})")
+    return BACKENDS[scheme](rest, **kw)
@@ -0,0 +1,284 @@
+# -*- coding: utf-8 -*-
+"""크롤 출력(JSONL 또는 --output-format shards) 임의 접근 reader
+
+    python -m crawler.io.reader <출력 경로> get <url> [--field markdown]
+    python -m crawler.io.reader <출력 경로> origin <origin> [--field url]
+    python -m crawler.io.reader <출력 경로> export [--out 파일]
+    python -m crawler.io.reader <출력 경로> index
+
+처음 열 때 <path>.ridx (shards 는 <path>.shards/reader.ridx) 에 정렬된 인덱스를 만들고, 이후에는 mmap 으로
+바로 연다. 출력 파일이 바뀌었으면(크기/수정 시각, 샤드 인덱스 크기) 다시 만든다.
+"""
+import argparse, json, mmap, os, sys, zlib
+from array import array
+from bisect import bisect_left, bisect_right
+from json.decoder import scanstring
+from pathlib import Path
+from typing import Iterator, List, Optional, Tuple
+from .done_index import url_hash
+from .shard_store import iter_shard_index, shard_dir, zstandard
+from .urlio import origin_of
+
+_MAGIC = b"CRIDX1\0\0"
+_URL_PREFIX = b'{"url": "'
+_COLS = 5  # key, file, offset, length, inner (shards: frame 안 오프셋 << 32 | 레코드 길이)
+
+def _record_url(raw, head: int = 4096) -> Optional[str]:
+    """레코드의 url. url 이 첫 키면 앞부분 head 바이트만 디코딩 (본문은 건드리지 않음)"""
+    raw = bytes(raw[:head]) if len(raw) > head else bytes(raw)
+    try:
+        if raw.startswith(_URL_PREFIX):
+            return scanstring(raw.decode("utf-8", "replace"), len(_URL_PREFIX))[0]
+    except ValueError:
+        pass  # url 이 head 보다 긴 경우 → 전체 파싱
+    return None
+
+def _full_url(raw) -> Optional[str]:
+    url = _record_url(raw)
+    if url is not None:
+        return url
+    try:
+        return json.loads(bytes(raw)).get("url")
+    except Exception:
+        return None
+
+class _Section:
+    """key 로 정렬된 열 배열 (mmap 위 memoryview, 복사 없음)"""
+    def __init__(self, buf: memoryview, n: int):
+        self.n = n
+        self.cols = [buf[i * n:(i + 1) * n] for i in range(_COLS)]
+
+    def range(self, key: int) -> Tuple[int, int]:
+        keys = self.cols[0]
+        return bisect_left(keys, key), bisect_right(keys, key)
+
+    def row(self, i: int) -> Tuple[int, int, int, int]:
+        return self.cols[1][i], self.cols[2][i], self.cols[3][i], self.cols[4][i]
+
+def _mmap(path: Path):
+    """읽기 전용 mmap. 빈 파일(크기 0)은 mmap 할 수 없으므로 빈 bytes (레코드 없음)"""
+    with path.open("rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return b""
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+def _build(entries: List[Tuple[int, int, int, int, str]], sig: Tuple[int, int], out: Path):
+    """entries: (file, offset, length, inner, url) → URL 해시/ origin 해시 두 구역으로 정렬해서 저장"""
+    n = len(entries)
+    uh = array("Q", (url_hash(e[4]) for e in entries))
+    oh = array("Q", (url_hash(origin_of(e[4])) for e in entries))
+    cols = [array("Q", (e[c] for e in entries)) for c in range(4)]
+    del entries  # 열 배열만 남기고 url 문자열 목록은 정렬 전에 놓아줌
+    parts = [_MAGIC, array("Q", (n, sig[0], sig[1])).tobytes()]
+    for keys in (uh, oh):
+        # 안정 정렬이라 같은 키 안에서는 기록 순서(나중 레코드가 뒤)가 유지됨 → (key, i) 튜플을 만들 필요 없음
+        order = sorted(range(n), key=keys.__getitem__)
+        for col in [keys] + cols:
+            parts.append(array("Q", map(col.__getitem__, order)).tobytes())
+        del order
+    tmp = out.with_name(out.name + ".tmp")
+    tmp.write_bytes(b"".join(parts))
+    os.replace(tmp, out)
+
+class OutputReader:
+    """출력 하나(out_ok_md / out_ok_html / out_err)에 대한 URL 조회, origin 별 순회, 원본 바이트 순회"""
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.sharded = shard_dir(self.path).exists() and not self.path.exists()
+        self.index_path = (shard_dir(self.path) / "reader.ridx") if self.sharded else self.path.with_name(self.path.name + ".ridx")
+        self.files: List[Path] = []
+        self._maps = {}
+        self._frame_cache: Tuple[Optional[Tuple[int, int]], bytes] = (None, b"")
+        self._load()
+
+    # ---- 인덱스 ----
+    def _signature(self) -> Tuple[int, int]:
+        if self.sharded:
+            idx = sorted(shard_dir(self.path).glob("part-*.idx"))
+            return len(idx), sum(p.stat().st_size for p in idx)
+        st = self.path.stat()
+        return st.st_size, st.st_mtime_ns
+
+    def _scan(self) -> List[Tuple[int, int, int, int, str]]:
+        entries = []
+        if self.sharded:
+            ids = {}
+            for url, f, off, ln, roff, rlen in iter_shard_index(self.path):
+                fid = ids.setdefault(f, len(ids))
+                entries.append((fid, off, ln, roff << 32 | rlen, url))
+            self.files = list(ids)
+            return entries
+        self.files = [self.path]
+        with self.path.open("rb") as f:
+            off = 0
+            for ln in f:
+                url = _full_url(ln)
+                if url is not None and ln.endswith(b"\n"):
+                    entries.append((0, off, len(ln), 0, url))
+                off += len(ln)
+        return entries
+
+    def _files_path(self) -> Path:
+        return self.index_path.with_name(self.index_path.name + ".files")
+
+    def _load(self):
+        sig = self._signature()
+        fresh = False
+        if self.index_path.exists():
+            with self.index_path.open("rb") as f:
+                head = f.read(32)
+            fresh = len(head) == 32 and head[:8] == _MAGIC and tuple(array("Q", head[8:32])[1:]) == sig
+        if not fresh:
+            print(f"[INFO] reader index 생성: {self.index_path}", file=sys.stderr)
+            _build(self._scan(), sig, self.index_path)
+            self._files_path().write_text("\n".join(str(p) for p in self.files), encoding="utf-8")
+        else:
+            self.files = [Path(p) for p in self._files_path().read_text(encoding="utf-8").splitlines()] \
+                if self.sharded else [self.path]
+        self._imm = _mmap(self.index_path)
+        n = array("Q", self._imm[8:16])[0] if len(self._imm) >= 32 else 0
+        body = memoryview(self._imm)[32:32 + n * 8 * _COLS * 2].cast("Q")
+        self.by_url = _Section(body[: n * _COLS], n)
+        self.by_origin = _Section(body[n * _COLS:], n)
+        self.n = n
+
+    def __len__(self) -> int:
+        return self.n
+
+    # ---- 원본 접근 ----
+    def _map(self, fid: int):
+        mm = self._maps.get(fid)
+        if mm is None:
+            mm = self._maps[fid] = _mmap(self.files[fid])
+        return mm
+
+    def _decompress(self, fid: int, data) -> bytes:
+        name = self.files[fid].name
+        if name.endswith(".zst"):
+            return zstandard.ZstdDecompressor().decompress(data)
+        if name.endswith(".gz"):
+            return zlib.decompress(data, 31)
+        return bytes(data)
+
+    def _raw(self, fid: int, off: int, length: int, inner: int) -> memoryview:
+        mm = self._map(fid)
+        if not self.sharded:
+            return memoryview(mm)[off:off + length]
+        key = (fid, off)
+        if self._frame_cache[0] != key:
+            self._frame_cache = (key, self._decompress(fid, memoryview(mm)[off:off + length]))
+        roff, rlen = inner >> 32, inner & 0xFFFFFFFF
+        return memoryview(self._frame_cache[1])[roff:roff + rlen]
+
+    def get_raw(self, url: str) -> Optional[memoryview]:
+        """URL 의 가장 마지막 레코드 원본 바이트 (해시 충돌은 레코드의 url 로 확인)"""
+        lo, hi = self.by_url.range(url_hash(url))
+        for i in range(hi - 1, lo - 1, -1):
+            raw = self._raw(*self.by_url.row(i))
+            if _full_url(raw) == url:
+                return raw
+        return None
+
+    def get(self, url: str) -> Optional[dict]:
+        raw = self.get_raw(url)
+        return json.loads(bytes(raw)) if raw is not None else None
+
+    def iter_origin_raw(self, origin: str) -> Iterator[memoryview]:
+        """origin 의 레코드를 기록 순서대로 (다른 origin 레코드는 건드리지 않음)"""
+        lo, hi = self.by_origin.range(url_hash(origin))
+        for i in range(lo, hi):
+            raw = self._raw(*self.by_origin.row(i))
+            url = _full_url(raw)
+            if url is not None and origin_of(url) == origin:
+                yield raw
+
+    def iter_origin(self, origin: str) -> Iterator[dict]:
+        for raw in self.iter_origin_raw(origin):
+            yield json.loads(bytes(raw))
+
+    def iter_raw(self) -> Iterator[memoryview]:
+        """전체 레코드 원본 바이트를 파일 순서대로. JSONL 은 mmap 조각 그대로(복사 없음),
+        shards 는 frame 을 한 번씩만 풀어서 그 안의 조각을 넘김"""
+        if not self.sharded:
+            mm = self._map(0)
+            view, pos, end = memoryview(mm), 0, len(mm)
+            while pos < end:
+                nl = mm.find(b"\n", pos)
+                nl = end - 1 if nl < 0 else nl
+                yield view[pos:nl + 1]
+                pos = nl + 1
+            return
+        files, offs, lens = self.by_url.cols[1], self.by_url.cols[2], self.by_url.cols[3]
+        frames = sorted({(files[i], offs[i], lens[i]) for i in range(self.n)})  # 파일 안 frame 순서대로
+        for fid, off, length in frames:
+            data = self._decompress(fid, memoryview(self._map(fid))[off:off + length])
+            view, pos = memoryview(data), 0
+            while pos < len(data):
+                nl = data.find(b"\n", pos)
+                nl = len(data) - 1 if nl < 0 else nl
+                yield view[pos:nl + 1]
+                pos = nl + 1
+
+    def close(self):
+        self.by_url = self.by_origin = None
+        self._frame_cache = (None, b"")
+        for mm in list(self._maps.values()) + [self._imm]:
+            if not isinstance(mm, mmap.mmap):
+                continue  # 빈 파일 (b"")
+            try:
+                mm.close()
+            except BufferError:
+                pass  # 호출자가 아직 memoryview 를 들고 있음 → 마지막 참조가 사라질 때 해제
+        self._maps.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(prog="python -m crawler.io.reader", description="크롤 출력 임의 접근")
+    ap.add_argument("path", help="출력 경로 (--ok-md / --ok-html / --err 로 준 경로)")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    g = sub.add_parser("get", help="URL 하나의 레코드")
+    g.add_argument("url")
+    g.add_argument("--field", default=None, help="이 필드만 출력 (예: markdown)")
+    o = sub.add_parser("origin", help="origin 의 레코드 전체 (JSONL)")
+    o.add_argument("origin")
+    o.add_argument("--field", default=None)
+    e = sub.add_parser("export", help="전체 레코드를 JSONL 로 (압축 해제된 원본 바이트)")
+    e.add_argument("--out", default=None)
+    sub.add_parser("index", help="인덱스만 생성/확인")
+    args = ap.parse_args(argv)
+
+    with OutputReader(Path(args.path)) as r:
+        out = sys.stdout.buffer
+        if args.cmd == "get":
+            rec = r.get(args.url)
+            if rec is None:
+                print(f"not found: {args.url}", file=sys.stderr)
+                return 1
+            val = rec.get(args.field) if args.field else rec
+            out.write((val if isinstance(val, str) else json.dumps(val, ensure_ascii=False)).encode("utf-8") + b"\n")
+        elif args.cmd == "origin":
+            for raw in r.iter_origin_raw(args.origin.rstrip("/")):
+                if args.field:
+                    val = json.loads(bytes(raw)).get(args.field)
+                    out.write(json.dumps(val, ensure_ascii=False).encode("utf-8") + b"\n")
+                else:
+                    out.write(raw)
+        elif args.cmd == "export":
+            fh = open(args.out, "wb") if args.out else out
+            try:
+                for raw in r.iter_raw():
+                    fh.write(raw)
+            finally:
+                if args.out:
+                    fh.close()
+        else:
+            print(f"{len(r)} records, {len(r.files)} files → {r.index_path}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+import json, sqlite3, threading, time
+from pathlib import Path
+from typing import Dict, Iterable, List, NamedTuple, Optional, Set
+from .paths import ensure_parent
+from .urlio import origin_of
+
+class PageState(NamedTuple):
+    etag: Optional[str]
+    last_modified: Optional[str]
+    content_hash: Optional[str]
+    checked_at: float
+
+class RefreshState:
+    """증분 재크롤(--incremental) 용 URL 별 상태: ETag/Last-Modified/정리된 HTML 해시/마지막 확인 시각.
+
+    DoneIndex 와 같은 인터페이스(in, add, on_flush, close)를 제공해서 done 자리에 그대로 쓴다.
+    `url in state` 는 "아직 다시 볼 때가 아님" (마지막 확인 후 refresh 간격이 지나지 않음) 을 뜻한다.
+    간격은 URL → origin → 기본값 순으로 찾는다.
+    """
+    def __init__(self, path: Path, default_interval_s: float = 86_400.0,
+                 intervals: Optional[Dict[str, float]] = None, readonly: bool = False):
+        self.path = Path(path)
+        self.default_interval_s = default_interval_s
+        self.intervals = dict(intervals or {})
+        self.readonly = readonly  # 샤드 워커용: 조회만 (기록은 부모가 flush hook 으로)
+        self.lock = threading.Lock()
+        self.pending: Set[str] = set()
+        if readonly:
+            # as_uri 가 ?, #, 공백, Windows 경로(역슬래시/드라이브)를 퍼센트 인코딩한 file: URI 로 만들어 줌
+            uri = self.path.resolve().as_uri() + "?mode=ro"
+            self.db = sqlite3.connect(uri, uri=True, check_same_thread=False, timeout=30)
+        else:
+            ensure_parent(self.path)
+            self.db = sqlite3.connect(str(self.path), check_same_thread=False, timeout=30)
+            self.db.execute("PRAGMA journal_mode=WAL")
+            self.db.execute("PRAGMA synchronous=NORMAL")
+            self.db.execute("""CREATE TABLE IF NOT EXISTS pages (
+                url TEXT PRIMARY KEY, etag TEXT, last_modified TEXT, content_hash TEXT,
+                checked_at REAL NOT NULL, changed_at REAL)""")
+            self.db.commit()
+
+    def interval_for(self, url: str) -> float:
+        iv = self.intervals.get(url)
+        if iv is None:
+            iv = self.intervals.get(origin_of(url), self.default_interval_s)
+        return iv
+
+    def get(self, url: str) -> Optional[PageState]:
+        with self.lock:
+            row = self.db.execute(
+                "SELECT etag, last_modified, content_hash, checked_at FROM pages WHERE url=?", (url,)
+            ).fetchone()
+        return PageState(*row) if row else None
+
+    def __contains__(self, url: str) -> bool:
+        if url in self.pending:
+            return True
+        with self.lock:
+            row = self.db.execute("SELECT checked_at FROM pages WHERE url=?", (url,)).fetchone()
+        return bool(row) and time.time() - row[0] < self.interval_for(url)
+
+    def add(self, url: str):
+        """이번 실행 안에서만 확인한 것으로 취급 (디스크 기록은 on_flush 에서)"""
+        self.pending.add(url)
+
+    def on_flush(self, batch: List[dict]):
+        """JsonlSink flush hook: 기록된 레코드의 검증자/해시/확인 시각을 저장.
+        오류 레코드는 확인 시각을 갱신하지 않음 → 다음 실행에서 refresh 간격을 기다리지 않고 다시 시도"""
+        now = time.time()
+        rows = [
+            (o["url"], o.get("etag"), o.get("last_modified"), o.get("content_hash"), now,
+             now if o.get("change") in ("new", "changed") else None)
+            for o in batch if "url" in o and not o.get("error")
+        ]
+        self._upsert(rows)
+        self.pending.difference_update(o["url"] for o in batch if "url" in o and o.get("error"))
+
+    def _upsert(self, rows: Iterable[tuple]):
+        rows = list(rows)
+        with self.lock:
+            # 값이 없는 칸은 기존 값을 유지 (304 레코드는 확인 시각만 갱신)
+            self.db.executemany("""
+                INSERT INTO pages (url, etag, last_modified, content_hash, checked_at, changed_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT(url) DO UPDATE SET
+                    etag = COALESCE(excluded.etag, etag),
+                    last_modified = COALESCE(excluded.last_modified, last_modified),
+                    content_hash = COALESCE(excluded.content_hash, content_hash),
+                    checked_at = excluded.checked_at,
+                    changed_at = COALESCE(excluded.changed_at, changed_at)
+            """, rows)
+            self.db.commit()
+            self.pending.difference_update(r[0] for r in rows)
+
+    def __len__(self) -> int:
+        with self.lock:
+            return self.db.execute("SELECT COUNT(*) FROM pages").fetchone()[0]
+
+    def close(self):
+        with self.lock:
+            self.db.close()
+
+def refresh_state_path(settings) -> Path:
+    return settings.refresh_state_path or settings.out_ok_md.with_name(settings.out_ok_md.name + ".state.sqlite")
+
+def open_refresh_state(settings, readonly: bool = False) -> RefreshState:
+    intervals: Dict[str, float] = {}
+    if settings.refresh_intervals_path:
+        # {"https://news.example.com": 3600, "https://example.com/page": 600}
+        intervals = {k.rstrip("/") if k.count("/") == 2 else k: float(v)
+                     for k, v in json.loads(Path(settings.refresh_intervals_path).read_text(encoding="utf-8")).items()}
+    return RefreshState(refresh_state_path(settings), settings.refresh_interval_s, intervals, readonly=readonly)
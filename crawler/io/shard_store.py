@@ -0,0 +1,206 @@
+# -*- coding: utf-8 -*-
+import json, os, zlib
+from pathlib import Path
+from typing import Iterator, List, Optional, Tuple
+from .paths import ensure_parent
+
+try:
+    import zstandard
+except ImportError:  # gzip 으로 대체
+    zstandard = None
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # parquet 출력은 pyarrow 가 있을 때만
+    pa = pq = None
+
+COMPRESSIONS = ("zstd", "gzip", "none")
+_EXT = {"zstd": ".jsonl.zst", "gzip": ".jsonl.gz", "none": ".jsonl"}
+
+def shard_dir(path: Path) -> Path:
+    """출력 경로 <path> 의 샤드 디렉터리"""
+    path = Path(path)
+    return path.with_name(path.name + ".shards")
+
+def resolve_compression(name: str) -> str:
+    if name == "zstd" and zstandard is None:
+        print("[INFO] zstandard 모듈이 없어 gzip 으로 압축")
+        return "gzip"
+    return name
+
+class JsonlFile:
+    """기본 출력: JSONL 파일 하나에 append"""
+    def __init__(self, path: Path, fsync: str = "none"):
+        self.path = Path(path)
+        self.fsync = fsync
+        self.fh = None
+
+    def write_lines(self, lines: List[str], batch: List[dict]):
+        if self.fh is None:
+            ensure_parent(self.path)
+            self.fh = self.path.open("a", encoding="utf-8", newline="\n")
+        self.fh.write("".join(lines))
+        self.fh.flush()
+        if self.fsync == "batch":
+            os.fsync(self.fh.fileno())
+
+    def close(self):
+        if self.fh is None:
+            return
+        if self.fsync in ("batch", "close"):
+            os.fsync(self.fh.fileno())
+        self.fh.close()
+        self.fh = None
+
+class ShardedStore:
+    """압축 + 회전하는 샤드 출력.
+
+    <path>.shards/part-NNNNN.jsonl.zst (또는 .gz / .jsonl) : 배치를 frame_max_bytes 이하의 독립 frame 들로
+        압축해서 이어 붙임 → 파일 전체는 zstdcat/zcat 으로 그대로 JSONL 로 읽힘
+    <path>.shards/part-NNNNN.idx : "url \\t frame 오프셋 \\t frame 길이 \\t frame 안 오프셋 \\t 레코드 길이" (TSV)
+        → URL 하나를 읽을 때 frame 하나만 풀면 됨
+    <path>.shards/part-NNNNN.parquet : parquet=True 면 같은 레코드의 columnar 사본 (pyarrow 필요)
+    샤드는 압축 전 크기(max_bytes) 또는 레코드 수(max_records)를 넘으면 새 번호로 넘어간다.
+    """
+    def __init__(self, path: Path, compression: str = "zstd", max_bytes: int = 256 << 20, max_records: int = 0,
+                 frame_max_bytes: int = 1 << 20, level: Optional[int] = None, parquet: bool = False, fsync: str = "none"):
+        self.dir = shard_dir(path)
+        self.compression = resolve_compression(compression)
+        self.max_bytes = max_bytes
+        self.max_records = max_records
+        self.frame_max_bytes = frame_max_bytes
+        self.level = level
+        self.parquet = parquet and pa is not None
+        if parquet and pa is None:
+            print("[WARN] pyarrow 가 없어 parquet 출력은 건너뜀")
+        self.fsync = fsync
+        self.shard = self._last_shard()
+        self.fh = self.idx = self.pq_writer = None
+        self.raw_bytes = self.records = 0
+        self._zc = zstandard.ZstdCompressor(level=level or 3) if self.compression == "zstd" else None
+
+    def _last_shard(self) -> int:
+        # 이어 쓰기: 기존 샤드는 그대로 두고 다음 번호부터
+        nums = [int(p.name[5:10]) for p in self.dir.glob("part-*.idx") if p.name[5:10].isdigit()] if self.dir.exists() else []
+        return max(nums) + 1 if nums else 0
+
+    def _name(self, ext: str) -> Path:
+        return self.dir / f"part-{self.shard:05d}{ext}"
+
+    def _compress(self, data: bytes) -> bytes:
+        if self.compression == "zstd":
+            return self._zc.compress(data)
+        if self.compression == "gzip":
+            c = zlib.compressobj(self.level or 6, zlib.DEFLATED, 31)  # gzip member 하나
+            return c.compress(data) + c.flush()
+        return data
+
+    def _open(self):
+        self.dir.mkdir(parents=True, exist_ok=True)
+        self.fh = self._name(_EXT[self.compression]).open("ab")
+        self.idx = self._name(".idx").open("a", encoding="utf-8", newline="\n")
+        self.raw_bytes = self.records = 0
+
+    def _rotate(self):
+        self._close_shard()
+        self.shard += 1
+
+    def _frames(self, lines: List[str], batch: List[dict]) -> Iterator[Tuple[List[str], List[dict]]]:
+        start, size = 0, 0
+        for i, ln in enumerate(lines):
+            size += len(ln)
+            if size >= self.frame_max_bytes:
+                yield lines[start:i + 1], batch[start:i + 1]
+                start, size = i + 1, 0
+        if start < len(lines):
+            yield lines[start:], batch[start:]
+
+    def write_lines(self, lines: List[str], batch: List[dict]):
+        for f_lines, f_batch in self._frames(lines, batch):
+            if self.fh is None:
+                self._open()
+            encoded = [ln.encode("utf-8") for ln in f_lines]
+            frame = self._compress(b"".join(encoded))
+            off = self.fh.tell()
+            self.fh.write(frame)
+            rows, pos = [], 0
+            for obj, raw in zip(f_batch, encoded):
+                url = str(obj.get("url", "")).replace("\t", " ").replace("\n", " ")
+                rows.append(f"{url}\t{off}\t{len(frame)}\t{pos}\t{len(raw)}\n")
+                pos += len(raw)
+            self.idx.write("".join(rows))
+            if self.parquet:
+                self._write_parquet(f_batch)
+            self.raw_bytes += pos
+            self.records += len(f_batch)
+            self.fh.flush()
+            self.idx.flush()
+            if self.fsync == "batch":
+                os.fsync(self.fh.fileno())
+                os.fsync(self.idx.fileno())
+            if (self.max_bytes and self.raw_bytes >= self.max_bytes) or \
+                    (self.max_records and self.records >= self.max_records):
+                self._rotate()
+
+    def _write_parquet(self, batch: List[dict]):
+        # 스키마가 레코드마다 달라지지 않도록 자주 쓰는 필드만 열로, 나머지는 JSON 문자열 하나로
+        cols = {"url": [], "markdown": [], "clean_html": [], "extra": []}
+        for o in batch:
+            cols["url"].append(o.get("url"))
+            cols["markdown"].append(o.get("markdown"))
+            cols["clean_html"].append(o.get("clean_html"))
+            rest = {k: v for k, v in o.items() if k not in ("url", "markdown", "clean_html")}
+            cols["extra"].append(json.dumps(rest, ensure_ascii=False) if rest else None)
+        table = pa.table({k: pa.array(v, type=pa.string()) for k, v in cols.items()})
+        if self.pq_writer is None:
+            self.pq_writer = pq.ParquetWriter(str(self._name(".parquet")), table.schema,
+                                              compression="zstd" if self.compression == "zstd" else "snappy")
+        self.pq_writer.write_table(table)
+
+    def _close_shard(self):
+        for fh in (self.fh, self.idx):
+            if fh is None:
+                continue
+            if self.fsync in ("batch", "close"):
+                fh.flush()
+                os.fsync(fh.fileno())
+            fh.close()
+        if self.pq_writer is not None:
+            self.pq_writer.close()
+        self.fh = self.idx = self.pq_writer = None
+
+    def close(self):
+        self._close_shard()
+
+def iter_shard_index(path: Path) -> Iterator[Tuple[str, Path, int, int, int, int]]:
+    """(url, 샤드 파일, frame 오프셋, frame 길이, frame 안 오프셋, 레코드 길이)"""
+    d = shard_dir(path)
+    if not d.exists():
+        return
+    for idx in sorted(d.glob("part-*.idx")):
+        data = next((idx.with_name(idx.stem + ext) for ext in _EXT.values()
+                     if idx.with_name(idx.stem + ext).exists()), None)
+        if data is None:
+            continue
+        with idx.open(encoding="utf-8") as f:
+            for ln in f:
+                parts = ln.rstrip("\n").split("\t")
+                if len(parts) != 5:
+                    continue  # 기록 중 끊긴 마지막 줄
+                yield parts[0], data, int(parts[1]), int(parts[2]), int(parts[3]), int(parts[4])
+
+def iter_shard_urls(path: Path) -> Iterator[str]:
+    for row in iter_shard_index(path):
+        yield row[0]
+
+def store_factory(settings):
+    """JsonlSink 가 출력 경로마다 쓸 저장소를 만드는 함수"""
+    if settings.output_format == "shards":
+        compression = resolve_compression(settings.output_compression)
+        def make(path: Path):
+            return ShardedStore(path, compression, settings.shard_max_mb << 20, settings.shard_max_records,
+                                parquet=settings.output_parquet and Path(path) == Path(settings.out_ok_md),
+                                fsync=settings.sink_fsync)
+        return make
+    return lambda path: JsonlFile(path, settings.sink_fsync)
@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+import asyncio, json, time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+from .shard_store import JsonlFile, store_factory
+
+_CLOSE = object()
+FSYNC_POLICIES = ("none", "batch", "close")
+
+class _FileWriter:
+    """출력 파일 하나를 담당: 파일은 한 번만 열고, 큐에서 모은 배치를 스레드에서 기록"""
+    def __init__(self, sink: "JsonlSink", path: Path):
+        self.sink = sink
+        self.path = path
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max(1, sink.queue_size))
+        self.hooks: List[Callable[[List[dict]], None]] = []
+        self.store = None  # JsonlFile 또는 ShardedStore (첫 기록 때 생성)
+        self.task = asyncio.create_task(self._run())
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        closing = False
+        while not closing:
+            item = await self.queue.get()
+            batch: List[dict] = []
+            if item is _CLOSE:
+                closing = True
+            else:
+                batch.append(item)
+                # batch_size 만큼 차거나 flush_interval 이 지나면 기록
+                deadline = loop.time() + self.sink.flush_interval
+                while len(batch) < self.sink.batch_size:
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        item = await asyncio.wait_for(self.queue.get(), timeout)
+                    except asyncio.TimeoutError:
+                        break
+                    if item is _CLOSE:
+                        closing = True
+                        break
+                    batch.append(item)
+            if batch:
+                try:
+                    await asyncio.to_thread(self._write, batch)
+                except Exception as e:
+                    print(f"[ERROR] {self.path}: {len(batch)} records not written: {e}")
+        await asyncio.to_thread(self._close_file)
+
+    def _write(self, batch: List[dict]):
+        t0 = time.perf_counter()
+        if self.store is None:
+            self.store = self.sink.store_factory(self.path)
+        self.store.write_lines([json.dumps(o, ensure_ascii=False) + "\n" for o in batch], batch)
+        for hook in self.hooks:
+            hook(batch)
+        if self.sink.metrics is not None:
+            self.sink.metrics.observe("write", (time.perf_counter() - t0) * 1000)
+
+    def _close_file(self):
+        if self.store is None:
+            return
+        self.store.close()
+        self.store = None
+
+class JsonlSink:
+    """append_jsonl 대체: 파일별 writer task + bounded queue.
+    write() 가 반환된 레코드는 close() 시 모두 기록된다 (SIGINT 로 인한 취소 포함).
+    실제 기록은 store_factory(path) 가 만든 저장소가 담당 (기본: JSONL 파일 하나)."""
+    def __init__(self, batch_size: int = 64, flush_interval: float = 1.0,
+                 queue_size: int = 256, fsync: str = "none",
+                 store_factory: Optional[Callable[[Path], object]] = None, metrics=None):
+        if fsync not in FSYNC_POLICIES:
+            raise ValueError(f"fsync must be one of {FSYNC_POLICIES}: {fsync!r}")
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self.queue_size = queue_size
+        self.fsync = fsync
+        self.store_factory = store_factory or (lambda path: JsonlFile(path, fsync))
+        self.writers: Dict[Path, _FileWriter] = {}
+        self.metrics = metrics  # 배치 기록 시간(stage="write")과 큐 길이
+        if metrics is not None:
+            metrics.gauge("sink_queue_depth", "Records waiting to be written (all outputs)",
+                          lambda: sum(w.queue.qsize() for w in list(self.writers.values())))
+
+    def _writer(self, path: Path) -> _FileWriter:
+        path = Path(path)
+        w = self.writers.get(path)
+        if w is None:
+            w = self.writers[path] = _FileWriter(self, path)
+        return w
+
+    async def write(self, path: Path, obj: dict):
+        # 큐가 가득 차면 대기 → 호출 측 backpressure
+        await self._writer(path).queue.put(obj)
+
+    def add_flush_hook(self, path: Path, hook: Callable[[List[dict]], None]):
+        """배치가 파일에 기록된 직후(writer 스레드에서) hook(batch) 호출"""
+        self._writer(path).hooks.append(hook)
+
+    async def close(self):
+        writers = list(self.writers.values())
+        for w in writers:
+            await w.queue.put(_CLOSE)
+        await asyncio.gather(*(w.task for w in writers), return_exceptions=True)
+        self.writers.clear()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+def sink_from_settings(settings, metrics=None) -> JsonlSink:
+    return JsonlSink(
+        batch_size=settings.sink_batch_size,
+        flush_interval=settings.sink_flush_interval_s,
+        queue_size=settings.sink_queue_size,
+        fsync=settings.sink_fsync,
+        store_factory=store_factory(settings),
+        metrics=metrics,
+    )
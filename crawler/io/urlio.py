@@ -1,7 +1,8 @@
 # -*- coding: utf-8 -*-
+import re
 from pathlib import Path
 from urllib.parse import urlparse
-from typing import List, Dict, Iterable
+from typing import List, Dict, Iterable, Iterator
 from .paths import ensure_parent
 from itertools import islice
 
@@ -9,16 +10,49 @@ def read_urls(path: Path) -> List[str]:
     if not path.exists(): return []
     return [ln.strip() for ln in path.read_text(encoding="utf-8", errors="ignore").splitlines() if ln.strip()]
 
+def iter_urls(path: Path) -> Iterator[str]:
+    """read_urls 의 스트리밍 버전: 파일 전체를 메모리에 올리지 않음"""
+    if not path.exists(): return
+    with path.open(encoding="utf-8", errors="ignore") as f:
+        for ln in f:
+            ln = ln.strip()
+            if ln: yield ln
+
+# 흔한 형태(scheme://host/...)는 urlparse 없이 바로 잘라냄 (대량 적재 시 urlparse 가 병목)
+_ORIGIN_RE = re.compile(r"([A-Za-z][A-Za-z0-9+.-]*)://([^/?#\[\]\t\r\n]*)(?=[/?#]|$)")
+
+def origin_of(u: str) -> str:
+    m = _ORIGIN_RE.match(u)
+    if m and "\t" not in u and "\r" not in u and "\n" not in u:
+        return f"{m.group(1).lower()}://{m.group(2)}"
+    try:
+        p = urlparse(u); return f"{p.scheme}://{p.netloc}"
+    except Exception:
+        return "misc"
+
 def group_by_origin(urls: List[str]) -> Dict[str, List[str]]:
     out: Dict[str, List[str]] = {}
     for u in urls:
-        try:
-            p = urlparse(u); origin = f"{p.scheme}://{p.netloc}"
-        except Exception:
-            origin = "misc"
-        out.setdefault(origin, []).append(u)
+        out.setdefault(origin_of(u), []).append(u)
     return out
 
+class MemoryUrlSource:
+    """group_by_origin 결과를 UrlStore 와 같은 인터페이스로 노출"""
+    def __init__(self, buckets: Dict[str, List[str]]):
+        self.buckets = buckets
+
+    def origins(self) -> Iterator[str]:
+        return iter(sorted(self.buckets))
+
+    def urls(self, origin: str) -> Iterator[str]:
+        return iter(self.buckets.get(origin, ()))
+
+    def __len__(self) -> int:
+        return sum(len(v) for v in self.buckets.values())
+
+    def close(self):
+        pass
+
 def chunked(iterable: Iterable, n: int):
     it = iter(iterable)
     while True:
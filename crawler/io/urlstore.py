@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+import sqlite3
+from pathlib import Path
+from typing import Iterable, Iterator, Optional
+from .paths import ensure_parent
+from .urlio import chunked, iter_urls, origin_of
+
+class UrlStore:
+    """대용량 URL 목록을 origin 별로 sqlite 파일에 흘려 넣고(spill) origin 단위로 꺼낸다.
+    입력 크기와 무관하게 메모리 사용량이 일정하다. 적재는 인덱스 없이 append 만 하고,
+    (origin, url) 인덱스는 적재 후 한 번에 만든다 (중복 URL 은 꺼낼 때 제거)."""
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        ensure_parent(self.path)
+        self.db = sqlite3.connect(str(self.path))
+        self.db.execute("PRAGMA journal_mode=OFF")
+        self.db.execute("PRAGMA synchronous=OFF")
+        self.db.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+        self.db.execute("PRAGMA cache_size=-65536")
+        self.db.execute("CREATE TABLE IF NOT EXISTS urls (origin TEXT NOT NULL, url TEXT NOT NULL)")
+
+    @classmethod
+    def from_file(cls, store_path: Path, urls_path: Path, chunk_size: int = 50_000) -> "UrlStore":
+        """urls_path 가 지난 적재 이후 바뀌지 않았으면 기존 store 를 재사용"""
+        store = cls(store_path)
+        st = urls_path.stat() if urls_path.exists() else None
+        sig = f"{urls_path.resolve()}|{st.st_size}|{st.st_mtime_ns}" if st else ""
+        if store._meta("source") != sig:
+            print(f"[INFO] URL store 적재: {urls_path} → {store_path}")
+            store.db.execute("DELETE FROM meta")
+            store.db.execute("DROP INDEX IF EXISTS urls_origin")
+            store.db.execute("DELETE FROM urls")
+            store.ingest(iter_urls(urls_path), chunk_size)
+            store.db.execute("CREATE INDEX urls_origin ON urls(origin, url)")
+            store.db.execute("INSERT INTO meta VALUES ('source', ?)", (sig,))
+            store.db.commit()
+        return store
+
+    def _meta(self, key: str) -> Optional[str]:
+        row = self.db.execute("SELECT value FROM meta WHERE key=?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def ingest(self, urls: Iterable[str], chunk_size: int = 50_000):
+        for chunk in chunked(urls, chunk_size):
+            self.db.executemany(
+                "INSERT INTO urls (origin, url) VALUES (?, ?)",
+                ((origin_of(u), u) for u in chunk),
+            )
+        self.db.commit()
+
+    def origins(self) -> Iterator[str]:
+        for (o,) in self.db.execute("SELECT DISTINCT origin FROM urls ORDER BY origin"):
+            yield o
+
+    def urls(self, origin: str) -> Iterator[str]:
+        for (u,) in self.db.execute("SELECT DISTINCT url FROM urls WHERE origin=?", (origin,)):
+            yield u
+
+    def __len__(self) -> int:
+        return self.db.execute("SELECT COUNT(DISTINCT url) FROM urls").fetchone()[0]
+
+    def close(self):
+        self.db.close()
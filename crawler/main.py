@@ -5,7 +5,11 @@ from .runner import run
 
 def main():
     settings = build_settings_from_args()
-    asyncio.run(run(settings))
+    try:
+        asyncio.run(run(settings))
+    except KeyboardInterrupt:
+        # run_batches 의 finally 에서 변환 큐와 출력 버퍼는 이미 비워짐
+        print("[INFO] 중단됨 (기록 대기 중이던 레코드는 저장 완료)")
 
 if __name__ == "__main__":
     main()
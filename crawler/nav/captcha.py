@@ -1,5 +1,6 @@
 # -*- coding: utf-8 -*-
-import time, contextlib
+import asyncio, os, sys, time, contextlib
+from typing import Dict, Iterable, Optional
 from playwright.async_api import Page, BrowserContext
 
 CAPTCHA_SELECTORS = [
@@ -7,48 +8,136 @@ CAPTCHA_SELECTORS = [
     "div[class*='cf-challenge']",
     "div[class*='cf-turnstile']",
     "div[id*='challenge-stage']",
-    "text=사람인지 확인",
-    "text=Please verify you are human",
-    "text=Just a moment",
-    "text=Attention Required",
 ]
 
+# 본문(보이는 텍스트 앞부분)에 이 문구가 있으면 챌린지 페이지
+CAPTCHA_TEXTS = [
+    "사람인지 확인",
+    "Please verify you are human",
+    "Just a moment",
+    "Attention Required",
+]
+
+CAPTCHA_TITLE_KEYWORDS = ["verify", "attention required", "just a moment", "cloudflare"]
+
+# selector/본문 문구/title/contentType 검사를 한 번의 evaluate 로
+_CAPTCHA_JS = """
+({ selectors, texts, titleKeys }) => {
+  for (const sel of selectors) {
+    try { if (document.querySelector(sel)) return true; } catch (e) {}
+  }
+  const body = ((document.body && document.body.innerText) || '').slice(0, 5000).toLowerCase();
+  if (texts.some(t => body.includes(t.toLowerCase()))) return true;
+  const title = (document.title || '').toLowerCase();
+  if (titleKeys.some(k => title.includes(k))) return true;
+  return (document.contentType || '').toLowerCase().includes('cf-challenge');
+}
+"""
+
 async def is_captcha_page(page: Page) -> bool:
     try:
-        for s in CAPTCHA_SELECTORS:
-            el = await page.query_selector(s)
-            if el: return True
-        title = (await page.title()) or ""
-        lowt = title.lower()
-        if any(k in lowt for k in ["verify", "attention required", "just a moment", "cloudflare"]):
-            return True
-        ctype = await page.evaluate("document.contentType || ''")
-        if isinstance(ctype, str) and "cf-challenge" in ctype.lower():
-            return True
+        return bool(await page.evaluate(_CAPTCHA_JS, {
+            "selectors": CAPTCHA_SELECTORS, "texts": CAPTCHA_TEXTS, "titleKeys": CAPTCHA_TITLE_KEYWORDS,
+        }))
     except Exception:
-        pass
-    return False
+        return False
 
-async def ensure_solved_for_origin(context: BrowserContext, origin: str, prompt_for_manual: bool=True, headful: bool=True, max_wait_ms: int = 120_000):
+async def precheck_origin(context: BrowserContext, origin: str, nav_timeout_ms: int = 30_000) -> Optional[bool]:
+    """origin 홈을 열어 챌린지 여부 확인. 열지 못하면(탭 생성 실패 포함) None"""
+    page = None
+    try:
+        page = await context.new_page()
+        await page.goto(origin, wait_until="domcontentloaded", timeout=nav_timeout_ms)
+        return await is_captcha_page(page)
+    except Exception:
+        return None
+    finally:
+        if page is not None:
+            with contextlib.suppress(Exception):
+                await page.close()
+
+async def precheck_origins(context: BrowserContext, origins: Iterable[str], concurrency: int = 8,
+                           nav_timeout_ms: int = 30_000) -> Dict[str, Optional[bool]]:
+    """여러 origin 을 최대 concurrency 개씩 동시에 확인"""
+    sem = asyncio.Semaphore(max(1, concurrency))
+    async def one(o: str):
+        async with sem:
+            return o, await precheck_origin(context, o, nav_timeout_ms)
+    return dict(await asyncio.gather(*(one(o) for o in origins)))
+
+_console_buf = bytearray()  # 읽었지만 아직 돌려주지 않은 콘솔 입력
+
+async def _read_line_msvcrt() -> str:
+    import msvcrt  # Windows: Proactor 루프는 add_reader 가 없으므로 키 입력을 폴링
+    chars = []
+    while True:
+        while not msvcrt.kbhit():
+            await asyncio.sleep(0.05)
+        ch = msvcrt.getwche()
+        if ch in "\r\n":
+            print()
+            return "".join(chars)
+        chars.append(ch)
+
+async def read_console_line() -> str:
+    """콘솔에서 한 줄 읽기 (취소 가능, 스레드를 남기지 않음).
+    asyncio.to_thread(input) 은 취소해도 input() 스레드가 남아서 asyncio.run 종료가 Enter 를 기다리며
+    멈춘다. 여기서는 stdin 이 읽기 가능해질 때만 루프에서 os.read 로 읽는다."""
+    if sys.platform == "win32":
+        return await _read_line_msvcrt()
+    loop = asyncio.get_running_loop()
+    try:
+        fd = sys.stdin.fileno()
+    except (AttributeError, ValueError, OSError):
+        raise EOFError
+    while b"\n" not in _console_buf:
+        ready = loop.create_future()
+        try:
+            loop.add_reader(fd, lambda: ready.done() or ready.set_result(None))
+        except (OSError, NotImplementedError):
+            return input()  # stdin 이 일반 파일 등 (읽기가 막히지 않음)
+        try:
+            await ready
+        finally:
+            loop.remove_reader(fd)
+        chunk = os.read(fd, 4096)
+        if not chunk:
+            if not _console_buf:
+                raise EOFError
+            _console_buf.extend(b"\n")
+        _console_buf.extend(chunk)
+    i = _console_buf.index(b"\n")
+    line = bytes(_console_buf[:i])
+    del _console_buf[:i + 1]
+    return line.decode("utf-8", errors="replace").rstrip("\r")
+
+async def solve_origin(context: BrowserContext, origin: str, prompt_for_manual: bool=True, headful: bool=True, max_wait_ms: int = 120_000) -> bool:
+    """챌린지가 있는 origin: 수동 해결을 요청하고(또는 자동 통과를 기다리고) 풀릴 때까지 대기"""
     page = await context.new_page()
     try:
         await page.goto(origin, wait_until="domcontentloaded", timeout=30_000)
-        has_captcha = await is_captcha_page(page)
-        if has_captcha and prompt_for_manual and headful:
+        if not await is_captcha_page(page):
+            return True
+        if prompt_for_manual and headful:
             print(f"[ACTION] Solve CAPTCHA for: {origin}\n브라우저 창에서 사람인증을 완료한 뒤 콘솔에 Enter.")
             try:
-                input()
-            except KeyboardInterrupt:
+                # 입력 대기 중에도 다른 origin 크롤링은 계속 진행
+                await read_console_line()
+            except (KeyboardInterrupt, EOFError):
                 return False
         start = time.perf_counter()
         while True:
             await page.wait_for_timeout(800)
-            solved = not (await is_captcha_page(page))
-            if solved: break
+            if not await is_captcha_page(page):
+                return True
             if (time.perf_counter() - start) * 1000 > max_wait_ms:
                 print(f"[WARN] CAPTCHA still present on {origin} after wait. Continue anyway.")
-                break
-        return True
+                return False
     finally:
         with contextlib.suppress(Exception):
             await page.close()
+
+async def ensure_solved_for_origin(context: BrowserContext, origin: str, prompt_for_manual: bool=True, headful: bool=True, max_wait_ms: int = 120_000):
+    if await precheck_origin(context, origin) is False:
+        return True
+    return await solve_origin(context, origin, prompt_for_manual, headful, max_wait_ms)
@@ -1,18 +1,145 @@
 # -*- coding: utf-8 -*-
+from typing import Optional, Sequence
 from playwright.async_api import Page
 
-CONSENT_BUTTON_XP = [
-    "//button[contains(., '동의') or contains(., '허용') or contains(., '수락')]",
-    "//button[contains(., 'Accept') or contains(., 'Agree') or contains(., 'Allow')]",
-    "//div[contains(@class,'onetrust')]//button[.//text()[contains(.,'Accept') or contains(.,'동의')]]",
+# 쿠키/개인정보 동의 배너: CMP 별 "모두 허용" 버튼 selector (앞에 있을수록 우선)
+CONSENT_SELECTORS = [
+    "#onetrust-accept-btn-handler",                        # OneTrust
+    "#accept-recommended-btn-handler",
+    "#CybotCookiebotDialogBodyLevelButtonLevelOptinAllowAll",  # Cookiebot
+    "#CybotCookiebotDialogBodyButtonAccept",
+    "#didomi-notice-agree-button",                         # Didomi
+    "#truste-consent-button",                              # TrustArc
+    ".qc-cmp2-summary-buttons button[mode='primary']",     # Quantcast
+    "button[data-testid='uc-accept-all-button']",          # Usercentrics
+    ".fc-cta-consent",                                     # Google Funding Choices
+    ".cc-allow", ".cc-dismiss",                            # cookieconsent
 ]
 
+# 동의 버튼을 selector/라벨 어느 쪽으로도 못 찾았을 때만 누르는 닫기 버튼 (동의 없이 배너만 닫힘)
+CONSENT_CLOSE_SELECTORS = [
+    ".onetrust-close-btn-handler",                         # OneTrust
+]
+
+# selector 로 못 찾으면 버튼 라벨로 찾음 (대소문자 무시). 라벨 전체가 같거나, 라벨이 단어 첫머리에
+# 있어야 함 ("모두 동의", "동의합니다", "Accept all" 은 맞고 "미동의", "disagree" 는 아님).
+# 영문 라벨은 단어 끝도 맞아야 함 ("allow" 는 "allowlist" 에 걸리지 않음). 정확히 같은 라벨이 우선.
+CONSENT_LABELS = [
+    "동의", "허용", "수락",
+    "accept", "agree", "allow",
+]
+
+# 라벨이 맞아도 이 표현이 있으면 거절/비동의 버튼으로 보고 건너뜀 (JS 정규식, 대소문자 무시)
+CONSENT_NEGATIONS = [
+    "않", "거부", "거절", r"안\s*함", "비동의", "미동의", "필수",
+    r"\bnot\b", r"\bdon'?t\b", r"\bdis", r"\bdecline", r"\breject", r"\brefuse", r"\bdeny\b",
+    r"\bno\b", r"\bnecessary\b", r"\bessential\b", r"\bonly\b",
+]
+
+# 드롭다운/프로필 메뉴 트리거: 처음 보이는 하나만 hover + click
+MENU_SELECTORS = [
+    "#z1_profile_button",
+    "[aria-haspopup='true'][aria-controls]",
+    "button[aria-haspopup='menu']",
+    "a[aria-haspopup='menu']",
+    "[data-toggle='dropdown']",
+]
+
+MENU_REVEAL_SELECTOR = "#z1_profile_menu_wrapper, [id*='profile_menu_wrapper']"
+
+# 한 번의 evaluate 로 동의 버튼/메뉴 트리거를 찾아 클릭하고, 각 단계에서 DOM 이 바뀌었는지 반환.
+# 배너가 없는 페이지는 querySelector 몇 번으로 끝남.
+_OVERLAY_JS = r"""
+async ({ consent, menus, consentSelectors, consentLabels, consentNegations, closeSelectors, menuSelectors,
+          revealSelector }) => {
+  const size = () => document.getElementsByTagName('*').length + ':' +
+                     ((document.body && document.body.textContent) || '').length;
+  const visible = el => !!(el && (el.offsetWidth || el.offsetHeight || el.getClientRects().length));
+  const q = sel => { try { return document.querySelector(sel); } catch (e) { return null; } };
+  const sleep = ms => new Promise(r => setTimeout(r, ms));
+  const out = { consent: null, menu: null, consent_changed: false, menu_changed: false };
+
+  if (consent) {
+    const before = size();
+    const first = sels => {
+      for (const sel of sels) {
+        const el = q(sel);
+        if (visible(el)) return [el, sel];
+      }
+      return null;
+    };
+    let hit = first(consentSelectors);
+    if (!hit && consentLabels.length) {
+      const esc = s => s.replace(/[.*+?^${}()|[\]\\]/g, '\\$&');
+      // 앞: 텍스트 시작 또는 공백/구두점 뒤, 뒤(영문 라벨만): 영문자가 이어지지 않음
+      const labels = consentLabels.map(l => {
+        l = l.toLowerCase();
+        return [l, new RegExp('(?:^|[\\s\\p{P}])' + esc(l) + (/[a-z]$/.test(l) ? '(?![a-z])' : ''), 'u')];
+      });
+      const negation = consentNegations.length ? new RegExp(consentNegations.join('|'), 'i') : null;
+      const cands = document.querySelectorAll("button, [role='button'], input[type='button'], input[type='submit']");
+      let partial = null;
+      for (const el of cands) {
+        const t = (el.innerText || el.value || '').trim().toLowerCase().replace(/\s+/g, ' ');
+        if (!t || t.length > 40 || (negation && negation.test(t)) || !visible(el)) continue;
+        const exact = labels.find(([l]) => t === l);
+        if (exact) { hit = [el, 'label:' + exact[0]]; break; }
+        const m = !partial && labels.find(([, re]) => re.test(t));
+        if (m) partial = [el, 'label:' + m[0]];
+      }
+      hit = hit || partial;
+    }
+    if (!hit) hit = first(closeSelectors);
+    if (hit) {
+      try { hit[0].click(); out.consent = hit[1]; } catch (e) {}
+      await sleep(300);
+    }
+    out.consent_changed = size() !== before;
+  }
+
+  if (menus) {
+    const before = size();
+    for (const sel of menuSelectors) {
+      const el = q(sel);
+      if (!visible(el)) continue;
+      for (const type of ['pointerover', 'mouseover', 'mouseenter']) {
+        el.dispatchEvent(new MouseEvent(type, { bubbles: true }));
+      }
+      try { el.click(); } catch (e) {}
+      out.menu = sel;
+      break;
+    }
+    const w = q(revealSelector);
+    if (w) {
+      w.setAttribute('aria-hidden', 'false');
+      w.style.display = 'block'; w.style.opacity = '1'; w.style.visibility = 'visible';
+    }
+    if (out.menu) await sleep(150);
+    out.menu_changed = size() !== before;
+  }
+  return out;
+}
+"""
+
+async def handle_overlays(page: Page, consent: bool = True, menus: bool = True,
+                          consent_selectors: Optional[Sequence[str]] = None,
+                          consent_labels: Optional[Sequence[str]] = None,
+                          close_selectors: Optional[Sequence[str]] = None,
+                          menu_selectors: Optional[Sequence[str]] = None) -> dict:
+    """동의 배너 클릭 + 메뉴 펼치기를 한 번의 왕복으로 처리.
+    {"consent": 클릭한 selector/라벨, "menu": 클릭한 selector, "consent_changed", "menu_changed"} 반환"""
+    try:
+        return await page.evaluate(_OVERLAY_JS, {
+            "consent": consent, "menus": menus,
+            "consentSelectors": list(CONSENT_SELECTORS if consent_selectors is None else consent_selectors),
+            "consentLabels": list(CONSENT_LABELS if consent_labels is None else consent_labels),
+            "consentNegations": CONSENT_NEGATIONS,
+            "closeSelectors": list(CONSENT_CLOSE_SELECTORS if close_selectors is None else close_selectors),
+            "menuSelectors": list(MENU_SELECTORS if menu_selectors is None else menu_selectors),
+            "revealSelector": MENU_REVEAL_SELECTOR,
+        })
+    except Exception as e:
+        return {"consent": None, "menu": None, "consent_changed": False, "menu_changed": False, "error": str(e)[:200]}
+
 async def click_consent(page: Page):
-    for xp in CONSENT_BUTTON_XP:
-        try:
-            btn = await page.wait_for_selector(f"xpath={xp}", timeout=1200)
-            if btn:
-                await btn.click()
-                await page.wait_for_timeout(300)
-        except Exception:
-            pass
+    return await handle_overlays(page, consent=True, menus=False)
@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+import json, os, random
+from pathlib import Path
+from typing import Dict, List, Optional, Set
+from ..io.paths import ensure_parent
+
+class NavProfiles:
+    """origin 별로 캡처 단계(consent, menus, scroll ...)가 실제로 DOM(요소 수/텍스트 길이)을 바꿨는지 기록.
+
+    min_samples 번 이상 실행해서 한 번도 효과가 없던 단계는 건너뛰고, reprobe_rate 확률로 다시 확인한다.
+    파일 형식: {origin: {step: [runs, useful, total_ms]}}
+    """
+    def __init__(self, path: Optional[Path] = None, min_samples: int = 3, reprobe_rate: float = 0.05):
+        self.path = Path(path) if path else None
+        self.min_samples = min_samples
+        self.reprobe_rate = reprobe_rate
+        self.data: Dict[str, Dict[str, List[float]]] = {}
+        self.touched: Set[str] = set()
+
+    @classmethod
+    def load(cls, path: Optional[Path], **kw) -> "NavProfiles":
+        prof = cls(path, **kw)
+        if prof.path and prof.path.exists():
+            try:
+                prof.data = json.loads(prof.path.read_text(encoding="utf-8"))
+            except Exception as e:
+                print(f"[WARN] nav profile 읽기 실패, 새로 학습: {e}")
+        return prof
+
+    def should_run(self, origin: str, step: str) -> bool:
+        runs, useful, _ = self.data.get(origin, {}).get(step, (0, 0, 0))
+        if runs < self.min_samples or useful > 0:
+            return True
+        return random.random() < self.reprobe_rate
+
+    def record(self, origin: str, step: str, useful: bool, ms: float):
+        st = self.data.setdefault(origin, {}).setdefault(step, [0, 0, 0])
+        st[0] += 1
+        st[1] += int(useful)
+        st[2] += ms
+        self.touched.add(origin)
+
+    def avg_ms(self, origin: str, step: str) -> int:
+        runs, _, total = self.data.get(origin, {}).get(step, (0, 0, 0))
+        return int(total / runs) if runs else 0
+
+    def save(self):
+        if not self.path or not self.touched:
+            return
+        # 샤드 워커가 같은 파일을 쓰므로 디스크 내용에 이번 실행에서 건드린 origin 만 덮어씀
+        merged: Dict[str, Dict[str, List[float]]] = {}
+        if self.path.exists():
+            try:
+                merged = json.loads(self.path.read_text(encoding="utf-8"))
+            except Exception:
+                merged = {}
+        merged.update({o: self.data[o] for o in self.touched})
+        ensure_parent(self.path)
+        tmp = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(merged, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp, self.path)
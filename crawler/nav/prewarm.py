@@ -4,16 +4,21 @@ from playwright.async_api import BrowserContext
 
 async def prewarm_origin(context: BrowserContext, origin: str, wait_ms_headful=300, wait_ms_headless=150, headful=True, nav_timeout_ms=12_000) -> dict:
     timings = {}
-    page = await context.new_page()
-    page.set_default_navigation_timeout(nav_timeout_ms)
-    page.set_default_timeout(8000)
+    page = None
     t0 = time.perf_counter()
+    timings["prewarm_ok"] = False
     try:
+        # 탭 생성 실패(브라우저 종료 등)도 prewarm 실패로만 처리
+        page = await context.new_page()
+        page.set_default_navigation_timeout(nav_timeout_ms)
+        page.set_default_timeout(8000)
         await page.goto(origin, wait_until="domcontentloaded", timeout=nav_timeout_ms)
         await page.wait_for_timeout(wait_ms_headful if headful else wait_ms_headless)
+        timings["prewarm_ok"] = True
     except Exception:
         pass
     timings["prewarm_ms"] = int((time.perf_counter() - t0) * 1000)
-    with contextlib.suppress(Exception):
-        await page.close()
+    if page is not None:
+        with contextlib.suppress(Exception):
+            await page.close()
     return timings
@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+from typing import Dict, Set
+from playwright.async_api import BrowserContext, Page, Request
+
+_INFLIGHT_TYPES = ("fetch", "xhr")
+
+class InflightTracker:
+    """페이지별 진행 중 fetch/XHR 요청을 Playwright 요청 이벤트로 센다.
+
+    페이지의 fetch/XMLHttpRequest 를 감싸지 않으므로 사이트 동작을 바꾸지 않고, 워커/sendBeacon
+    처럼 JS 래퍼로는 안 보이던 요청도 브라우저가 보낸 것이면 잡힌다. settle 루프(페이지 안)는
+    컨텍스트에 노출한 바인딩 window.__h2mInflight() 로 현재 수를 읽는다.
+    """
+    def __init__(self):
+        self.pending: Dict[Page, Set[Request]] = {}
+
+    def attach(self, page: Page):
+        if page in self.pending:
+            return
+        reqs = self.pending[page] = set()
+        page.on("request", lambda r: reqs.add(r) if r.resource_type in _INFLIGHT_TYPES else None)
+        page.on("requestfinished", reqs.discard)
+        page.on("requestfailed", reqs.discard)
+        page.on("close", lambda _p: self.pending.pop(page, None))
+
+    def count(self, page: Page) -> int:
+        return len(self.pending.get(page, ()))
+
+    async def install(self, context: BrowserContext):
+        context.on("page", self.attach)
+        for page in context.pages:
+            self.attach(page)
+        await context.expose_binding("__h2mInflight", lambda source: self.count(source["page"]))
+
+# DOM 변화가 quietMs 동안 없고, 스크롤 높이가 더 늘지 않고, 진행 중 요청이 없으면 바로 반환.
+# long-polling 처럼 요청이 계속 열려 있는 페이지는 DOM 이 4×quietMs 동안 조용하면 settle 로 본다.
+_SETTLE_JS = """
+async ({ quietMs, budgetMs, scroll }) => {
+  const t0 = performance.now();
+  const sleep = ms => new Promise(r => setTimeout(r, ms));
+  let lastMut = t0, mutations = 0;
+  const mo = new MutationObserver(recs => { mutations += recs.length; lastMut = performance.now(); });
+  try {
+    mo.observe(document.documentElement || document,
+               { subtree: true, childList: true, attributes: true, characterData: true });
+  } catch (e) {}
+  const height = () => Math.max(document.body ? document.body.scrollHeight : 0,
+                                document.documentElement ? document.documentElement.scrollHeight : 0);
+  // InflightTracker 바인딩이 없으면(다른 컨텍스트에서 호출 등) 네트워크 조건은 항상 idle 로 봄
+  const inflight = async () => {
+    try { return typeof window.__h2mInflight === "function" ? await window.__h2mInflight() : 0; } catch (e) { return 0; }
+  };
+  const h0 = height();
+  let lastH = h0, lastHChange = t0, y = 0, timedOut = false, signals = [];
+  while (true) {
+    const now = performance.now();
+    if (scroll && y + window.innerHeight < height()) {
+      y += Math.floor(window.innerHeight * 0.9);
+      window.scrollTo(0, y);
+    }
+    const h = height();
+    if (h !== lastH) { lastH = h; lastHChange = now; }
+    const domQuiet = now - lastMut >= quietMs;
+    const netIdle = (await inflight()) === 0;
+    const heightStable = now - lastHChange >= quietMs && (!scroll || y + window.innerHeight >= h);
+    signals = [];
+    if (domQuiet) signals.push("dom_quiet");
+    if (netIdle) signals.push("net_idle");
+    if (heightStable) signals.push("height_stable");
+    if (domQuiet && heightStable && (netIdle || now - lastMut >= quietMs * 4)) break;
+    if (now - t0 >= budgetMs) { timedOut = true; break; }
+    await sleep(100);
+  }
+  mo.disconnect();
+  if (window.MathJax && window.MathJax.typesetPromise) {
+    const left = Math.max(0, budgetMs - (performance.now() - t0));
+    await Promise.race([window.MathJax.typesetPromise().catch(() => {}), sleep(left)]);
+    signals.push("mathjax");
+  }
+  if (scroll) window.scrollTo(0, 0);
+  return { ms: Math.round(performance.now() - t0), signals, timed_out: timedOut,
+           mutations, height_growth: lastH - h0 };
+}
+"""
+
+async def wait_settled(page: Page, budget_ms: int = 6000, quiet_ms: int = 400, scroll: bool = True) -> dict:
+    """페이지가 안정될 때까지 대기. {"ms", "signals", "timed_out", "mutations", "height_growth"} 반환"""
+    try:
+        return await page.evaluate(_SETTLE_JS, {"quietMs": quiet_ms, "budgetMs": budget_ms, "scroll": scroll})
+    except Exception as e:
+        # 탐색 중 컨텍스트가 바뀌는 경우 등: 한 번 더 기다리지 않고 다음 단계로
+        return {"ms": 0, "signals": [], "timed_out": False, "error": str(e)[:200]}
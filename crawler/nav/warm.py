@@ -0,0 +1,25 @@
+# -*- coding: utf-8 -*-
+import time
+from typing import Dict
+
+class WarmCache:
+    """origin 별로 쿠키/세션을 마지막으로 잡아 둔 시각. ttl_s 안이면 origin 홈 경유를 생략한다."""
+    def __init__(self, ttl_s: float):
+        self.ttl_s = ttl_s
+        self.warmed: Dict[str, float] = {}
+        self.hops = 0   # 실제로 origin 홈을 거친 횟수
+        self.saved = 0  # warm 상태라 생략한 횟수
+
+    def is_warm(self, origin: str) -> bool:
+        t = self.warmed.get(origin)
+        return t is not None and time.monotonic() - t < self.ttl_s
+
+    def mark(self, origin: str):
+        if self.ttl_s > 0:
+            self.warmed[origin] = time.monotonic()
+
+    def invalidate(self, origin: str):
+        self.warmed.pop(origin, None)
+
+    def summary(self) -> str:
+        return f"hops={self.hops} saved={self.saved} warm_origins={len(self.warmed)}"
@@ -1,121 +1,281 @@
 # -*- coding: utf-8 -*-
-import asyncio, random
-from urllib.parse import urlparse
-from typing import Dict, List
+import asyncio, contextlib, itertools, random, time
+from typing import Awaitable, Callable, List, Optional
 from playwright.async_api import BrowserContext
-from ..browser.page_pool import PagePool
-from ..io.jsonl import append_jsonl, load_done_urls
-from ..io.urlio import read_urls, group_by_origin, chunked
-from ..utils.html import clean_html, html_to_markdown_with_prep
+from ..browser.page_pool import PagePool, PagePoolEmpty
+from ..io.done_index import open_done_index
+from ..io.refresh_state import RefreshState, open_refresh_state
+from ..io.sink import sink_from_settings
+from ..io.urlio import read_urls, group_by_origin, MemoryUrlSource
+from ..io.urlstore import UrlStore
+from ..utils.metrics import Metrics, add_span, open_metrics
+from ..utils.profiling import StageProfiler
 from ..config import Settings
+from ..schemas import ConvertJob
 from .capture import CapturePipeline
+from .convert import ConvertStage
+from .fastpath import HttpFastPath
+from .incremental import conditional_check
+from .scheduler import OriginScheduler
 from ..nav.prewarm import prewarm_origin
-from ..nav.captcha import ensure_solved_for_origin
+from ..nav.captcha import precheck_origins, solve_origin
 
-async def run_batches(context: BrowserContext, settings: Settings):
-    urls_all = read_urls(settings.urls_path)
-    done = load_done_urls(settings.out_ok_html, settings.out_ok_md, settings.out_err)
-    urls_all = [u for u in urls_all if u not in done]
-    if not urls_all:
-        print("모든 URL이 이미 처리됨")
-        return
-
-    buckets = group_by_origin(urls_all)
-    origins_all = sorted([o for o in buckets.keys() if o not in ("misc","")])
-    misc_urls = buckets.get("misc", [])
+def _open_url_source(settings: Settings, done):
+    if settings.stream_urls:
+        # 입력을 sqlite 로 흘려 넣고 origin 단위로 꺼냄 (done 필터는 꺼낼 때 적용)
+        path = settings.url_store_path or settings.out_ok_md.with_name(settings.out_ok_md.name + ".urls.sqlite")
+        return UrlStore.from_file(path, settings.urls_path)
+    urls_all = [u for u in read_urls(settings.urls_path) if u not in done]
+    return MemoryUrlSource(group_by_origin(urls_all))
 
-    origin_semaphores: Dict[str, asyncio.Semaphore] = {
-        o: asyncio.Semaphore(settings.origin_concurrency) for o in origins_all
-    }
+class CrawlStage:
+    """캡처 단계. CapturePipeline/PagePool/fast path 는 start 에서 한 번 만들고, run(source) 를 여러 번
+    불러도 그대로 재사용한다 (lease 를 반복해서 받는 워커가 매번 탭/학습 프로필을 새로 만들지 않게).
+    state 를 주면(증분 모드) 캡처 전에 조건부 요청으로 변경 여부를 확인한다.
+    metrics 를 주면 탭 풀/스케줄러 상태를 gauge 로 등록 (단계별 시간은 job 의 timings.spans 로 전달)"""
+    def __init__(self, context: BrowserContext, settings: Settings,
+                 emit: Callable[[ConvertJob], Awaitable[None]],
+                 state: Optional[RefreshState] = None,
+                 metrics: Optional[Metrics] = None):
+        self.context = context
+        self.s = settings
+        self.emit = emit
+        self.state = state
+        self.metrics = metrics
+        self.cap = CapturePipeline(settings)
+        self.fast = HttpFastPath(context.request, settings) if settings.fast_path else None
+        self.profiler = StageProfiler.from_settings(settings)  # --profile-fraction: 일부 URL 캡처 동안 루프 스택 샘플
+        self.page_pool = PagePool(context, size=settings.concurrency,
+                                  max_uses=settings.page_max_uses, max_heap_mb=settings.page_max_heap_mb)
+        self.sched: Optional[OriginScheduler] = None  # 진행 중인 run 의 스케줄러
 
-    cap = CapturePipeline(settings)
+    async def start(self):
+        await self.page_pool.init()
+        if self.metrics is not None:
+            pool = self.page_pool
+            self.metrics.gauge("page_pool_idle", "Idle pages in the page pool", pool.pool.qsize)
+            self.metrics.gauge("page_pool_wait_ms_max", "Longest page pool acquire wait so far", lambda: pool.stats["wait_ms_max"])
+            self.metrics.gauge("scheduler_active_origins", "Origins currently being crawled",
+                               lambda: len(self.sched.inflight) if self.sched else 0)
+            self.metrics.gauge("scheduler_deferred_origins", "Origins waiting for manual CAPTCHA solving",
+                               lambda: len(self.sched.deferred) if self.sched else 0)
 
-    async def run_one(page_pool: PagePool, u: str, idx: int, total: int):
-        page = await page_pool.acquire()
+    async def _run_one(self, u: str, idx: int, total: int):
+        emit, fast = self.emit, self.fast
+        validators, check_ms = {}, None
+        prev = self.state.get(u) if self.state is not None else None
+        if prev is not None:
+            # 증분 모드: 이전 검증자로 조건부 HEAD 를 먼저 보내고, 안 바뀌었으면 탭을 잡지 않음
+            # (처음 보는 URL 은 비교할 검증자가 없으므로 HEAD 없이 바로 캡처)
+            unchanged, validators, status, check_ms = await conditional_check(
+                self.context.request, u, prev, self.s.fast_path_timeout_ms)
+            if unchanged:
+                await emit({
+                    "url": u, "html": None, "status": status, "error": None, "idx": idx, "total": total,
+                    "timings": {"conditional_ms": check_ms, "total_ms": check_ms, "route": "conditional"},
+                    "change": "unchanged", "validators": validators,
+                })
+                return
+        if fast:
+            reason, html, timings, status, err = await fast.fetch(u)
+            if reason is None:
+                # 정적 HTML 로 충분: 페이지를 잡지 않고 바로 변환으로
+                if check_ms is not None:
+                    timings["conditional_ms"] = check_ms
+                await emit({
+                    "url": u, "html": html, "status": status, "timings": timings,
+                    "error": err, "idx": idx, "total": total, "validators": validators,
+                })
+                return
+            fetch_ms = timings.get("fetch_ms")
+        t_wait = time.perf_counter()
+        page = await self.page_pool.acquire()
+        wait_ms = (time.perf_counter() - t_wait) * 1000
         try:
-            html, timings, status, err = await cap.goto_and_capture(page, u)
-            if html and not err:
-                html_clean = clean_html(html)
+            async with (self.profiler.capture(u) if self.profiler else contextlib.nullcontext()):
+                html, timings, status, err = await self.cap.goto_and_capture(page, u)
+        finally:
+            await self.page_pool.release(page)
+        add_span(timings, "pool_wait", wait_ms)
+        if fast:
+            timings["route"] = f"browser:{reason}" + (f"/{timings['route']}" if timings.get("route") else "")
+            if fetch_ms is not None:
+                timings["fetch_ms"] = fetch_ms
+        if check_ms is not None:
+            timings["conditional_ms"] = check_ms
+        # 페이지는 바로 반납하고 변환은 다음 단계로 넘김
+        await emit({
+            "url": u, "html": html, "status": status, "timings": timings,
+            "error": err, "idx": idx, "total": total, "validators": validators,
+        })
+
+    async def run(self, source, done, origin_filter: Optional[Callable[[str], bool]] = None,
+                  manual_captcha: bool = True):
+        """source 의 URL 을 스케줄러로 캡처해서 emit(job) 으로 넘김 (source 가 빌 때까지)"""
+        context, settings, cap, emit = self.context, self.s, self.cap, self.emit
+        solve_q: asyncio.Queue = asyncio.Queue()
+
+        async def admit(origins: List[str]) -> List[str]:
+            # 새로 들어오는 origin 만 캡차 확인/prewarm (misc 는 대상 origin 이 없음)
+            targets = [o for o in origins if o != "misc"]
+            print(f"[INFO] admit {len(origins)} origins")
+            challenged, checked = set(), set()
+            if settings.headful and targets:
+                # 동시에 확인하고, 챌린지가 뜬 origin 만 수동 해결 큐로 (나머지는 바로 크롤)
+                res = await precheck_origins(context, targets, settings.captcha_check_concurrency, settings.prewarm_nav_timeout_ms)
+                for o, hit in res.items():
+                    if hit is None:
+                        continue
+                    checked.add(o)
+                    if hit:
+                        challenged.add(o)
+                        solve_q.put_nowait(o)
+                    else:
+                        cap.warm.mark(o)
+                if challenged:
+                    print(f"[INFO] CAPTCHA 확인 필요: {len(challenged)} origins")
+            # 캡차 확인 때 이미 홈을 연 origin 은 prewarm 생략
+            rest = [o for o in targets if o not in checked]
+            if settings.prewarm_enable and rest:
+                warmed = await asyncio.gather(*(prewarm_origin(context, o, settings.prewarm_wait_ms_headful, settings.prewarm_wait_ms_headless, settings.headful, settings.prewarm_nav_timeout_ms) for o in rest))
+                for o, t in zip(rest, warmed):
+                    if t.get("prewarm_ok"):
+                        cap.warm.mark(o)
+            return [o for o in origins if o not in challenged]
+
+        async def solver():
+            # 수동 해결은 한 번에 한 origin 씩, 크롤링과 병행
+            while True:
+                o = await solve_q.get()
                 try:
-                    md = html_to_markdown_with_prep(html_clean, u)
+                    if await solve_origin(context, o, prompt_for_manual=manual_captcha, headful=settings.headful):
+                        cap.warm.mark(o)
                 except Exception as e:
-                    md = ""
-                    print(f"[WARN] Markdown 변환 실패: {e}")
-                append_jsonl(settings.out_ok_html, {"url": u, "clean_html": html_clean})
-                append_jsonl(settings.out_ok_md,   {"url": u, "markdown": md, "timings": timings})
-                badge = "✅"
-            else:
-                clean, md = "", ""
-                if html:
-                    clean = clean_html(html)
-                    try:
-                        md = html_to_markdown_with_prep(clean, u)
-                    except Exception as e:
-                        print(f"[WARN] (ERR) Markdown 변환 실패: {e}")
-                append_jsonl(settings.out_err, {
-                    "url": u, "clean_html": clean, "markdown": md,
-                    "status": status, "timings": timings, "error": err or "unknown_error"
-                })
-                badge = "☠️"
-            ms = (timings or {}).get("total_ms")
-            print(f"{badge} {idx}/{total} | {u}" + (f" | {ms} ms" if ms else ""))
-        finally:
-            await page_pool.release(page)
+                    print(f"[WARN] CAPTCHA solve failed for {o}: {e}")
+                finally:
+                    # 풀리지 않았어도 크롤은 진행 (캡차 페이지면 캡처 단계에서 오류로 기록됨)
+                    await sched.add_origin(o)
+
+        async def admit_failed(origin: str, e: Exception):
+            # 캡차 확인/prewarm 에서 예외가 난 origin 은 크롤하지 않고 URL 마다 오류 레코드를 남김
+            for u in source.urls(origin):
+                if u not in done:
+                    await emit({"url": u, "html": None, "status": None, "timings": {},
+                                "error": f"admit_failed: {e!r}", "idx": next(counter), "total": total})
+
+        def wanted(o: str) -> bool:
+            return o != "" and (origin_filter is None or origin_filter(o))
 
-    for batch_idx, origin_batch in enumerate(chunked(origins_all, settings.prewarm_batch_size), 1):
-        print(f"[INFO] === Batch {batch_idx}: {len(origin_batch)} origins ===")
+        origins = source.origins()
+        if hasattr(origins, "__aiter__"):
+            origins = (o async for o in origins if wanted(o))
+        else:
+            origins = (o for o in origins if wanted(o))
+        sched = self.sched = OriginScheduler(
+            origins,
+            lambda o: (u for u in source.urls(o) if u not in done),
+            origin_concurrency=settings.origin_concurrency,
+            max_active_origins=settings.prewarm_batch_size,
+            admit=admit,
+            on_error=admit_failed,
+        )
+        # 스트리밍 모드에서는 전체 개수를 미리 세지 않음 (0 = 알 수 없음)
+        total = len(source) if isinstance(source, MemoryUrlSource) and origin_filter is None else 0
+        counter = itertools.count(1)
 
-        if settings.headful:
-            for origin in origin_batch:
+        async def worker():
+            while True:
+                job = await sched.next_job()
+                if job is None:
+                    return
+                origin, u = job
+                idx = next(counter)
                 try:
-                    await ensure_solved_for_origin(context, origin, prompt_for_manual=True, headful=settings.headful)
+                    await asyncio.sleep(random.uniform(*settings.jitter_range))
+                    await self._run_one(u, idx, total)
+                    done.add(u)
+                except PagePoolEmpty:
+                    raise  # 탭이 모두 죽음: 남은 URL 을 하나씩 실패시키지 않고 실행을 멈춤
                 except Exception as e:
-                    print(f"[WARN] ensure_solved_for_origin failed for {origin}: {e}")
+                    print(f"[WARN] crawl failed for {u}: {e}")
+                    await emit({"url": u, "html": None, "status": None, "timings": {},
+                                "error": f"crawl_failed: {e!r}", "idx": idx, "total": total})
+                finally:
+                    await sched.task_done(origin)
 
-        if settings.prewarm_enable:
-            await asyncio.gather(*(prewarm_origin(context, o, settings.prewarm_wait_ms_headful, settings.prewarm_wait_ms_headless, settings.headful, settings.prewarm_nav_timeout_ms) for o in origin_batch))
+        solver_task = None
+        workers: List[asyncio.Task] = []
+        try:
+            sched.start()
+            solver_task = asyncio.create_task(solver())
+            workers = [asyncio.create_task(worker()) for _ in range(settings.concurrency)]
+            await asyncio.gather(*workers)
+        finally:
+            # 한 워커가 실패하면(PagePoolEmpty 등) 나머지 워커도 멈춤 → 스케줄러는 아래 close() 에서 정리
+            for t in workers:
+                t.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+            if solver_task:
+                solver_task.cancel()
+                await asyncio.gather(solver_task, return_exceptions=True)
+            self.sched = None
+            await sched.close()  # feeder 가 실패했으면 여기서 그 예외가 올라감
 
-        urls_batch: List[str] = []
-        for o in origin_batch:
-            for u in buckets[o]:
-                if u not in done:
-                    urls_batch.append(u)
-        print(f"[INFO] Batch {batch_idx}: crawl {len(urls_batch)} urls")
-
-        sem_global = asyncio.Semaphore(settings.concurrency)
-        page_pool = PagePool(context, size=settings.concurrency)
-        await page_pool.init()
-
-        async def runner(i, u, total):
-            parsed = urlparse(u)
-            origin = f"{parsed.scheme}://{parsed.netloc}"
-            sem_origin = origin_semaphores.get(origin, asyncio.Semaphore(1))
-            async with sem_global, sem_origin:
-                await asyncio.sleep(random.uniform(*settings.jitter_range))
-                await run_one(page_pool, u, i, total)
-                done.add(u)
-
-        tasks = [runner(i, u, len(urls_batch)) for i, u in enumerate(urls_batch, 1)]
-        if tasks:
-            await asyncio.gather(*tasks)
-        await page_pool.close()
-
-    if misc_urls:
-        misc_urls = [u for u in misc_urls if u not in done]
-        print(f"[INFO] === misc crawl {len(misc_urls)} urls ===")
-        sem_global = asyncio.Semaphore(settings.concurrency)
-        sem_misc = asyncio.Semaphore(settings.origin_concurrency)
-
-        page_pool = PagePool(context, size=settings.concurrency)
-        await page_pool.init()
-
-        async def runner(i, u, total):
-            async with sem_global, sem_misc:
-                await asyncio.sleep(random.uniform(*settings.jitter_range))
-                await run_one(page_pool, u, i, total)
-                done.add(u)
-
-        tasks = [runner(i, u, len(misc_urls)) for i, u in enumerate(misc_urls, 1)]
-        if tasks:
-            await asyncio.gather(*tasks)
-        await page_pool.close()
+    async def close(self):
+        await self.page_pool.close()
+        print(f"[INFO] page pool: {self.page_pool.summary()}")
+        print(f"[INFO] origin warm cache: {self.cap.warm.summary()}")
+        if self.fast:
+            print(f"[INFO] http fast path: {self.fast.summary()}")
+        if self.cap.profiles:
+            self.cap.profiles.save()
+        if self.profiler:
+            self.profiler.close()
+
+async def crawl_source(context: BrowserContext, settings: Settings, source, done,
+                       emit: Callable[[ConvertJob], Awaitable[None]],
+                       origin_filter: Optional[Callable[[str], bool]] = None,
+                       manual_captcha: bool = True,
+                       state: Optional[RefreshState] = None,
+                       metrics: Optional[Metrics] = None):
+    """source 하나를 CrawlStage 로 끝까지 캡처 (단일 프로세스/샤드 워커 공용)"""
+    stage = CrawlStage(context, settings, emit, state, metrics)
+    try:
+        await stage.start()
+        await stage.run(source, done, origin_filter, manual_captcha)
+    finally:
+        await stage.close()
+
+def open_done(settings: Settings):
+    """완료 URL 필터: 보통은 done-index, 증분 모드면 refresh 간격이 지나지 않은 URL 을 거르는 RefreshState"""
+    if settings.incremental:
+        return open_refresh_state(settings)
+    return open_done_index(settings, rebuild=settings.done_index_rebuild)
+
+async def run_batches(context: BrowserContext, settings: Settings):
+    done = open_done(settings)
+    source = _open_url_source(settings, done)
+    if isinstance(source, MemoryUrlSource) and not source.buckets:
+        print("모든 URL이 이미 처리됨")
+        done.close()
+        return
+
+    metrics = open_metrics(settings)
+    sink = sink_from_settings(settings, metrics)
+    # url 별로 out_ok_md 또는 out_err 중 하나에 기록되므로 두 파일만 인덱싱
+    sink.add_flush_hook(settings.out_ok_md, done.on_flush)
+    sink.add_flush_hook(settings.out_err, done.on_flush)
+    state = done if settings.incremental else None
+    conv = ConvertStage(settings, sink, state, metrics)
+
+    await conv.start()
+    metrics.start()
+    try:
+        await crawl_source(context, settings, source, done, conv.submit, state=state, metrics=metrics)
+    finally:
+        # 변환 큐를 비운 뒤 writer 를 닫아야 기록 누락이 없음
+        await conv.close()
+        await sink.close()
+        await metrics.close()
+        done.close()
+        source.close()
@@ -1,27 +1,115 @@
 # -*- coding: utf-8 -*-
 import time, random, contextlib, re
+from typing import Optional
 from urllib.parse import urlparse
 from playwright.async_api import Page
 from ..schemas import Timings
 from ..constants import TARGET_SELECTORS
 from ..extract.pdf import looks_like_pdf_url, is_pdf_by_headers
-from ..nav.waits import wait_rendering, deep_scroll_until_stable, wait_for_web_components, open_common_menus
-from ..nav.consent import click_consent
+from ..nav.waits import wait_for_web_components
+from ..nav.settle import wait_settled
+from ..nav.consent import CONSENT_LABELS, CONSENT_SELECTORS, handle_overlays
 from ..nav.captcha import is_captcha_page
+from ..nav.warm import WarmCache
+from ..nav.learn import NavProfiles
 from ..extract.iframe import normalize_iframes_keep_tags
 from ..config import Settings
+from ..utils.metrics import add_span, span
 
 class CapturePipeline:
     def __init__(self, settings: Settings):
         self.s = settings
+        self.warm = WarmCache(settings.origin_warm_ttl_s)
+        self.profiles: Optional[NavProfiles] = None
+        if settings.nav_learning:
+            path = settings.nav_profile_path or settings.out_ok_md.with_name(settings.out_ok_md.name + ".navprofiles.json")
+            self.profiles = NavProfiles.load(path, min_samples=settings.nav_min_samples, reprobe_rate=settings.nav_reprobe_rate)
 
     async def goto_and_capture(self, page: Page, url: str, retries: int = 2):
+        # 페이지는 풀에서 재사용되므로 리스너는 이번 캡처 동안만 붙여 둠
+        got_download = {"hit": False}
+        def on_download(_d):
+            got_download["hit"] = True
+        page.on("download", on_download)
+        try:
+            return await self._capture(page, url, retries, got_download)
+        finally:
+            with contextlib.suppress(Exception):
+                page.remove_listener("download", on_download)
+
+    @staticmethod
+    def _record_settle(timings: Timings, rep: dict):
+        timings["settle_ms"] = rep.get("ms", 0)
+        timings["settle_signals"] = rep.get("signals", [])
+        if rep.get("timed_out"):
+            timings["settle_timed_out"] = True
+
+    def _skip(self, timings: Timings, origin: str, step: str, saved_ms: Optional[int] = None):
+        timings.setdefault("skipped_steps", []).append(step)
+        saved = self.profiles.avg_ms(origin, step) if saved_ms is None else saved_ms
+        timings["saved_ms"] = timings.get("saved_ms", 0) + saved
+
+    def _learn(self, origin: str, step: str, useful: bool, t_start: float):
+        if self.profiles:
+            self.profiles.record(origin, step, useful, (time.perf_counter() - t_start) * 1000)
+
+    def _should_run(self, origin: str, step: str, timings: Timings) -> bool:
+        if not self.profiles or self.profiles.should_run(origin, step):
+            return True
+        self._skip(timings, origin, step)
+        return False
+
+    async def _overlays(self, page: Page, origin: str, timings: Timings):
+        """동의 배너/메뉴를 한 번의 evaluate 로 처리하고 단계별 효과를 학습"""
+        consent = self._should_run(origin, "consent", timings)
+        menus = self._should_run(origin, "menus", timings)
+        if not (consent or menus):
+            return
+        t = time.perf_counter()
+        rep = await handle_overlays(
+            page, consent=consent, menus=menus,
+            consent_selectors=CONSENT_SELECTORS + list(self.s.consent_extra_selectors),
+            consent_labels=CONSENT_LABELS + list(self.s.consent_extra_labels),
+        )
+        if rep.get("consent"):
+            timings["consent_clicked"] = rep["consent"]
+        if rep.get("menu"):
+            timings["menu_opened"] = rep["menu"]
+        if self.profiles:
+            ms = (time.perf_counter() - t) * 1000 / (consent + menus)
+            if consent:
+                self.profiles.record(origin, "consent", rep.get("consent_changed", False), ms)
+            if menus:
+                self.profiles.record(origin, "menus", rep.get("menu_changed", False), ms)
+
+    async def _wait_links(self, page: Page, origin: str, timings: Timings):
+        # 링크가 이미 있으면 기다릴 필요 없음. 없을 때만 대기하고, 나타났는지를 학습
+        with contextlib.suppress(Exception):
+            if await page.evaluate("() => !!document.querySelector('a[href]')"):
+                return
+        if not self._should_run(origin, "links_wait", timings):
+            return
+        t = time.perf_counter()
+        found = False
+        with contextlib.suppress(Exception):
+            found = bool(await page.wait_for_selector("a[href]", timeout=5000))
+        self._learn(origin, "links_wait", found, t)
+
+    async def _settle(self, page: Page, origin: str, timings: Timings):
+        scroll = not self.profiles or self.profiles.should_run(origin, "scroll")
+        rep = await wait_settled(page, budget_ms=self.s.settle_budget_ms, quiet_ms=self.s.settle_quiet_ms, scroll=scroll)
+        self._record_settle(timings, rep)
+        if not self.profiles:
+            return
+        if scroll:
+            self.profiles.record(origin, "scroll", rep.get("height_growth", 0) > 0, rep.get("ms", 0))
+        else:
+            self._skip(timings, origin, "scroll", max(0, self.profiles.avg_ms(origin, "scroll") - rep.get("ms", 0)))
+
+    async def _capture(self, page: Page, url: str, retries: int, got_download: dict):
         timings: Timings = {}
         t0 = time.perf_counter()
 
-        got_download = {"hit": False}
-        page.on("download", lambda d: got_download.update(hit=True))
-
         parsed = urlparse(url); origin = f"{parsed.scheme}://{parsed.netloc}"
         last_err = None
 
@@ -31,17 +119,29 @@ class CapturePipeline:
                     timings["total_ms"] = int((time.perf_counter()-t0)*1000)
                     return None, timings, None, "blocked_pdf_url"
 
-                with contextlib.suppress(Exception):
-                    await page.goto(origin, wait_until="domcontentloaded", timeout=12_000)
-                await page.wait_for_timeout(int(random.uniform(*self.s.jitter_range)*1000))
-
-                resp = await page.goto(url, wait_until="domcontentloaded", timeout=12_000, referer=origin)
+                if self.warm.is_warm(origin):
+                    # prewarm/이전 URL 에서 잡아 둔 세션이 유효하면 홈 경유 + 대기 생략
+                    self.warm.saved += 1
+                    timings["origin_hop_skipped"] = True
+                else:
+                    self.warm.hops += 1
+                    with span(timings, "origin_hop"):
+                        with contextlib.suppress(Exception):
+                            await page.goto(origin, wait_until="domcontentloaded", timeout=12_000)
+                            self.warm.mark(origin)
+                        await page.wait_for_timeout(int(random.uniform(*self.s.jitter_range)*1000))
+
+                with span(timings, "goto"):
+                    resp = await page.goto(url, wait_until="domcontentloaded", timeout=12_000, referer=origin)
                 status = resp.status if resp else None
+                if status in (403, 429):
+                    # 차단/속도 제한 응답이면 다음 URL 에서는 다시 홈을 거쳐 세션을 잡음
+                    self.warm.invalidate(origin)
                 if status and status >= 500:
                     raise RuntimeError(f"http_{status}")
 
-                with contextlib.suppress(Exception):
-                    await page.wait_for_selector("a[href]", timeout=5000)
+                with span(timings, "links_wait"):
+                    await self._wait_links(page, origin, timings)
 
                 if got_download["hit"]:
                     timings["total_ms"] = int((time.perf_counter()-t0)*1000)
@@ -50,11 +150,12 @@ class CapturePipeline:
                     timings["total_ms"] = int((time.perf_counter()-t0)*1000)
                     return None, timings, status, "blocked_pdf_content_type"
 
-                html = await normalize_iframes_keep_tags(page, max_iframes=40, do_light_scroll=False)
+                with span(timings, "serialize_1"):
+                    html = await normalize_iframes_keep_tags(page, max_iframes=40, do_light_scroll=False)
                 text_only = re.sub(r"(?is)<(script|style|noscript)[^>]*>.*?</\\1>", "", html)
                 text_only = re.sub(r"(?is)<[^>]+>", "", text_only).strip()
                 if len(text_only) < 50:
-                    with contextlib.suppress(Exception):
+                    with span(timings, "reload"), contextlib.suppress(Exception):
                         await page.reload(wait_until="domcontentloaded", timeout=12_000)
 
                 with contextlib.suppress(Exception):
@@ -63,24 +164,21 @@ class CapturePipeline:
                         timings["total_ms"] = int((time.perf_counter()-t0)*1000)
                         return None, timings, status, "blocked_pdf_document"
 
+                # 고정 대기/스크롤 대신 DOM·네트워크·스크롤 높이가 안정되는 즉시 진행 (URL 당 budget)
+                with span(timings, "settle"):
+                    await self._settle(page, origin, timings)
                 sel_or = " || ".join([f"document.querySelector('{s}')" for s in TARGET_SELECTORS])
-                with contextlib.suppress(Exception):
-                    ok = await page.wait_for_function(f"() => {sel_or}", timeout=8000)
-                    timings["any_selector_found"] = bool(ok)
+                with span(timings, "selector_check"), contextlib.suppress(Exception):
+                    timings["any_selector_found"] = bool(await page.evaluate(f"() => !!({sel_or})"))
 
-                with contextlib.suppress(Exception):
-                    await page.evaluate("""
-                      const sleep = ms => new Promise(r=>setTimeout(r,ms));
-                      for (let i=0;i<2;i++){ window.scrollBy(0, Math.floor(window.innerHeight*0.9)); await sleep(200); }
-                      window.scrollTo(0,0);
-                    """)
-                await deep_scroll_until_stable(page, max_secs=2)
-                await wait_rendering(page)
-                await wait_for_web_components(page)
-                await click_consent(page)
-                await open_common_menus(page)
-
-                html = await normalize_iframes_keep_tags(page, max_iframes=40, do_light_scroll=False)
+                if self.s.wait_web_components:
+                    with span(timings, "web_components"):
+                        await wait_for_web_components(page, tuple(self.s.web_component_tags))
+                with span(timings, "overlays"):
+                    await self._overlays(page, origin, timings)
+
+                with span(timings, "serialize_2"):
+                    html = await normalize_iframes_keep_tags(page, max_iframes=40, do_light_scroll=False)
                 timings["total_ms"] = int((time.perf_counter()-t0)*1000)
                 return html, timings, status, None
 
@@ -94,17 +192,28 @@ class CapturePipeline:
                         timings["note"] = "nav_error_but_got_content"
                         return html, timings, None, None
 
+        if not self._should_run(origin, "print_fallback", timings):
+            timings["total_ms"] = int((time.perf_counter()-t0)*1000)
+            return None, timings, None, (last_err or "fallback_skipped")
+        t_fb = time.perf_counter()
         try:
             alt = url + ("&" if "?" in url else "?") + "tmpl=component&print=1"
             resp = await page.goto(alt, wait_until="domcontentloaded", timeout=12_000, referer=origin)
             with contextlib.suppress(Exception):
                 await page.emulate_media(media="print")
-            await wait_rendering(page)
-            await deep_scroll_until_stable(page, max_secs=4)
+            self._record_settle(timings, await wait_settled(page, budget_ms=self.s.settle_budget_ms, quiet_ms=self.s.settle_quiet_ms))
             html = await normalize_iframes_keep_tags(page, max_iframes=40, do_light_scroll=False)
+            self._learn(origin, "print_fallback", bool(html and html.strip()), t_fb)
+            add_span(timings, "print_fallback", (time.perf_counter() - t_fb) * 1000)
             timings["total_ms"] = int((time.perf_counter()-t0)*1000)
             timings["route"] = "fallback_print_view"
             return html, timings, (resp.status if resp else None), None
         except Exception as e:
+            self._learn(origin, "print_fallback", False, t_fb)
+            add_span(timings, "print_fallback", (time.perf_counter() - t_fb) * 1000)
             timings["total_ms"] = int((time.perf_counter()-t0)*1000)
             return None, timings, None, (last_err or f"fallback_failed: {e}")
+        finally:
+            # 풀에서 재사용되는 페이지이므로 print 미디어 에뮬레이션을 되돌림
+            with contextlib.suppress(Exception):
+                await page.emulate_media(media=None)
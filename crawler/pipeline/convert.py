@@ -0,0 +1,219 @@
+# -*- coding: utf-8 -*-
+import asyncio, cProfile, os, signal, time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from hashlib import blake2b
+from typing import Dict, List, NamedTuple, Optional, Tuple
+from ..config import Settings
+from ..io.near_dup import NearDupIndex, near_dup_index_path
+from ..io.refresh_state import RefreshState
+from ..io.sink import JsonlSink
+from ..io.urlio import origin_of
+from ..schemas import ConvertJob
+from ..utils.html import clean_html, html_to_markdown_with_prep
+from ..utils.metrics import Metrics, add_span
+from ..utils.profiling import StageProfiler
+from ..utils.simhash import simhash64, tokens
+
+def _ignore_sigint():
+    # Ctrl+C 는 메인 프로세스가 처리 (남은 변환을 마무리한 뒤 종료)
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+def content_hash(clean: str) -> str:
+    return blake2b(clean.encode("utf-8"), digest_size=16).hexdigest()
+
+class Converted(NamedTuple):
+    clean: Optional[str]
+    markdown: Optional[str]  # None → 이전과 같은 내용이라 변환 생략 (증분 모드)
+    error: Optional[str]
+    content_hash: str
+    simhash: Optional[int] = None  # 근접 중복 검사용 (단어 수가 부족하면 None)
+    spans: Optional[Dict[str, float]] = None  # clean_html / markdown / simhash ms
+
+def convert_html(html: str, url: str, prev_hash: Optional[str] = None, simhash_min_tokens: int = 0,
+                 profile_path: Optional[str] = None) -> Converted:
+    """워커 프로세스에서 실행: clean_html → markdown (+ SimHash).
+    정리된 HTML 의 해시가 prev_hash 와 같으면 markdown 변환을 생략한다.
+    simhash_min_tokens > 0 이면 markdown 본문 단어가 그 이상일 때 SimHash 를 같이 계산.
+    profile_path 를 주면 cProfile 결과를 그 경로에 저장 (--profile-fraction 으로 고른 URL)"""
+    if profile_path:
+        prof = cProfile.Profile()
+        try:
+            return prof.runcall(_convert_html, html, url, prev_hash, simhash_min_tokens)
+        finally:
+            os.makedirs(os.path.dirname(profile_path), exist_ok=True)
+            prof.dump_stats(profile_path)
+    return _convert_html(html, url, prev_hash, simhash_min_tokens)
+
+def _convert_html(html: str, url: str, prev_hash: Optional[str], simhash_min_tokens: int) -> Converted:
+    t0 = time.perf_counter()
+    clean = clean_html(html)
+    digest = content_hash(clean)
+    t1 = time.perf_counter()
+    spans = {"clean_html": round((t1 - t0) * 1000, 1)}
+    if prev_hash is not None and digest == prev_hash:
+        return Converted(None, None, None, digest, spans=spans)
+    try:
+        md = html_to_markdown_with_prep(clean, url)
+    except Exception as e:
+        return Converted(clean, "", str(e), digest, spans=spans)
+    t2 = time.perf_counter()
+    spans["markdown"] = round((t2 - t1) * 1000, 1)
+    sig = None
+    if simhash_min_tokens > 0:
+        words = tokens(md)
+        if len(words) >= simhash_min_tokens:
+            sig = simhash64(words)
+        spans["simhash"] = round((time.perf_counter() - t2) * 1000, 1)
+    return Converted(clean, md, None, digest, sig, spans)
+
+_RESULTS = {"✅": "ok", "＝": "unchanged", "≈": "duplicate", "☠️": "error"}
+
+class ConvertStage:
+    """캡처와 분리된 변환 단계. bounded queue → ProcessPoolExecutor → JsonlSink"""
+    def __init__(self, settings: Settings, sink: JsonlSink, state: Optional[RefreshState] = None,
+                 metrics: Optional[Metrics] = None):
+        self.s = settings
+        self.sink = sink
+        self.state = state  # 증분 모드: 이전 해시와 같으면 변환/출력 생략
+        self.metrics = metrics  # 레코드의 timings.spans 를 단계별/origin 별 히스토그램으로
+        self.profiler = StageProfiler.from_settings(settings)  # 일부 URL 의 변환을 cProfile
+        self.dedup: Optional[NearDupIndex] = None  # 근접 중복 표시/제거 (start 에서 열림)
+        self.workers = settings.convert_workers or os.cpu_count() or 1
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max(1, settings.convert_queue_size))
+        self.pool: Optional[ProcessPoolExecutor] = None
+        self.pool_gen = 0  # 풀을 새로 만들 때마다 증가 (여러 consumer 가 같은 고장을 한 번만 처리)
+        self.pool_lock = asyncio.Lock()
+        self.tasks: List[asyncio.Task] = []
+
+    async def start(self):
+        if self.s.dedup != "off":
+            # 기존 서명을 다시 읽어 band 체인을 만드는 데 문서 수에 비례한 시간이 걸림
+            self.dedup = await asyncio.to_thread(NearDupIndex.open, near_dup_index_path(self.s), self.s.dedup_threshold)
+        self.pool = ProcessPoolExecutor(max_workers=self.workers, initializer=_ignore_sigint)
+        self.tasks = [asyncio.create_task(self._consume()) for _ in range(self.workers)]
+        if self.metrics is not None:
+            self.metrics.gauge("convert_queue_depth", "Jobs waiting for conversion", self.queue.qsize)
+
+    async def submit(self, job: ConvertJob):
+        # 큐가 가득 차면 여기서 대기 → 캡처 쪽에 backpressure
+        await self.queue.put((time.perf_counter(), job))
+
+    async def close(self):
+        await self.queue.join()
+        for t in self.tasks:
+            t.cancel()
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+        if self.pool:
+            self.pool.shutdown()
+        if self.dedup is not None:
+            print(f"[INFO] near-dup: {self.dedup.summary()}")
+            self.dedup.close()
+        if self.profiler is not None:
+            self.profiler.close()
+
+    async def _restart_pool(self, gen: int, url: str):
+        """gen 세대의 풀이 깨졌을 때 새 풀로 교체. 같은 고장을 본 다른 consumer 는 이미 바뀐 풀을 씀"""
+        async with self.pool_lock:
+            if self.pool_gen != gen:
+                return
+            print(f"[WARN] convert pool broken, restarting: {url}")
+            self.pool.shutdown(wait=False)
+            self.pool = ProcessPoolExecutor(max_workers=self.workers, initializer=_ignore_sigint)
+            self.pool_gen += 1
+
+    async def _convert(self, html: str, url: str, prev_hash: Optional[str] = None) -> Optional[Converted]:
+        """변환 워커가 재시도에서도 죽으면 None (이 페이지가 원인일 가능성이 큼)"""
+        loop = asyncio.get_running_loop()
+        min_tokens = self.s.dedup_min_tokens if self.dedup is not None else 0
+        prof = None
+        if self.profiler is not None and self.profiler.sampled(url):
+            prof = self.profiler.path("convert", url, ".prof")
+        t0 = time.perf_counter()
+        for attempt in range(2):
+            # 워커가 죽으면(OOM 등) 풀을 새로 만들고 한 번만 재시도
+            gen = self.pool_gen
+            try:
+                res = await loop.run_in_executor(self.pool, convert_html, html, url, prev_hash, min_tokens,
+                                                 str(prof) if prof else None)
+                break
+            except BrokenProcessPool:
+                await self._restart_pool(gen, url)
+        else:
+            print(f"[WARN] convert worker crashed twice, giving up: {url}")
+            return None
+        if prof is not None:
+            await asyncio.to_thread(self.profiler.record, "convert", prof, (time.perf_counter() - t0) * 1000, url)
+        return res
+
+    async def _consume(self):
+        while True:
+            queued_at, job = await self.queue.get()
+            try:
+                job["timings"] = job.get("timings") or {}
+                add_span(job["timings"], "convert_queue", (time.perf_counter() - queued_at) * 1000)
+                await self._handle(job)
+            except Exception as e:
+                print(f"[WARN] convert stage failed: {job.get('url')}: {e}")
+            finally:
+                self.queue.task_done()
+
+    async def _handle(self, job: ConvertJob):
+        u, html, err = job["url"], job.get("html"), job.get("error")
+        timings = job.get("timings") or {}
+        extra = dict(job.get("validators") or {})
+        crashed = False
+        if html and not err and job.get("change") != "unchanged":
+            prev = self.state.get(u) if self.state is not None else None
+            res = await self._convert(html, u, prev.content_hash if prev else None)
+            if res is None:
+                # 재시도에서도 변환 워커가 죽음: 다시 돌리지 않고 오류 레코드로
+                crashed, err = True, "convert_worker_crashed"
+        if job.get("change") == "unchanged":
+            # 조건부 요청에서 이미 안 바뀐 것으로 확인됨 (HTML 없음)
+            await self.sink.write(self.s.out_ok_md, {"url": u, "change": "unchanged", "timings": timings, **extra})
+            badge = "＝"
+        elif html and not err:
+            timings.setdefault("spans", {}).update(res.spans or {})
+            if res.error:
+                print(f"[WARN] Markdown 변환 실패: {res.error}")
+            meta = {}
+            if self.state is not None:
+                meta = {"change": "changed" if prev else "new", "content_hash": res.content_hash, **extra}
+            dup = None
+            if res.markdown is not None and self.dedup is not None and res.simhash is not None:
+                # 대표 문서로 등록되거나, 이미 있는 비슷한 문서의 URL 을 돌려받음
+                dup = await asyncio.to_thread(self.dedup.check_and_add, res.simhash, u)
+                if dup:
+                    meta.update(duplicate_of=dup[0], simhash_distance=dup[1])
+            if res.markdown is None:
+                await self.sink.write(self.s.out_ok_md, {
+                    "url": u, "change": "unchanged", "content_hash": res.content_hash, "timings": timings, **extra})
+                badge = "＝"
+            elif dup and self.s.dedup == "drop":
+                # 본문은 버리고 URL/대표 URL 만 남김 (done 처리와 추적용)
+                await self.sink.write(self.s.out_ok_md, {"url": u, **meta, "timings": timings})
+                badge = "≈"
+            else:
+                await self.sink.write(self.s.out_ok_html, {"url": u, "clean_html": res.clean})
+                await self.sink.write(self.s.out_ok_md, {"url": u, "markdown": res.markdown, **meta, "timings": timings})
+                badge = "≈" if dup else "✅"
+        else:
+            clean, md = "", ""
+            res = await self._convert(html, u) if html and not crashed else None
+            if res is not None:
+                timings.setdefault("spans", {}).update(res.spans or {})
+                clean, md = res.clean, res.markdown
+                if res.error:
+                    print(f"[WARN] (ERR) Markdown 변환 실패: {res.error}")
+            await self.sink.write(self.s.out_err, {
+                "url": u, "clean_html": clean, "markdown": md,
+                "status": job.get("status"), "timings": timings, "error": err or "unknown_error"
+            })
+            badge = "☠️"
+        if self.metrics is not None:
+            self.metrics.observe_timings(timings, origin_of(u))
+            self.metrics.inc("pages", _RESULTS[badge])
+        ms = timings.get("total_ms")
+        progress = f"{job['idx']}/{job['total']}" if job.get("total") else f"{job['idx']}"
+        print(f"{badge} {progress} | {u}" + (f" | {ms} ms" if ms else ""))
@@ -0,0 +1,181 @@
+# -*- coding: utf-8 -*-
+import asyncio, itertools, os, secrets, socket, time
+from typing import Awaitable, Callable, Dict, List, Optional, Set, Tuple
+from ..config import Settings
+from ..browser.context import ContextManager
+from ..io.queue_backend import QueueBackend, open_queue_backend
+from ..io.sink import sink_from_settings
+from ..io.urlio import iter_urls, origin_of
+from ..utils.metrics import open_metrics
+from .batches import CrawlStage, open_done
+from .convert import ConvertStage
+
+def queue_spec(settings: Settings) -> str:
+    return settings.queue_url or str(settings.out_ok_md.with_name(settings.out_ok_md.name + ".queue.sqlite"))
+
+def _open_backend(settings: Settings) -> QueueBackend:
+    return open_queue_backend(queue_spec(settings), max_attempts=settings.lease_max_attempts)
+
+async def run_coordinator(settings: Settings):
+    """URL 을 큐에 적재하고, 워커가 올린 결과를 변환/기록 (기록은 coordinator 한 곳에서만)"""
+    # 증분 모드면 refresh 간격이 지난 URL 만 적재하고, 변경 여부는 변환 단계에서 해시로 판정
+    done = open_done(settings)
+    backend = _open_backend(settings)
+    st = settings.urls_path.stat() if settings.urls_path.exists() else None
+    sig = f"{settings.urls_path.resolve()}|{st.st_size}|{st.st_mtime_ns}" if st else ""
+    items = ((origin_of(u), u) for u in iter_urls(settings.urls_path) if u not in done)
+    if await asyncio.to_thread(backend.seed, items, sig):
+        print(f"[INFO] queue 적재 완료: {queue_spec(settings)}")
+    else:
+        # 이전 coordinator 가 결과를 받고 기록하기 전에 죽었으면 해당 URL 을 다시 대기열로
+        n = await asyncio.to_thread(backend.requeue_missing, done)
+        print(f"[INFO] 기존 queue 재사용: {queue_spec(settings)}" + (f" (재대기 {n})" if n else ""))
+
+    # 워커의 캡처 단계 시간은 결과 job 의 timings.spans 로 올라오므로 coordinator 에서만 내보냄
+    metrics = open_metrics(settings)
+    sink = sink_from_settings(settings, metrics)
+    sink.add_flush_hook(settings.out_ok_md, done.on_flush)
+    sink.add_flush_hook(settings.out_err, done.on_flush)
+    conv = ConvertStage(settings, sink, done if settings.incremental else None, metrics)
+    counter = itertools.count(1)
+
+    async def collect() -> int:
+        rows = await asyncio.to_thread(backend.fetch_results, 256)
+        for _, job in rows:
+            done.add(job["url"])
+            job["idx"], job["total"] = next(counter), 0
+            await conv.submit(job)
+        if rows:
+            await asyncio.to_thread(backend.ack_results, [i for i, _ in rows])
+        return len(rows)
+
+    await conv.start()
+    metrics.start()
+    try:
+        last_requeue = last_report = time.monotonic()
+        while True:
+            if await collect():
+                continue
+            if await asyncio.to_thread(backend.finished):
+                # 마지막 complete() 가 위의 fetch 와 finished 사이에 커밋됐을 수 있으므로
+                # (결과와 DONE 은 같은 트랜잭션) 끝났다고 판단한 뒤에 남은 결과를 다 비운다
+                while await collect():
+                    pass
+                break
+            now = time.monotonic()
+            if now - last_requeue > settings.lease_ttl_s / 2:
+                n = await asyncio.to_thread(backend.requeue_expired)
+                if n:
+                    print(f"[WARN] 만료된 lease 재대기: {n} urls")
+                last_requeue = now
+            if now - last_report > 60:
+                print(f"[INFO] queue: {await asyncio.to_thread(backend.counts)}")
+                last_report = now
+            await asyncio.sleep(1.0)
+        print(f"[INFO] queue 완료: {await asyncio.to_thread(backend.counts)}")
+    finally:
+        await conv.close()
+        await sink.close()
+        await metrics.close()
+        done.close()
+        backend.close()
+
+class _LeaseSource:
+    """scheduler 가 origin 을 달라고 하면 큐에서 lease_origins 개씩 lease 해 오는 async URL source.
+    lease 는 sqlite 잠금을 기다릴 수 있으므로 스레드에서 호출한다 (이벤트 루프를 막지 않게)."""
+    def __init__(self, backend: QueueBackend, owner: str, settings: Settings):
+        self.backend = backend
+        self.owner = owner
+        self.s = settings
+        self.buckets: Dict[str, List[str]] = {}
+        self.held: Set[str] = set()
+
+    async def origins(self):
+        while True:
+            got = await asyncio.to_thread(self.backend.lease, self.owner, max(1, self.s.lease_origins),
+                                          self.s.lease_batch_size, self.s.lease_ttl_s)
+            if not got:
+                return
+            for o, urls in got.items():
+                self.buckets[o] = urls
+                self.held.add(o)
+            for o in got:
+                yield o
+
+    def urls(self, origin: str):
+        return iter(self.buckets.pop(origin, ()))
+
+    def close(self):
+        pass
+
+async def crawl_leased(context, settings: Settings, backend: QueueBackend, owner: str,
+                       deliver: Optional[Callable[[dict], Awaitable[None]]] = None, state=None):
+    """큐가 끝날 때까지 origin 을 lease 받아 캡처.
+    deliver 가 없으면 결과 job 을 큐(results)로 올리고(coordinator 가 변환/기록), 있으면 job 을
+    deliver 로 바로 넘기고 큐에는 완료 표시만 한다 (run_sharded 의 워커 프로세스).
+    탭 풀/캡처 파이프라인은 워커당 한 번 만들어 매 lease 회차에 재사용한다."""
+    source = _LeaseSource(backend, owner, settings)
+    keep_results = deliver is None
+    buf: List[Tuple[str, dict]] = []
+    flush_lock = asyncio.Lock()
+
+    async def flush():
+        async with flush_lock:
+            if not buf:
+                return
+            batch = buf[:]
+            buf.clear()
+            released = await asyncio.to_thread(backend.complete, owner, batch, keep_results)
+            source.held -= released
+
+    async def emit(job):
+        if deliver is not None:
+            await deliver(job)
+            job = {"url": job["url"]}
+        buf.append((origin_of(job["url"]), job))
+        if len(buf) >= settings.sink_batch_size:
+            await flush()
+
+    async def keepalive():
+        # 결과 제출과 lease 갱신을 묶어서 주기적으로 (워커마다 ttl/3 에 한 번)
+        while True:
+            await asyncio.sleep(settings.lease_ttl_s / 3)
+            await flush()
+            await asyncio.to_thread(backend.renew, owner, list(source.held), settings.lease_ttl_s)
+
+    stage = CrawlStage(context, settings, emit, state)
+    ka = asyncio.create_task(keepalive())
+    try:
+        await stage.start()
+        while True:
+            await stage.run(source, set(), manual_captcha=False)
+            await flush()
+            if source.held:
+                # 캡처 예외 등으로 결과를 못 올린 URL 은 반납 (max_attempts 후 failed)
+                await asyncio.to_thread(backend.release, owner, list(source.held))
+                source.held.clear()
+            if await asyncio.to_thread(backend.finished):
+                break
+            # 다른 워커가 잡고 있는 origin 만 남음: lease 가 만료되면(워커가 죽은 경우) 다시 받음
+            await asyncio.sleep(5.0)
+    finally:
+        ka.cancel()
+        await asyncio.gather(ka, return_exceptions=True)
+        await stage.close()
+        await flush()
+        if source.held:
+            await asyncio.to_thread(backend.release, owner, list(source.held))
+
+def worker_owner() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}:{secrets.token_hex(3)}"
+
+async def run_worker(settings: Settings):
+    """큐에서 origin 단위로 lease 받아 캡처하고 결과를 큐로 올림 (변환/기록은 coordinator)"""
+    backend = _open_backend(settings)
+    owner = worker_owner()
+    print(f"[INFO] worker {owner} → {queue_spec(settings)}")
+    try:
+        async with ContextManager(settings) as context:
+            await crawl_leased(context, settings, backend, owner)
+    finally:
+        backend.close()
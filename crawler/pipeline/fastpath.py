@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+import re, time
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlparse
+from playwright.async_api import APIRequestContext
+from ..config import Settings
+from ..extract.pdf import looks_like_pdf_url
+from ..nav.captcha import CAPTCHA_TEXTS
+from ..schemas import Timings
+
+_INVISIBLE_RE = re.compile(r"(?is)<(script|style|noscript|template)\b[^>]*>.*?</\1\s*>")
+_TAG_RE = re.compile(r"(?s)<[^>]+>")
+_WS_RE = re.compile(r"\s+")
+# 내용이 빈 SPA 마운트 지점 (React/Vue/Next/Nuxt/Gatsby/Angular)
+_SPA_ROOT_RE = re.compile(
+    r"""(?is)<(div|main|section)\b[^>]*\bid\s*=\s*["']?(root|app|__next|__nuxt|___gatsby)["'\s>][^>]*>\s*</\1\s*>"""
+    r"""|<app-root\b[^>]*>\s*</app-root\s*>"""
+)
+_NOSCRIPT_RE = re.compile(r"(?is)<noscript\b[^>]*>(.*?)</noscript\s*>")
+_NOSCRIPT_WARN_RE = re.compile(r"(?i)(enable|turn on|requires?)\s+javascript|javascript\s+(is\s+)?(required|disabled)|자바스크립트|스크립트를\s*(활성|사용)")
+
+def visible_text_len(html: str) -> int:
+    text = _TAG_RE.sub(" ", _INVISIBLE_RE.sub(" ", html))
+    return len(_WS_RE.sub(" ", text).strip())
+
+def needs_js(html: str, min_text: int) -> Optional[str]:
+    """정적 HTML 만으로 부족하면 그 이유, 충분하면 None"""
+    if _SPA_ROOT_RE.search(html):
+        return "spa_root"
+    n = visible_text_len(html)
+    if n < min_text:
+        return "thin_text"
+    head = html[:20_000].lower()
+    if any(t.lower() in head for t in CAPTCHA_TEXTS):
+        return "challenge"
+    if n < min_text * 4:
+        for m in _NOSCRIPT_RE.finditer(html):
+            if _NOSCRIPT_WARN_RE.search(m.group(1)):
+                return "noscript_warning"
+    return None
+
+class HttpFastPath:
+    """1단계: 브라우저 컨텍스트의 APIRequestContext(쿠키 공유, keep-alive 풀)로 먼저 받아 보고,
+    JS 렌더링이 필요해 보이는 URL 만 CapturePipeline 으로 넘긴다.
+    같은 origin 에서 계속 넘기기만 하면 그 origin 은 바로 브라우저로 보낸다 (origin policy)."""
+    def __init__(self, request: APIRequestContext, settings: Settings):
+        self.request = request
+        self.s = settings
+        self.browser_origins = set(settings.fast_path_browser_origins)
+        self.stats: Dict[str, Dict[str, int]] = {}  # origin → {"http": n, "browser": n}
+        self.counts = {"http": 0, "browser": 0}
+
+    def _policy_browser(self, origin: str) -> bool:
+        if origin in self.browser_origins:
+            return True
+        st = self.stats.get(origin)
+        return bool(st) and st.get("http", 0) == 0 and st.get("browser", 0) >= self.s.fast_path_learn_after
+
+    def _note(self, origin: str, tier: str):
+        st = self.stats.setdefault(origin, {})
+        st[tier] = st.get(tier, 0) + 1
+        self.counts[tier] += 1
+
+    async def fetch(self, url: str) -> Tuple[Optional[str], Optional[str], Timings, Optional[int], Optional[str]]:
+        """(escalate_reason, html, timings, status, error). escalate_reason 이 None 이면 HTTP 결과로 끝"""
+        timings: Timings = {}
+        t0 = time.perf_counter()
+        p = urlparse(url); origin = f"{p.scheme}://{p.netloc}"
+        if looks_like_pdf_url(url):
+            return "pdf_url", None, timings, None, None
+        if self._policy_browser(origin):
+            self._note(origin, "browser")
+            return "origin_policy", None, timings, None, None
+        try:
+            resp = await self.request.get(
+                url, timeout=self.s.fast_path_timeout_ms, max_redirects=5, fail_on_status_code=False,
+                headers={"Accept": "text/html,application/xhtml+xml;q=0.9,*/*;q=0.8"},
+            )
+        except Exception as e:
+            self._note(origin, "browser")
+            return f"http_error:{type(e).__name__}", None, timings, None, None
+        status = resp.status
+        ctype = (resp.headers.get("content-type") or "").lower()
+        reason = None
+        if status >= 400:
+            reason = f"http_{status}"
+        elif "html" not in ctype:
+            # PDF/첨부 등은 브라우저 쪽 차단 로직이 판단
+            reason = f"content_type:{ctype.split(';')[0] or 'none'}"
+        html = None
+        if reason is None:
+            try:
+                html = await resp.text()
+            except Exception as e:
+                reason = f"decode_error:{type(e).__name__}"
+        with_body = reason is None
+        await resp.dispose()
+        if with_body:
+            reason = needs_js(html, self.s.fast_path_min_text)
+        timings["fetch_ms"] = int((time.perf_counter() - t0) * 1000)
+        if reason:
+            self._note(origin, "browser")
+            return reason, None, timings, status, None
+        self._note(origin, "http")
+        timings["total_ms"] = timings["fetch_ms"]
+        timings["route"] = "http"
+        return None, html, timings, status, None
+
+    def summary(self) -> str:
+        return f"http={self.counts['http']} browser={self.counts['browser']}"
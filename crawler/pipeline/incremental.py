@@ -0,0 +1,44 @@
+# -*- coding: utf-8 -*-
+import time
+from typing import Dict, Optional, Tuple
+from playwright.async_api import APIRequestContext
+from ..io.refresh_state import PageState
+
+def _validators(headers: Dict[str, str]) -> Dict[str, str]:
+    out = {}
+    if headers.get("etag"):
+        out["etag"] = headers["etag"]
+    if headers.get("last-modified"):
+        out["last_modified"] = headers["last-modified"]
+    return out
+
+async def conditional_check(request: APIRequestContext, url: str, prev: Optional[PageState],
+                            timeout_ms: int) -> Tuple[bool, Dict[str, str], Optional[int], int]:
+    """탭을 잡기 전에 HEAD + If-None-Match/If-Modified-Since 로 바뀌었는지 확인.
+
+    (unchanged, 새 검증자, status, ms). 304 이거나 200 이어도 ETag/Last-Modified 가 이전과 같으면
+    unchanged. 요청이 실패하거나 서버가 HEAD 를 거부하면 바뀐 것으로 보고 전체 캡처로 넘어간다.
+    """
+    headers = {}
+    if prev and prev.etag:
+        headers["If-None-Match"] = prev.etag
+    if prev and prev.last_modified:
+        headers["If-Modified-Since"] = prev.last_modified
+    t0 = time.perf_counter()
+    try:
+        resp = await request.head(url, headers=headers, timeout=timeout_ms, max_redirects=5, fail_on_status_code=False)
+    except Exception:
+        return False, {}, None, int((time.perf_counter() - t0) * 1000)
+    ms = int((time.perf_counter() - t0) * 1000)
+    status = resp.status
+    found = _validators(resp.headers)
+    await resp.dispose()
+    if status == 304 and prev:
+        return True, found, status, ms
+    if status >= 400:
+        return False, {}, status, ms
+    unchanged = bool(prev) and (
+        (bool(prev.etag) and found.get("etag") == prev.etag)
+        or (not found.get("etag") and bool(prev.last_modified) and found.get("last_modified") == prev.last_modified)
+    )
+    return unchanged, found, status, ms
@@ -0,0 +1,161 @@
+# -*- coding: utf-8 -*-
+import asyncio
+from collections import deque
+from itertools import islice
+from typing import AsyncIterator, Awaitable, Callable, Deque, Dict, Iterable, Iterator, List, Optional, Set, Tuple, Union
+
+class OriginScheduler:
+    """origin 별 URL 큐를 round-robin 으로 돌며 작업을 배정하는 장기 실행 스케줄러.
+
+    - 활성 origin 은 최대 max_active_origins 개. 하나가 끝나면 feeder 가 바로 다음 origin 을
+      admit(캡차 확인/prewarm) 해서 넣으므로 배치 단위 barrier 가 없다.
+    - origin 별 동시 작업 수는 origin_concurrency 이하. 전역 제한은 worker 수로 정해진다.
+    - URL 은 urls_for(origin) 이터레이터에서 필요할 때 하나씩 꺼낸다.
+    - origins 는 일반 이터러블이나 async 이터레이터 (큐에서 lease 해 오는 경우처럼 I/O 가 필요한 source).
+    - admit 이 일부 origin 만 반환하면 나머지는 보류(deferred) 상태로 두고, 나중에
+      add_origin() 으로 넣는다 (예: 캡차를 수동으로 푼 뒤). 보류 중인 origin 이 있으면 끝나지 않음.
+    - admit 이 예외를 내면 origin 하나씩 다시 admit 하고, 그래도 실패한 origin 은 on_error(origin, exc)
+      로 넘기고 건너뛴다. origins 이터레이터 자체가 실패하면 새 origin 배정을 멈추고(진행 중인 것은
+      마저 끝남) 그 예외를 close() 에서 다시 던진다.
+    """
+    def __init__(self, origins: Union[Iterable[str], AsyncIterator[str]], urls_for: Callable[[str], Iterator[str]], *,
+                 origin_concurrency: int, max_active_origins: int,
+                 admit: Optional[Callable[[List[str]], Awaitable[Optional[List[str]]]]] = None,
+                 on_error: Optional[Callable[[str, Exception], Awaitable[None]]] = None):
+        self.origins = origins if hasattr(origins, "__anext__") else iter(origins)
+        self.urls_for = urls_for
+        self.origin_concurrency = max(1, origin_concurrency)
+        self.max_active_origins = max(1, max_active_origins)
+        self.admit = admit
+        self.on_error = on_error
+        self.pending: Dict[str, Iterator[str]] = {}  # 아직 꺼낼 URL 이 남은 origin
+        self.inflight: Dict[str, int] = {}           # 활성 origin → 진행 중 작업 수
+        self.ready: Deque[str] = deque()             # round-robin 순서
+        self.cond = asyncio.Condition()
+        self.deferred: Set[str] = set()
+        self.origins_done = False
+        self.feeder: Optional[asyncio.Task] = None
+        self.error: Optional[Exception] = None  # feeder 를 멈춘 예외 (close() 에서 다시 던짐)
+
+    def start(self):
+        self.feeder = asyncio.create_task(self._feed())
+
+    async def _feed(self):
+        try:
+            while True:
+                async with self.cond:
+                    await self.cond.wait_for(lambda: len(self.inflight) < self.max_active_origins)
+                    free = self.max_active_origins - len(self.inflight)
+                batch = await self._take(free)
+                if not batch:
+                    break
+                ready, failed = await self._admit(batch)
+                async with self.cond:
+                    self.deferred.update(set(batch) - set(ready) - failed)
+                    for o in ready:
+                        self._activate(o)
+                    self.cond.notify_all()
+        except Exception as e:
+            self.error = e
+            print(f"[WARN] scheduler feeder stopped: {e!r}")
+        finally:
+            async with self.cond:
+                self.origins_done = True
+                self.cond.notify_all()
+
+    async def _take(self, n: int) -> List[str]:
+        if not hasattr(self.origins, "__anext__"):
+            return list(islice(self.origins, n))
+        out: List[str] = []
+        while len(out) < n:
+            try:
+                out.append(await self.origins.__anext__())
+            except StopAsyncIteration:
+                break
+        return out
+
+    async def _admit(self, batch: List[str]) -> Tuple[List[str], Set[str]]:
+        """(활성화할 origin, admit 이 실패한 origin)"""
+        if not self.admit:
+            return batch, set()
+        try:
+            admitted = await self.admit(batch)
+            return (batch if admitted is None else admitted), set()
+        except Exception as e:
+            if len(batch) == 1:
+                return [], await self._admit_failed(batch[0], e)
+            print(f"[WARN] admit failed for {len(batch)} origins, retrying one by one: {e!r}")
+        ready: List[str] = []
+        failed: Set[str] = set()
+        for o in batch:
+            try:
+                admitted = await self.admit([o])
+            except Exception as e:
+                failed |= await self._admit_failed(o, e)
+                continue
+            ready.extend([o] if admitted is None else admitted)
+        return ready, failed
+
+    async def _admit_failed(self, origin: str, e: Exception) -> Set[str]:
+        print(f"[WARN] admit failed for {origin}: {e!r}")
+        if self.on_error:
+            await self.on_error(origin, e)
+        return {origin}
+
+    def _activate(self, origin: str):
+        self.inflight[origin] = 0
+        self.pending[origin] = self.urls_for(origin)
+        self.ready.append(origin)
+
+    async def add_origin(self, origin: str):
+        """보류했던 origin 을 활성화"""
+        async with self.cond:
+            self.deferred.discard(origin)
+            if origin not in self.inflight:
+                self._activate(origin)
+            self.cond.notify_all()
+
+    def _pick(self) -> Optional[Tuple[str, str]]:
+        for _ in range(len(self.ready)):
+            o = self.ready.popleft()
+            if self.inflight[o] >= self.origin_concurrency:
+                self.ready.append(o)
+                continue
+            u = next(self.pending[o], None)
+            if u is None:
+                # 꺼낼 URL 이 없음: 진행 중 작업까지 끝나면 슬롯 반환
+                del self.pending[o]
+                if self.inflight[o] == 0:
+                    del self.inflight[o]
+                    self.cond.notify_all()
+                continue
+            self.inflight[o] += 1
+            self.ready.append(o)
+            return o, u
+        return None
+
+    async def next_job(self) -> Optional[Tuple[str, str]]:
+        """(origin, url) 또는 모든 작업이 끝났으면 None"""
+        async with self.cond:
+            while True:
+                job = self._pick()
+                if job:
+                    return job
+                if self.origins_done and not self.inflight and not self.deferred:
+                    return None
+                await self.cond.wait()
+
+    async def task_done(self, origin: str):
+        async with self.cond:
+            self.inflight[origin] -= 1
+            if self.inflight[origin] == 0 and origin not in self.pending:
+                del self.inflight[origin]
+            self.cond.notify_all()
+
+    async def close(self):
+        if self.feeder and not self.feeder.done():
+            self.feeder.cancel()
+            await asyncio.gather(self.feeder, return_exceptions=True)
+        if self.error is not None:
+            err, self.error = self.error, None
+            raise err
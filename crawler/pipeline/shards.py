@@ -0,0 +1,145 @@
+# -*- coding: utf-8 -*-
+import asyncio, contextlib, dataclasses, itertools, queue
+import multiprocessing as mp
+from pathlib import Path
+from typing import List
+from ..config import Settings
+from ..browser.context import ContextManager
+from ..io.queue_backend import SqliteQueue
+from ..io.refresh_state import open_refresh_state
+from ..io.sink import sink_from_settings
+from ..io.urlio import iter_urls, origin_of
+from ..utils.loopmon import LoopLagMonitor
+from ..utils.metrics import open_metrics
+from .batches import open_done
+from .convert import ConvertStage
+from .distributed import crawl_leased, worker_owner
+
+def shard_queue_path(settings: Settings) -> Path:
+    return settings.out_ok_md.with_name(settings.out_ok_md.name + ".shards.queue.sqlite")
+
+def _shard_settings(settings: Settings, shard: int) -> Settings:
+    # persistent context 는 user-data-dir 를 공유할 수 없으므로 샤드마다 프로필 복사본을 따로 둠
+    tmp = settings.tmp_profile_dir
+    return dataclasses.replace(settings, workers=1, done_index_rebuild=False,
+                               tmp_profile_dir=tmp.with_name(f"{tmp.name}_shard{shard}"))
+
+async def _shard_run(settings: Settings, shard: int, results):
+    # URL 목록/done-index 는 부모만 읽고, 워커는 부모가 채운 로컬 큐에서 origin 을 lease 해 옴
+    backend = SqliteQueue(shard_queue_path(settings), max_attempts=settings.lease_max_attempts)
+    # 증분 모드: 조건부 요청에 쓸 이전 검증자만 조회 (기록은 부모가 flush hook 으로)
+    state = open_refresh_state(settings, readonly=True) if settings.incremental else None
+
+    async def deliver(job):
+        # results 가 가득 차면 여기서 대기 → 부모 변환 단계의 backpressure 가 워커까지 전달됨
+        await asyncio.to_thread(results.put, job)
+
+    try:
+        async with LoopLagMonitor.from_settings(settings), ContextManager(settings) as context:
+            await crawl_leased(context, settings, backend, f"shard{shard}:{worker_owner()}", deliver, state)
+    finally:
+        if state is not None:
+            state.close()
+        backend.close()
+
+def _shard_main(settings: Settings, shard: int, results):
+    """워커 프로세스 진입점: 자기 Playwright/브라우저/컨텍스트로 큐에서 받은 origin 을 캡처"""
+    try:
+        asyncio.run(_shard_run(settings, shard, results))
+    except KeyboardInterrupt:
+        # 부모가 더 이상 읽지 않을 수 있으므로 큐 flush 를 기다리지 않고 종료
+        results.cancel_join_thread()
+    except Exception as e:
+        print(f"[ERROR] shard {shard} failed: {e}")
+    finally:
+        # 종료 신호 (부모가 이미 멈췄으면 버림)
+        with contextlib.suppress(Exception):
+            results.put(None, timeout=5.0)
+
+def _exhausted_jobs(settings: Settings) -> List[dict]:
+    """lease 를 max_attempts 번 받고도 끝나지 않은 URL 의 error 결과 job
+    (워커는 결과를 results 큐로 바로 넘기므로 로컬 큐의 results 에는 이것만 남음)"""
+    backend = SqliteQueue(shard_queue_path(settings), max_attempts=settings.lease_max_attempts)
+    try:
+        return [job for _, job in backend.fetch_results(1 << 62)]
+    finally:
+        backend.close()
+
+def _remove_queue(path: Path):
+    for p in (path, path.with_name(path.name + "-wal"), path.with_name(path.name + "-shm")):
+        p.unlink(missing_ok=True)
+
+async def run_sharded(settings: Settings):
+    """--workers N: 캡처는 N 개 워커 프로세스, 변환/기록은 부모 프로세스 하나에서"""
+    workers = settings.workers
+    done = open_done(settings)
+    # 처리할 URL 을 로컬 sqlite 큐에 한 번만 적재 (파일은 부모만 한 줄씩 읽음). 워커는 origin 을
+    # 하나씩 lease 해 가므로 큰 origin 이 한 워커에 몰려도 나머지 워커가 다른 origin 을 계속 가져감
+    qpath = shard_queue_path(settings)
+    _remove_queue(qpath)  # 이전 실행이 남긴 큐는 버림 (완료 여부는 done-index 가 기준)
+    backend = SqliteQueue(qpath, max_attempts=settings.lease_max_attempts)
+    items = ((origin_of(u), u) for u in iter_urls(settings.urls_path) if u not in done)
+    await asyncio.to_thread(backend.seed, items)
+    total = backend.counts()["pending"]
+    backend.close()  # 부모는 적재만 하고, lease/완료 표시는 워커끼리
+    if not total:
+        print("모든 URL이 이미 처리됨")
+        _remove_queue(qpath)
+        done.close()
+        return
+
+    # 캡처 단계 시간은 job 의 timings.spans 로 넘어오므로 내보내기는 부모 한 곳에서만
+    metrics = open_metrics(settings)
+    sink = sink_from_settings(settings, metrics)
+    sink.add_flush_hook(settings.out_ok_md, done.on_flush)
+    sink.add_flush_hook(settings.out_err, done.on_flush)
+    conv = ConvertStage(settings, sink, done if settings.incremental else None, metrics)
+
+    ctx = mp.get_context("spawn")
+    results = ctx.Queue(maxsize=max(1, settings.convert_queue_size))
+    # macOS 에서는 qsize 가 NotImplementedError → 내보낼 때 건너뜀
+    metrics.gauge("shard_results_queue_depth", "Captured jobs waiting in the shard results queue", results.qsize)
+    procs = [
+        ctx.Process(target=_shard_main, args=(_shard_settings(settings, k), k, results), name=f"shard{k}")
+        for k in range(workers)
+    ]
+    print(f"[INFO] sharded run: {workers} workers × concurrency {settings.concurrency}")
+
+    await conv.start()
+    metrics.start()
+    for p in procs:
+        p.start()
+    counter = itertools.count(1)
+    try:
+        finished = 0
+        while finished < workers:
+            try:
+                job = await asyncio.to_thread(results.get, True, 0.5)
+            except queue.Empty:
+                if any(p.is_alive() for p in procs):
+                    continue
+                # 종료 신호 없이 죽은 워커가 있어도, 남은 결과는 마저 받음
+                try:
+                    job = results.get_nowait()
+                except queue.Empty:
+                    break
+            if job is None:
+                finished += 1
+                continue
+            done.add(job["url"])
+            job["idx"], job["total"] = next(counter), total
+            await conv.submit(job)
+        for job in await asyncio.to_thread(_exhausted_jobs, settings):
+            done.add(job["url"])
+            job["idx"], job["total"] = next(counter), total
+            await conv.submit(job)
+    finally:
+        await conv.close()
+        await sink.close()
+        await metrics.close()
+        for p in procs:
+            p.join(timeout=10)
+            if p.is_alive():
+                p.terminate()
+        done.close()
+        _remove_queue(qpath)
@@ -3,7 +3,24 @@ import asyncio
 from .config import Settings
 from .browser.context import ContextManager
 from .pipeline.batches import run_batches
+from .pipeline.shards import run_sharded
+from .pipeline.distributed import run_coordinator, run_worker
+from .utils.loopmon import LoopLagMonitor
 
 async def run(settings: Settings):
+    # 루프를 막는 동기 작업이 있으면 그 순간의 스택을 남김 (--loop-lag-threshold 0 이면 끔)
+    async with LoopLagMonitor.from_settings(settings):
+        await _run(settings)
+
+async def _run(settings: Settings):
+    if settings.mode == "coordinator":
+        await run_coordinator(settings)
+        return
+    if settings.mode == "worker":
+        await run_worker(settings)
+        return
+    if settings.workers > 1:
+        await run_sharded(settings)
+        return
     async with ContextManager(settings) as context:
         await run_batches(context, settings)
@@ -1,14 +1,26 @@
 # -*- coding: utf-8 -*-
-from typing import TypedDict, Optional, List
+from typing import Dict, TypedDict, Optional, List
 
 class Timings(TypedDict, total=False):
     total_ms: int
     prewarm_ms: int
-    route: str
+    prewarm_ok: bool
+    origin_hop_skipped: bool
+    skipped_steps: List[str]
+    consent_clicked: str
+    menu_opened: str
+    saved_ms: int
+    route: str  # http | browser:<사유>[/fallback_print_view] | fallback_print_view | conditional
+    fetch_ms: int
+    conditional_ms: int
     any_selector_found: bool
+    settle_ms: int
+    settle_signals: List[str]
+    settle_timed_out: bool
     iframe_srcs: List[str]
     local_error_page: bool
     note: str
+    spans: Dict[str, float]  # 단계별 ms (goto, settle, overlays, serialize_1/2, pool_wait, clean_html, markdown ...)
 
 class CaptureResult(TypedDict, total=False):
     url: str
@@ -17,3 +29,14 @@ class CaptureResult(TypedDict, total=False):
     status: Optional[int]
     timings: Timings
     error: Optional[str]
+
+class ConvertJob(TypedDict, total=False):
+    url: str
+    html: Optional[str]
+    status: Optional[int]
+    timings: Timings
+    error: Optional[str]
+    idx: int
+    total: int
+    change: str  # 증분 모드: unchanged (조건부 요청에서 확인됨)
+    validators: Dict[str, str]  # etag / last_modified
@@ -30,20 +30,6 @@ BASE64_IMG_PATTERN = r'<img[^>]+src="data:image/[^;]+;base64,[^"]+"[^>]*>'
 # (REPLACE <svg> to </svg> and variations)
 SVG_PATTERN = r'(<svg[^>]*>)(.*?)(<\/svg>)'
 
-# <script>...</script> 쌍 먼저 제거
-_SCRIPT_PAIR_RE = re.compile(r'(?is)<script\b[^>]*?>.*?</script\s*>')
-# 남은 고아(open-only)/self-closing <script ...> 제거
-_SCRIPT_ORPHAN_RE = re.compile(r'(?is)<script\b[^>]*?/?>')
-
-def _strip_scripts(html: str) -> str:
-    """스크립트 블록을 쌍 → 고아 순서로 반복 제거"""
-    prev = None
-    while prev != html:
-        prev = html
-        html = _SCRIPT_PAIR_RE.sub('', html)
-    html = _SCRIPT_ORPHAN_RE.sub('', html)
-    return html
-
 def replace_svg(html: str, new_content: str = "this is a placeholder") -> str:
     return re.sub(
         SVG_PATTERN,
@@ -65,75 +51,131 @@ def has_base64_images(text: str) -> bool:
 def has_svg_components(text: str) -> bool:
     return bool(re.search(SVG_PATTERN, text, flags=re.DOTALL))
 
-def clean_html(html: str, clean_svg: bool = False, clean_base64: bool = False):
-    # <script>, <style>, <!-- -->, <link> 제거
-    #html = re.sub(SCRIPT_PATTERN, '', html, flags=(re.IGNORECASE | re.MULTILINE | re.DOTALL))
-    html = re.sub(STYLE_PATTERN, '', html, flags=(re.IGNORECASE | re.MULTILINE | re.DOTALL))
-    html = re.sub(COMMENT_PATTERN, '', html, flags=(re.IGNORECASE | re.MULTILINE | re.DOTALL))
-    html = re.sub(LINK_PATTERN, '', html, flags=(re.IGNORECASE | re.MULTILINE | re.DOTALL))
-    html = _strip_scripts(html)
-
-    # <meta> 태그 처리: published_time만 남기고 삭제
-    def _filter_meta(match):
-        tag = match.group(0)
-        if re.search(r'property=["\']article:published_time["\']', tag, flags=re.IGNORECASE):
-            return tag  # 그대로 둠
-        return ''  
-
-    html = re.sub(META_PATTERN, _filter_meta, html, flags=re.IGNORECASE)
-
-    if clean_svg:
-        html = replace_svg(html)
+# <meta> 중 남겨둘 것: article:published_time
+_PUBLISHED_TIME_RE = re.compile(r'property=["\']article:published_time["\']', re.IGNORECASE)
+
+# clean_html 단일 패스용 토크나이저: '<' 위치마다 아래 대안을 순서대로 시도
+# (각 대안은 기존 STYLE/COMMENT/LINK/SCRIPT/META/SVG/BASE64 패턴과 같은 의미)
+# 앞의 lookahead 로 <div, <p, </a 같은 일반 태그는 대안을 시도하지 않고 바로 건너뜀
+_CLEAN_TOKENS = (
+    ("style",   r'(?is:[ ]*style.*?\/[ ]*style[ ]*>)'),
+    ("comment", r'(?is:[ ]*!--.*?--[ ]*>)'),
+    ("link",    r'(?is:[ ]*link.*?>)'),
+    ("script",  r'(?is:script\b[^>]*?>.*?</script\s*>|script\b[^>]*?/?>)'),
+    ("meta",    r'(?i:[ ]*meta.*?>)'),
+)
+_SVG_TOKEN = ("svg", r'(?s:(?P<svg_open>svg[^>]*>).*?<\/svg>)')
+_BASE64_TOKEN = ("b64", r'img[^>]+src="data:image/[^;]+;base64,[^"]+"[^>]*>')
+_clean_re_cache: dict = {}
+
+def _clean_re(clean_svg: bool, clean_base64: bool) -> re.Pattern:
+    key = (clean_svg, clean_base64)
+    rx = _clean_re_cache.get(key)
+    if rx is None:
+        toks, first = list(_CLEAN_TOKENS), " !sSlLmM"
+        if clean_svg: toks.append(_SVG_TOKEN)
+        if clean_base64: toks.append(_BASE64_TOKEN); first += "i"
+        rx = re.compile(f"<(?=[{first}])(?:" + "|".join(f"(?P<{n}>{p})" for n, p in toks) + ")")
+        _clean_re_cache[key] = rx
+    return rx
+
+def _clean_token(m: re.Match) -> str:
+    kind = m.lastgroup
+    if kind == "meta":
+        tag = m.group(0)
+        return tag if _PUBLISHED_TIME_RE.search(tag) else ''
+    if kind == "svg":
+        return f"<{m.group('svg_open')}this is a placeholder</svg>"
+    if kind == "b64":
+        return '<img src="#"/>'
+    return ''
 
-    if clean_base64:
-        html = replace_base64_images(html)
-
-    return html
+def clean_html(html: str, clean_svg: bool = False, clean_base64: bool = False):
+    """<script>, <style>, <!-- -->, <link>, <meta>(published_time 제외) 를 스캔 한 번에 모두 제거.
+    지운 자리에서 새 태그가 생길 수 있으므로(<scr<!-- -->ipt>) 바뀌는 것이 없을 때까지 다시 스캔한다
+    (보통 문서는 두 번째 스캔에서 끝남)"""
+    rx = _clean_re(clean_svg, clean_base64)
+    while True:
+        out = rx.sub(_clean_token, html)
+        if out == html:
+            return out
+        html = out
 
 
 
 from bs4 import BeautifulSoup
 from urllib.parse import urljoin
 from bs4.element import Tag
-import re
-from bs4 import BeautifulSoup
-from urllib.parse import urljoin
+from lxml import etree, html as lxml_html
 
 
 LAZY_SRC_KEYS = ("data-org-src", "data-src", "data-original", "data-lazy-src", "data-url", "data-image")
 LAZY_SRCSET_KEYS = ("data-srcset", "data-lazy-srcset")
 
+# lxml(C) 파서: html.parser 기반 BeautifulSoup 보다 훨씬 빠르고, 큰 문서도 허용
+_LXML_PARSER = lxml_html.HTMLParser(huge_tree=True)
+_IMG_ATTRS_TO_REMOVE = (
+    "width", "height", "title", "class", "style", "loading", "decoding",
+    "data-org-width", "data-org-height", "dmcf-mid", "dmcf-mtype",
+    *LAZY_SRC_KEYS, *LAZY_SRCSET_KEYS
+)
+
+_ASCII_SPACES = "\x20\x0a\x09\x0c\x0d"
+
+def _collapse_blank_text(root) -> None:
+    """공백뿐인 텍스트 노드를 '\n' 또는 ' ' 하나로 (<pre>/<textarea> 제외).
+    이전 BeautifulSoup(html.parser) 직렬화와 같은 입력을 변환기에 넘기기 위함."""
+    keep = set()
+    for el in root.iter("pre", "textarea"):
+        keep.update(el.iter())
+    for el in root.iter():
+        if isinstance(el.tag, str) and el not in keep:
+            t = el.text
+            if t and not t.strip(_ASCII_SPACES):
+                el.text = "\n" if "\n" in t else " "
+        t = el.tail
+        if t and not t.strip(_ASCII_SPACES) and el.getparent() not in keep:
+            el.tail = "\n" if "\n" in t else " "
+
 def prepare_html_for_markdown(html_content: str, base_url: str) -> str:
-    soup = BeautifulSoup(html_content, "html.parser")
+    try:
+        root = lxml_html.document_fromstring(html_content, parser=_LXML_PARSER)
+    except (etree.ParserError, ValueError):
+        # 빈 문서/공백뿐인 문서: 그대로(공백은 하나로) 넘기고 변환 단계에서 처리
+        if html_content and not html_content.strip(_ASCII_SPACES):
+            return "\n" if "\n" in html_content else " "
+        return html_content
+    _collapse_blank_text(root)
 
     # --- 2) <img> 처리 (lazy, src/srcset, 속성 정리, 절대경로화) ---
-    for img in soup.find_all("img"):
+    for img in root.iter("img"):
+        attrs = img.attrib
         # (a) lazy 속성 우선순위로 src 승격 (data-org-src가 있으면 가장 우선)
-        src = (img.get("src") or "").strip()
+        src = (attrs.get("src") or "").strip()
         if (not src or src.startswith("data:")):
             for key in LAZY_SRC_KEYS:
-                val = (img.get(key) or "").strip()
+                val = (attrs.get(key) or "").strip()
                 if val:
                     src = val
-                    img["src"] = src
+                    attrs["src"] = src
                     break
 
         # (b) srcset도 lazy 버전이 있으면 옮기기
-        if not img.get("srcset"):
+        if not attrs.get("srcset"):
             for key in LAZY_SRCSET_KEYS:
-                val = (img.get(key) or "").strip()
+                val = (attrs.get(key) or "").strip()
                 if val:
-                    img["srcset"] = val
+                    attrs["srcset"] = val
                     break
 
         # (c) src 절대경로화
         if src and not src.startswith(("http://", "https://", "data:")):
-            img["src"] = urljoin(base_url, src)
+            attrs["src"] = urljoin(base_url, src)
 
         # (d) srcset 내 URL 절대경로화
-        if img.get("srcset"):
+        if attrs.get("srcset"):
             parts = []
-            for cand in img["srcset"].split(","):
+            for cand in attrs["srcset"].split(","):
                 cand = cand.strip()
                 if not cand:
                     continue
@@ -145,28 +187,22 @@ def prepare_html_for_markdown(html_content: str, base_url: str) -> str:
                         u = urljoin(base_url, u)
                     parts.append(u + ((" " + rest) if rest else ""))
             if parts:
-                img["srcset"] = ", ".join(parts)
+                attrs["srcset"] = ", ".join(parts)
 
         # (e) 마크다운 변환에 불필요한 속성 제거
-        attrs_to_remove = [
-            "width", "height", "title", "class", "style", "loading", "decoding",
-            "data-org-width", "data-org-height", "dmcf-mid", "dmcf-mtype",
-            *LAZY_SRC_KEYS, *LAZY_SRCSET_KEYS
-        ]
-        for attr in attrs_to_remove:
-            if attr in img.attrs:
-                del img[attr]
+        for attr in _IMG_ATTRS_TO_REMOVE:
+            attrs.pop(attr, None)
 
     # --- 3) <a> 처리 (href 보정/절대경로화) ---
-    for a in soup.find_all("a"):
+    for a in root.iter("a"):
         href = (a.get("href") or "").strip()
         if not href:
-            a["href"] = base_url
+            a.set("href", base_url)
             continue
         if not href.startswith(("http://", "https://", "mailto:", "tel:", "#")):
-            a["href"] = urljoin(base_url, href)
+            a.set("href", urljoin(base_url, href))
 
-    return str(soup)
+    return lxml_html.tostring(root, encoding="unicode")
 
 def make_img_converter():
 
@@ -211,59 +247,80 @@ def custom_a_converter(*, tag: Tag, text: str, **kwargs) -> str:
 from bs4 import BeautifulSoup, Tag
 from typing import cast
 
-def custom_li_converter(*, tag: Tag, text: str, convert_as_inline: bool = False, **kwargs) -> str:
-    ## 기존 함수인데 가지고 온 bullet과 list_indent_str
-    bullets = kwargs.get("bullets", ("*",))  # ← 튜플이어야 함! ("*",)도 OK
-    list_indent_type = kwargs.get("list_indent_type", "spaces")
-    list_indent_width = kwargs.get("list_indent_width", 4)
-    list_indent_str = kwargs.get(
-        "list_indent_str",
-        "\t" if list_indent_type == "tabs" else " " * list_indent_width
-    )
+def make_li_converter():
+    """<ol> 번호/<ul> 깊이를 문서당 한 번씩만 계산하도록 캐시를 가진 li 변환기.
+    parent.index(tag) 와 조상 전체 순회를 li 마다 반복하면 긴/깊은 목록에서 O(n^2)."""
+    ol_index: dict = {}   # id(ol) → {id(child): 위치}
+    ul_depth: dict = {}   # id(tag) → tag 자신을 포함한 조상 중 <ul> 개수
+    has_checkbox: dict = {}
+
+    def _depth(tag: Tag) -> int:
+        path, t = [], tag
+        while t is not None and id(t) not in ul_depth:
+            path.append(t)
+            t = getattr(t, "parent", None)
+        d = ul_depth[id(t)] if t is not None else 0
+        for node in reversed(path):
+            if getattr(node, "name", None) == "ul":
+                d += 1
+            ul_depth[id(node)] = d
+        return ul_depth[id(tag)]
+
+    def _converter(*, tag: Tag, text: str, convert_as_inline: bool = False, **kwargs) -> str:
+        ## 기존 함수인데 가지고 온 bullet과 list_indent_str
+        bullets = kwargs.get("bullets", ("*",))  # ← 튜플이어야 함! ("*",)도 OK
+        list_indent_type = kwargs.get("list_indent_type", "spaces")
+        list_indent_width = kwargs.get("list_indent_width", 4)
+        list_indent_str = kwargs.get(
+            "list_indent_str",
+            "\t" if list_indent_type == "tabs" else " " * list_indent_width
+        )
+
+        # 문서에 체크박스가 하나도 없으면 li 마다 하위 트리를 뒤지지 않음
+        if "any" not in has_checkbox:
+            root = tag
+            while root.parent is not None:
+                root = root.parent
+            has_checkbox["any"] = root.find("input", {"type": "checkbox"}) is not None
+        checkbox = tag.find("input", {"type": "checkbox"}) if has_checkbox["any"] else None
+        if checkbox and isinstance(checkbox, Tag):
+            checked = checkbox.get("checked") is not None
+            checkbox_symbol = "[x]" if checked else "[ ]"
+            return f"- {checkbox_symbol} {(text or '').strip()}\n"
+
+        parent = tag.parent
+        if parent is not None and parent.name == "ol":
+            start = (
+                int(cast("str", parent.get("start")))
+                if isinstance(parent.get("start"), str) and str(parent.get("start")).isnumeric()
+                else 1
+            )
+            positions = ol_index.get(id(parent))
+            if positions is None:
+                positions = ol_index[id(parent)] = {id(c): i for i, c in enumerate(parent.contents)}
+            bullet = f"{start + positions[id(tag)]}."
+        else:
+            depth = _depth(tag) - 1
+            bullet = bullets[depth % len(bullets)] if bullets else "-"
 
+        has_block_children = "\n\n" in (text or "")
 
-    checkbox = tag.find("input", {"type": "checkbox"})
-    if checkbox and isinstance(checkbox, Tag):
-        checked = checkbox.get("checked") is not None
-        checkbox_symbol = "[x]" if checked else "[ ]"
-        return f"- {checkbox_symbol} {(text or '').strip()}\n"
+        if has_block_children:
+            paragraphs = (text or "").strip().split("\n\n")
 
-    parent = tag.parent
-    if parent is not None and parent.name == "ol":
-        start = (
-            int(cast("str", parent.get("start")))
-            if isinstance(parent.get("start"), str) and str(parent.get("start")).isnumeric()
-            else 1
-        )
-        bullet = f"{start + parent.index(tag)}."
-    else:
-        depth = -1
-        t = tag
-        while t:
-            if getattr(t, "name", None) == "ul":
-                depth += 1
-            if not getattr(t, "parent", None):
-                break
-            t = t.parent
-        bullet = bullets[depth % len(bullets)] if bullets else "-"
-
-    has_block_children = "\n\n" in (text or "")
-
-    if has_block_children:
-        paragraphs = (text or "").strip().split("\n\n")
-        
-        if paragraphs:
-            result_parts = [f"{bullet} {paragraphs[0].strip()}\n"]
-
-            for para in paragraphs[1:]:
-                if para.strip():
-                    for line in para.strip().split("\n"):
-                        line = " ".join(line.split()) ## 바뀐 부분 => 정규화 추가함
-                        if line:
-                            result_parts.append(f"\n{list_indent_str}{line}\n")
-            return "".join(result_parts)
-
-    return f"\n\n{bullet} {' '.join((text or '').split())}\n"
+            if paragraphs:
+                result_parts = [f"{bullet} {paragraphs[0].strip()}\n"]
+
+                for para in paragraphs[1:]:
+                    if para.strip():
+                        for line in para.strip().split("\n"):
+                            line = " ".join(line.split()) ## 바뀐 부분 => 정규화 추가함
+                            if line:
+                                result_parts.append(f"\n{list_indent_str}{line}\n")
+                return "".join(result_parts)
+
+        return f"\n\n{bullet} {' '.join((text or '').split())}\n"
+    return _converter
 
 
 from html_to_markdown import convert_to_markdown 
@@ -292,7 +349,7 @@ def html_to_markdown_with_prep(html: str, url: str) -> str:
         custom_converters={
             "img": make_img_converter(),
             "a": custom_a_converter,
-            "li": custom_li_converter,
+            "li": make_li_converter(),
         },
     )
     md = md.replace('this is a placeholder', '')
@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+import asyncio, sys, threading, time, traceback
+from collections import Counter
+from typing import Optional
+
+class LoopLagMonitor:
+    """이벤트 루프 지연(스케줄링 지연) 감시.
+
+    루프 안의 tick 태스크가 interval 마다 깨어나면서 예정보다 늦은 만큼을 lag 로 기록하고,
+    별도 watchdog 스레드는 tick 이 threshold 넘게 멈추면(루프가 동기 작업에 막힘) 그 순간
+    루프 스레드의 스택을 찍는다. 멈춘 동안에는 루프가 돌지 않으므로 스택은 스레드에서 찍어야 한다.
+    """
+    def __init__(self, threshold_ms: float = 500.0, interval_ms: float = 100.0, stack_limit: int = 12):
+        self.threshold_s = threshold_ms / 1000
+        self.interval_s = interval_ms / 1000
+        self.stack_limit = stack_limit
+        self.heartbeat = time.perf_counter()
+        self.loop_thread: Optional[int] = None
+        self.task: Optional[asyncio.Task] = None
+        self.stop = threading.Event()
+        self.stalled_at: Optional[float] = None  # watchdog 이 보고한 stall 의 heartbeat (한 번만 보고)
+        self.sites: Counter = Counter()  # stall 때 루프가 멈춰 있던 위치 (파일:줄 함수)
+        self.stats = {"ticks": 0, "lag_ms_total": 0.0, "lag_ms_max": 0.0, "stalls": 0}
+
+    @classmethod
+    def from_settings(cls, settings) -> "LoopLagMonitor":
+        return cls(settings.loop_lag_threshold_ms, settings.loop_lag_interval_ms)
+
+    @property
+    def enabled(self) -> bool:
+        return self.threshold_s > 0
+
+    async def _tick(self):
+        while True:
+            t = time.perf_counter()
+            await asyncio.sleep(self.interval_s)
+            now = time.perf_counter()
+            lag = max(0.0, (now - t - self.interval_s) * 1000)
+            self.heartbeat = now
+            st = self.stats
+            st["ticks"] += 1
+            st["lag_ms_total"] += lag
+            if lag > st["lag_ms_max"]:
+                st["lag_ms_max"] = lag
+            if lag >= self.threshold_s * 1000:
+                st["stalls"] += 1
+                print(f"[WARN] event loop stalled {lag:.0f} ms")
+
+    def _watch(self):
+        while not self.stop.wait(self.threshold_s / 4):
+            hb = self.heartbeat
+            if time.perf_counter() - hb < self.threshold_s + self.interval_s or self.stalled_at == hb:
+                continue
+            self.stalled_at = hb
+            frame = sys._current_frames().get(self.loop_thread)
+            if frame is None:
+                continue
+            stack = traceback.extract_stack(frame)[-self.stack_limit:]
+            if stack:
+                top = stack[-1]
+                self.sites[f"{top.filename}:{top.lineno} {top.name}"] += 1
+            print(f"[WARN] event loop blocked > {self.threshold_s * 1000:.0f} ms, loop thread stack:\n"
+                  + "".join(traceback.format_list(stack)).rstrip())
+
+    def start(self):
+        if not self.enabled:
+            return
+        self.loop_thread = threading.get_ident()
+        self.heartbeat = time.perf_counter()
+        self.task = asyncio.create_task(self._tick())
+        threading.Thread(target=self._watch, name="loop-watchdog", daemon=True).start()
+
+    def summary(self) -> str:
+        st = self.stats
+        avg = st["lag_ms_total"] / st["ticks"] if st["ticks"] else 0.0
+        top = ", ".join(f"{site} ×{n}" for site, n in self.sites.most_common(3))
+        return (f"lag_avg={avg:.1f}ms lag_max={st['lag_ms_max']:.0f}ms stalls={st['stalls']}"
+                + (f" sites: {top}" if top else ""))
+
+    async def close(self):
+        if self.task is None:
+            return
+        self.stop.set()
+        self.task.cancel()
+        await asyncio.gather(self.task, return_exceptions=True)
+        print(f"[INFO] event loop: {self.summary()}")
+
+    async def __aenter__(self):
+        self.start()
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
@@ -0,0 +1,226 @@
+# -*- coding: utf-8 -*-
+import asyncio, contextlib, os, threading, time
+from bisect import bisect_left
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+# 단계별 소요 시간 bucket 상한 (ms). Prometheus 로 내보낼 때는 초 단위
+BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000, 60000)
+ALL = "_all"  # origin 과 무관한 관측 (기록 배치 등)
+OTHER = "_other"  # max_origins 를 넘은 origin 은 하나로 묶음 (label 수 제한)
+
+def add_span(timings: dict, name: str, ms: float):
+    spans = timings.setdefault("spans", {})
+    spans[name] = round(spans.get(name, 0) + ms, 1)  # 재시도로 같은 단계를 여러 번 거치면 합산
+
+@contextlib.contextmanager
+def span(timings: dict, name: str):
+    """with span(timings, "goto"): ... → timings["spans"]["goto"] 에 ms 기록 (예외가 나도 기록)"""
+    t = time.perf_counter()
+    try:
+        yield
+    finally:
+        add_span(timings, name, (time.perf_counter() - t) * 1000)
+
+class _Histogram:
+    __slots__ = ("counts", "sum", "n")
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS_MS) + 1)
+        self.sum = 0.0
+        self.n = 0
+
+    def observe(self, ms: float):
+        self.counts[bisect_left(BUCKETS_MS, ms)] += 1
+        self.sum += ms
+        self.n += 1
+
+    def quantile(self, q: float) -> float:
+        # bucket 상한으로 근사 (마지막 bucket 은 최대 상한)
+        rank, acc = q * self.n, 0
+        for i, c in enumerate(self.counts):
+            acc += c
+            if acc >= rank and c:
+                return BUCKETS_MS[min(i, len(BUCKETS_MS) - 1)]
+        return 0.0
+
+def _label(v: str) -> str:
+    return v.replace("\\", "\\\\").replace('"', '\\"').replace("\n", " ")
+
+class Metrics:
+    """프로세스 안 단계별/origin 별 히스토그램 + 카운터 + gauge, Prometheus text 형식으로 내보냄.
+
+    관측은 이벤트 루프와 sink writer 스레드에서, 읽기는 HTTP 스레드에서 일어나므로 lock 으로 보호.
+    gauge 는 값 대신 함수를 등록해 두고 내보낼 때 읽는다 (큐 길이, 유휴 탭 수 등).
+    """
+    def __init__(self, max_origins: int = 100):
+        self.max_origins = max_origins
+        self.hists: Dict[Tuple[str, str], _Histogram] = {}
+        self.counters: Dict[Tuple[str, str], int] = {}
+        self.gauges: Dict[str, Tuple[str, Callable[[], float]]] = {}
+        self.origins = set()
+        self.lock = threading.Lock()
+        self.started = time.time()
+        self.exporter: Optional["MetricsExporter"] = None
+
+    def _origin(self, origin: str) -> str:
+        if origin in self.origins or origin == ALL:
+            return origin
+        if len(self.origins) >= self.max_origins:
+            return OTHER
+        self.origins.add(origin)
+        return origin
+
+    def observe(self, stage: str, ms: float, origin: str = ALL):
+        with self.lock:
+            key = (stage, self._origin(origin))
+            h = self.hists.get(key)
+            if h is None:
+                h = self.hists[key] = _Histogram()
+            h.observe(ms)
+
+    def observe_timings(self, timings: dict, origin: str):
+        """레코드의 timings (spans + total/conditional/fetch) 를 히스토그램에 반영"""
+        for stage, ms in (timings.get("spans") or {}).items():
+            self.observe(stage, ms, origin)
+        for key, stage in (("total_ms", "total"), ("conditional_ms", "conditional"), ("fetch_ms", "http_fetch")):
+            if timings.get(key) is not None:
+                self.observe(stage, timings[key], origin)
+
+    def inc(self, name: str, label: str, n: int = 1):
+        with self.lock:
+            self.counters[(name, label)] = self.counters.get((name, label), 0) + n
+
+    def gauge(self, name: str, help_text: str, fn: Callable[[], float]):
+        self.gauges[name] = (help_text, fn)
+
+    def render(self) -> str:
+        """Prometheus text exposition format (0.0.4)"""
+        out: List[str] = []
+        with self.lock:
+            hists = sorted((k, list(h.counts), h.sum, h.n) for k, h in self.hists.items())
+            counters = sorted(self.counters.items())
+        out.append("# HELP crawler_stage_duration_seconds Time spent per pipeline stage")
+        out.append("# TYPE crawler_stage_duration_seconds histogram")
+        for (stage, origin), counts, total, n in hists:
+            lbl = f'stage="{_label(stage)}",origin="{_label(origin)}"'
+            acc = 0
+            for le, c in zip(BUCKETS_MS, counts):
+                acc += c
+                out.append(f'crawler_stage_duration_seconds_bucket{{{lbl},le="{le / 1000:g}"}} {acc}')
+            out.append(f'crawler_stage_duration_seconds_bucket{{{lbl},le="+Inf"}} {n}')
+            out.append(f"crawler_stage_duration_seconds_sum{{{lbl}}} {total / 1000:.6f}")
+            out.append(f"crawler_stage_duration_seconds_count{{{lbl}}} {n}")
+        names = sorted({name for (name, _), _ in counters})
+        for name in names:
+            out.append(f"# TYPE crawler_{name}_total counter")
+            for (nm, label), v in counters:
+                if nm == name:
+                    out.append(f'crawler_{name}_total{{result="{_label(label)}"}} {v}')
+        for name, (help_text, fn) in sorted(self.gauges.items()):
+            try:
+                v = float(fn())
+            except Exception:
+                continue  # 이미 닫힌 객체 등
+            out.append(f"# HELP crawler_{name} {help_text}")
+            out.append(f"# TYPE crawler_{name} gauge")
+            out.append(f"crawler_{name} {v:g}")
+        out.append("# TYPE crawler_uptime_seconds gauge")
+        out.append(f"crawler_uptime_seconds {time.time() - self.started:.0f}")
+        return "\n".join(out) + "\n"
+
+    def summary(self, top: int = 8) -> str:
+        """origin 을 합친 단계별 p50/p99 (누적 시간이 큰 순)"""
+        merged: Dict[str, _Histogram] = {}
+        with self.lock:
+            for (stage, _), h in self.hists.items():
+                m = merged.setdefault(stage, _Histogram())
+                m.counts = [a + b for a, b in zip(m.counts, h.counts)]
+                m.sum += h.sum
+                m.n += h.n
+        ranked = sorted(((s, h) for s, h in merged.items() if s != "total"), key=lambda x: -x[1].sum)[:top]
+        return ", ".join(f"{s} {h.sum / 1000:.1f}s (p50≤{h.quantile(0.5):g} p99≤{h.quantile(0.99):g}ms)" for s, h in ranked)
+
+    def start(self):
+        if self.exporter:
+            self.exporter.start()
+
+    async def close(self):
+        if self.hists:
+            print(f"[INFO] stage timings: {self.summary()}")
+        if self.exporter:
+            await self.exporter.close()
+
+class MetricsExporter:
+    """Metrics 를 주기적으로 파일에 쓰거나(node_exporter textfile collector 용) 로컬 HTTP 로 제공"""
+    def __init__(self, metrics: Metrics, path: Optional[Path] = None, port: int = 0,
+                 host: str = "127.0.0.1", interval_s: float = 10.0):
+        self.metrics = metrics
+        self.path = Path(path) if path else None
+        self.port = port
+        self.host = host
+        self.interval_s = max(0.5, interval_s)
+        self.server: Optional[ThreadingHTTPServer] = None
+        self.task: Optional[asyncio.Task] = None
+
+    def _write(self):
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        tmp.parent.mkdir(parents=True, exist_ok=True)
+        tmp.write_text(self.metrics.render(), encoding="utf-8")
+        os.replace(tmp, self.path)  # 수집기가 반쯤 쓴 파일을 읽지 않도록
+
+    async def _loop(self):
+        while True:
+            await asyncio.sleep(self.interval_s)
+            try:
+                await asyncio.to_thread(self._write)
+            except Exception as e:
+                print(f"[WARN] metrics write failed: {e}")
+
+    def start(self):
+        if self.port:
+            metrics = self.metrics
+
+            class Handler(BaseHTTPRequestHandler):
+                def do_GET(self):
+                    if self.path.split("?")[0] not in ("/", "/metrics"):
+                        self.send_error(404)
+                        return
+                    body = metrics.render().encode("utf-8")
+                    self.send_response(200)
+                    self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                    self.send_header("Content-Length", str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+
+                def log_message(self, *args):
+                    pass
+
+            try:
+                self.server = ThreadingHTTPServer((self.host, self.port), Handler)
+            except OSError as e:
+                print(f"[WARN] metrics endpoint 를 열 수 없음 ({self.host}:{self.port}): {e}")
+            else:
+                threading.Thread(target=self.server.serve_forever, name="metrics-http", daemon=True).start()
+                print(f"[INFO] metrics: http://{self.host}:{self.port}/metrics")
+        if self.path:
+            self.task = asyncio.create_task(self._loop())
+
+    async def close(self):
+        if self.task:
+            self.task.cancel()
+            await asyncio.gather(self.task, return_exceptions=True)
+            with contextlib.suppress(Exception):
+                await asyncio.to_thread(self._write)  # 마지막 값
+        if self.server:
+            self.server.shutdown()
+            self.server.server_close()
+
+def open_metrics(settings) -> Metrics:
+    """히스토그램은 항상 모으고, --metrics-file / --metrics-port 가 있으면 start() 때 내보내기 시작"""
+    metrics = Metrics(max_origins=settings.metrics_max_origins)
+    if settings.metrics_path or settings.metrics_port:
+        metrics.exporter = MetricsExporter(metrics, settings.metrics_path, settings.metrics_port,
+                                           interval_s=settings.metrics_interval_s)
+    return metrics
@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+import asyncio, contextlib, os, sys, threading, time
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Optional
+from ..io.done_index import url_hash
+
+def _folded(frame) -> str:
+    """스택을 flamegraph.pl / speedscope 가 읽는 collapsed 형식으로 (바깥 → 안쪽)"""
+    names = []
+    while frame is not None:
+        code = frame.f_code
+        names.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+        frame = frame.f_back
+    return ";".join(reversed(names))
+
+class StackSampler:
+    """한 스레드의 스택을 interval 마다 찍어서, 열려 있는 window 들에 collapsed 스택 단위로 센다"""
+    def __init__(self, thread_id: int, interval_s: float):
+        self.thread_id = thread_id
+        self.interval_s = interval_s
+        self.windows: Dict[int, Counter] = {}
+        self.lock = threading.Lock()
+        self.wake = threading.Event()
+        self.stop = False
+        threading.Thread(target=self._run, name="stack-sampler", daemon=True).start()
+
+    def _run(self):
+        while not self.stop:
+            if not self.windows:
+                self.wake.wait()
+                self.wake.clear()
+                continue
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is not None:
+                stack = _folded(frame)
+                with self.lock:
+                    for c in self.windows.values():
+                        c[stack] += 1
+            time.sleep(self.interval_s)
+
+    def open(self, key: int):
+        with self.lock:
+            self.windows[key] = Counter()
+        self.wake.set()
+
+    def close(self, key: int) -> Counter:
+        with self.lock:
+            return self.windows.pop(key, Counter())
+
+    def shutdown(self):
+        self.stop = True
+        self.wake.set()
+
+class StageProfiler:
+    """URL 일부(fraction)만 골라 단계별 프로파일을 남김 (--profile-fraction).
+
+    - capture: 캡처하는 동안 이벤트 루프 스레드 스택 샘플 → <dir>/capture/<hash>.folded
+      (루프는 다른 URL 작업도 같이 돌리므로, 그 URL 이 진행 중일 때 루프가 어디에 시간을 썼는지를 보여줌)
+    - convert: 변환 워커 프로세스에서 cProfile → <dir>/convert/<hash>.prof (pstats / snakeviz 로 확인)
+    <dir>/index.tsv 에 "stage  파일  ms  url" 을 남긴다.
+    URL 해시로 고르므로 같은 URL 은 캡처/변환, 샤드 워커/부모 어디서나 똑같이 선택된다.
+    """
+    def __init__(self, root: Path, fraction: float, sample_ms: float = 5.0):
+        self.root = Path(root)
+        self.fraction = max(0.0, min(1.0, fraction))
+        self.sample_s = max(0.001, sample_ms / 1000)
+        self.sampler: Optional[StackSampler] = None
+        self.lock = threading.Lock()
+        self.count = 0
+
+    @classmethod
+    def from_settings(cls, settings) -> Optional["StageProfiler"]:
+        if settings.profile_fraction <= 0:
+            return None
+        root = settings.profile_dir or settings.out_ok_md.with_name(settings.out_ok_md.name + ".profiles")
+        return cls(root, settings.profile_fraction, settings.profile_sample_ms)
+
+    def sampled(self, url: str) -> bool:
+        return url_hash(url) % 1_000_000 < self.fraction * 1_000_000
+
+    def path(self, stage: str, url: str, ext: str) -> Path:
+        return self.root / stage / f"{url_hash(url):016x}{ext}"
+
+    def record(self, stage: str, path: Path, ms: float, url: str):
+        """index.tsv 에 한 줄 (변환 워커가 남긴 .prof 도 부모에서 여기로 기록)"""
+        with self.lock:
+            self.root.mkdir(parents=True, exist_ok=True)
+            with (self.root / "index.tsv").open("a", encoding="utf-8") as f:
+                f.write(f"{stage}\t{path.relative_to(self.root)}\t{ms:.0f}\t{url}\n")
+            self.count += 1
+
+    def _dump(self, url: str, samples: Counter, ms: float):
+        path = self.path("capture", url, ".folded")
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text("".join(f"{stack} {n}\n" for stack, n in samples.most_common()), encoding="utf-8")
+        self.record("capture", path, ms, url)
+
+    @contextlib.asynccontextmanager
+    async def capture(self, url: str):
+        """샘플 대상 URL 이면 이 블록 동안 루프 스레드 스택을 샘플링 (아니면 아무것도 안 함)"""
+        if not self.sampled(url):
+            yield
+            return
+        if self.sampler is None:
+            self.sampler = StackSampler(threading.get_ident(), self.sample_s)
+        key = id(asyncio.current_task())
+        t0 = time.perf_counter()
+        self.sampler.open(key)
+        try:
+            yield
+        finally:
+            samples = self.sampler.close(key)
+            await asyncio.to_thread(self._dump, url, samples, (time.perf_counter() - t0) * 1000)
+
+    def close(self):
+        if self.sampler:
+            self.sampler.shutdown()
+        if self.count:
+            print(f"[INFO] profiles: {self.count} → {self.root}")
@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+import re
+from collections import Counter
+from hashlib import blake2b
+from typing import List
+
+# markdown 문법/링크 주소는 거의 같은 페이지(인쇄용, 추적 파라미터 변형)끼리도 달라지므로 빼고 본문 단어만
+_MD_LINK_RE = re.compile(r"\]\([^)]*\)")
+_URL_RE = re.compile(r"https?://\S+")
+_WORD_RE = re.compile(r"\w+")
+
+def tokens(markdown: str) -> List[str]:
+    text = _URL_RE.sub(" ", _MD_LINK_RE.sub("]", markdown))
+    return _WORD_RE.findall(text.lower())
+
+# 64 개 비트별 가중치 합을 큰 정수 하나의 32-bit lane 64 개로 한 번에 더함 (비트마다 도는 것보다 훨씬 빠름).
+# _SPREAD[k][b]: 해시의 k 번째 바이트 값 b 를 lane 배치로 펼친 값
+_LANE = 32
+_LANE_MASK = (1 << _LANE) - 1
+_SPREAD = [
+    [sum(((b >> i) & 1) << ((8 * k + i) * _LANE) for i in range(8)) for b in range(256)]
+    for k in range(8)
+]
+
+def simhash64(words: List[str], shingle: int = 3) -> int:
+    """단어 shingle(기본 3-gram) 가중 SimHash. 비슷한 문서일수록 hamming 거리가 작다"""
+    if len(words) < shingle:
+        feats = Counter([" ".join(words)]) if words else Counter()
+    else:
+        feats = Counter(" ".join(words[i:i + shingle]) for i in range(len(words) - shingle + 1))
+    if not feats:
+        return 0
+    s0, s1, s2, s3, s4, s5, s6, s7 = _SPREAD
+    acc = 0
+    total = 0
+    for f, w in feats.items():
+        d = blake2b(f.encode("utf-8"), digest_size=8).digest()
+        acc += w * (s0[d[0]] | s1[d[1]] | s2[d[2]] | s3[d[3]] | s4[d[4]] | s5[d[5]] | s6[d[6]] | s7[d[7]])
+        total += w
+    sig = 0
+    for bit in range(64):
+        if ((acc >> (bit * _LANE)) & _LANE_MASK) * 2 > total:
+            sig |= 1 << bit
+    return sig
+
+def hamming(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
@@ -0,0 +1,162 @@
+# -*- coding: utf-8 -*-
+import asyncio, functools
+import pytest
+from crawler.browser.page_pool import PagePoolEmpty
+from crawler.config import Settings
+from crawler.io.refresh_state import RefreshState
+from crawler.io.urlio import MemoryUrlSource, group_by_origin
+from crawler.pipeline import batches, distributed
+from crawler.pipeline.capture import CapturePipeline
+
+URLS = [f"https://{h}.com/{i}" for h in ("a", "b", "c") for i in range(4)]
+
+class FakePage:
+    def __init__(self):
+        self.closed = False
+
+    def on(self, event, fn):
+        pass
+
+    def set_default_navigation_timeout(self, ms):
+        pass
+
+    def set_default_timeout(self, ms):
+        pass
+
+    def is_closed(self):
+        return self.closed
+
+    async def close(self):
+        self.closed = True
+
+    async def goto(self, url, timeout=None):
+        pass
+
+    async def evaluate(self, js):
+        return 0
+
+class FakeResponse:
+    status = 304
+    headers = {}
+
+    async def dispose(self):
+        pass
+
+class FakeRequest:
+    def __init__(self):
+        self.heads = []
+
+    async def head(self, url, **kw):
+        self.heads.append(url)
+        return FakeResponse()
+
+class FakeContext:
+    def __init__(self):
+        self.fail = False
+        self.request = FakeRequest()
+
+    async def new_page(self):
+        if self.fail:
+            raise RuntimeError("browser has been closed")
+        return FakePage()
+
+def _settings(tmp_path):
+    return Settings(urls_path=tmp_path / "urls.txt", out_ok_html=tmp_path / "ok.html.jsonl",
+                    out_ok_md=tmp_path / "ok.md.jsonl", out_err=tmp_path / "err.jsonl",
+                    headful=False, concurrency=2, prewarm_enable=False, nav_learning=False, jitter_range=(0, 0))
+
+def _crawl(tmp_path, context, state=None):
+    jobs = []
+
+    async def emit(job):
+        jobs.append(job)
+
+    async def main():
+        source = MemoryUrlSource(group_by_origin(URLS))
+        await batches.crawl_source(context, _settings(tmp_path), source, set(), emit, state=state)
+    return jobs, main
+
+async def _capture_ok(self, page, url, retries=2):
+    return "<html></html>", {}, 200, None
+
+def test_capture_exception_writes_err_record(tmp_path, monkeypatch):
+    async def capture(self, page, url, retries=2):
+        if url.endswith("/2"):
+            raise ValueError("boom")
+        return "<html></html>", {}, 200, None
+    monkeypatch.setattr(CapturePipeline, "goto_and_capture", capture)
+    jobs, main = _crawl(tmp_path, FakeContext())
+    asyncio.run(main())
+    assert sorted(j["url"] for j in jobs) == sorted(URLS)
+    errs = {j["url"]: j["error"] for j in jobs if j["error"]}
+    assert sorted(errs) == ["https://a.com/2", "https://b.com/2", "https://c.com/2"]
+    assert all(e.startswith("crawl_failed: ValueError") for e in errs.values())
+
+def test_dead_page_pool_aborts_run(tmp_path, monkeypatch):
+    ctx = FakeContext()
+
+    async def capture(self, page, url, retries=2):
+        ctx.fail = True  # 브라우저가 죽음: 탭이 닫히고 새 탭도 못 만듦
+        page.closed = True
+        return "<html></html>", {}, 200, None
+    monkeypatch.setattr(CapturePipeline, "goto_and_capture", capture)
+    monkeypatch.setattr(batches, "PagePool", functools.partial(batches.PagePool, new_page_backoff_s=0))
+    jobs, main = _crawl(tmp_path, ctx)
+    with pytest.raises(PagePoolEmpty):
+        asyncio.run(main())
+    assert len(jobs) <= 2  # 남은 URL 을 하나씩 실패시키며 돌지 않음
+
+def test_conditional_head_only_for_known_urls(tmp_path, monkeypatch):
+    monkeypatch.setattr(CapturePipeline, "goto_and_capture", _capture_ok)
+    state = RefreshState(tmp_path / "state.sqlite", default_interval_s=0)
+    state.on_flush([{"url": "https://a.com/1", "etag": '"v1"', "content_hash": "h", "change": "new"}])
+    ctx = FakeContext()
+    jobs, main = _crawl(tmp_path, ctx, state)
+    asyncio.run(main())
+    state.close()
+    assert ctx.request.heads == ["https://a.com/1"]  # 처음 보는 URL 은 HEAD 없이 캡처
+    change = {j["url"]: j.get("change") for j in jobs}
+    assert change["https://a.com/1"] == "unchanged" and change["https://b.com/0"] is None
+
+class PassBackend:
+    """lease 회차마다 origin 하나씩 내주고, 회차 사이에는 빈 lease (다른 워커가 잡고 있는 상황)"""
+    def __init__(self):
+        self.passes = [[o] for o in ("https://a.com", "https://b.com", "https://c.com")]
+        self.gap = False
+        self.completed = []
+
+    def lease(self, owner, max_origins, per_origin, ttl):
+        if self.gap or not self.passes:
+            self.gap = False
+            return {}
+        self.gap = True
+        return {o: [u for u in URLS if u.startswith(o + "/")] for o in self.passes.pop(0)}
+
+    def complete(self, owner, items, keep_results=True):
+        self.completed.extend(job["url"] for _, job in items)
+        return {o for o, _ in items}
+
+    def release(self, owner, origins):
+        pass
+
+    def renew(self, owner, origins, ttl):
+        pass
+
+    def finished(self):
+        return not self.passes
+
+def test_leased_passes_reuse_page_pool(tmp_path, monkeypatch):
+    monkeypatch.setattr(CapturePipeline, "goto_and_capture", _capture_ok)
+    pools = []
+
+    class CountingPool(batches.PagePool):
+        def __init__(self, *a, **kw):
+            super().__init__(*a, **kw)
+            pools.append(self)
+    monkeypatch.setattr(batches, "PagePool", CountingPool)
+    sleep = asyncio.sleep
+    monkeypatch.setattr(asyncio, "sleep", lambda s, *a: sleep(min(s, 0.001), *a))
+    backend = PassBackend()
+    asyncio.run(distributed.crawl_leased(FakeContext(), _settings(tmp_path), backend, "w1"))
+    assert sorted(backend.completed) == sorted(URLS)
+    assert len(pools) == 1  # 회차마다 탭 풀을 새로 만들지 않음
@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+import pytest
+from crawler.browser.blocklist import Blocklist, url_host
+from crawler.constants import BLOCK_DOMAINS
+
+@pytest.fixture(scope="module")
+def builtin():
+    return Blocklist.from_sources(BLOCK_DOMAINS)
+
+@pytest.mark.parametrize("domain", BLOCK_DOMAINS)
+def test_builtin_entries_block_domain_and_subdomains(builtin, domain):
+    # 기본 목록은 도메인 규칙: 항목마다 자기 자신과 서브도메인을 막아야 함
+    assert builtin.match(f"https://{domain}/x.js")
+    assert builtin.match(f"https://sub.{domain}/x.js")
+
+@pytest.mark.parametrize("url", [
+    "https://c.amazon-adsystem.com/aax2/apstag.js",
+    "https://securepubads.g.doubleclick.net/tag/js/gpt.js",
+    "https://www.googletagmanager.com/gtm.js?id=GTM-X",
+    "https://connect.facebook.net/en_US/fbevents.js",
+    "https://sb.scorecardresearch.com/beacon.js",
+    "https://tags.tiqcdn.com/utag/x/utag.js",
+])
+def test_builtin_blocks_common_trackers(builtin, url):
+    assert builtin.match(url)
+
+@pytest.mark.parametrize("url", [
+    "https://example.com/",
+    "https://example.com/?ref=doubleclick.net",  # 경로/쿼리의 부분 문자열은 차단하지 않음
+    "https://notfacebook.net/app.js",
+    "https://cdn.example.org/lib/ampproject.js",
+])
+def test_builtin_does_not_block_unrelated(builtin, url):
+    assert not builtin.match(url)
+
+def test_url_host():
+    assert url_host("https://user@a.b.com:8443/x?y#z") == "a.b.com"
+    assert url_host("http://[::1]:80/") == "[::1]"
+    assert url_host("about:blank") == ""
+
+def test_easylist_rules_and_exceptions():
+    bl = Blocklist()
+    bl.add_lines([
+        "! comment",
+        "||ads.example.com^",
+        "||cdn.example.net/banners/*",
+        "/track/pixel.gif|",
+        "@@||ads.example.com/allowed^",
+        "example.org##.ad",              # 요소 숨김: 건너뜀
+        "||x.com^$domain=foo.com",       # 지원하지 않는 옵션: 건너뜀
+        "||y.com^$script,third-party",   # 유형 옵션만: 적용
+        "0.0.0.0 hosts.example.io",
+    ])
+    assert bl.skipped == 2
+    assert bl.match("https://a.ads.example.com/x.js")
+    assert not bl.match("https://ads.example.com/allowed/x.js")
+    assert bl.match("https://img.cdn.example.net/banners/1.png")
+    assert not bl.match("https://img.cdn.example.net/images/1.png")
+    assert bl.match("https://site.com/track/pixel.gif")
+    assert not bl.match("https://site.com/track/pixel.gif?x=1")
+    assert bl.match("https://y.com/a.js")
+    assert bl.match("https://hosts.example.io/")
+    assert not bl.match("https://x.com/")
+
+def test_browser_patterns_only_without_exceptions():
+    bl = Blocklist.from_sources(["a.com", "b.c.com"])
+    assert bl.browser_patterns(10) == ["*://a.com/*", "*://*.a.com/*", "*://b.c.com/*", "*://*.b.c.com/*"]
+    assert bl.browser_patterns(3) == ["*://a.com/*", "*://*.a.com/*"]
+    bl.add_domain("a.com", allow=True)
+    assert bl.browser_patterns(10) == []
@@ -0,0 +1,24 @@
+# -*- coding: utf-8 -*-
+import re
+import pytest
+from bench.clean_html import OPTIONS, SEAM_CASES, clean_html_multipass, fuzz
+from crawler.utils.html import clean_html
+
+_LIVE_SCRIPT = re.compile(r"(?i)<script\b")
+
+@pytest.mark.parametrize("name", sorted(SEAM_CASES))
+def test_tags_formed_by_removal_are_removed(name):
+    html = SEAM_CASES[name]
+    for opt in OPTIONS:
+        out = clean_html(html, **opt)
+        assert not _LIVE_SCRIPT.search(out)
+        assert out == clean_html_multipass(html, **opt)
+
+def test_published_time_meta_and_svg_are_kept():
+    html = '<meta property="article:published_time" content="x"><svg a="1"><path/></svg><script>x</script>'
+    assert clean_html(html) == '<meta property="article:published_time" content="x"><svg a="1"><path/></svg>'
+    assert clean_html(html, clean_svg=True) == \
+        '<meta property="article:published_time" content="x"><svg a="1">this is a placeholder</svg>'
+
+def test_random_documents_reach_fixed_point():
+    assert fuzz(2000, seed=1) == 0
@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+import json, shutil, subprocess
+import pytest
+from crawler.nav.consent import (CONSENT_CLOSE_SELECTORS, CONSENT_LABELS, CONSENT_NEGATIONS, CONSENT_SELECTORS,
+                                 MENU_SELECTORS, _OVERLAY_JS)
+
+# 브라우저 없이 node 로 _OVERLAY_JS 의 버튼 선택만 확인 (가짜 document)
+# texts: 라벨로 찾을 버튼들, present: querySelector 에 걸리는 selector 들
+_HARNESS = """
+const F = %s;
+const [texts, present, args] = JSON.parse(process.argv[1]);
+let clicked = null;
+const el = name => ({ innerText: name, offsetWidth: 1, click() { clicked = name; }, dispatchEvent() {} });
+const els = texts.map(el);
+global.MouseEvent = function () {};
+global.document = { getElementsByTagName: () => [], body: { textContent: '' },
+                    querySelector: sel => present.includes(sel) ? el(sel) : null,
+                    querySelectorAll: () => els };
+global.setTimeout = f => f();
+F(Object.assign({ consent: true, menus: false, consentSelectors: [], closeSelectors: [], menuSelectors: [],
+                  revealSelector: 'x' }, args)).then(() => console.log(JSON.stringify(clicked)));
+"""
+
+def _run(texts, present=(), **args):
+    arg = json.dumps([texts, list(present), args], ensure_ascii=False)
+    out = subprocess.run(["node", "-e", _HARNESS % _OVERLAY_JS, arg], capture_output=True, text=True, check=True)
+    return json.loads(out.stdout)
+
+def _clicked(texts, present=()):
+    return _run(texts, present, consentSelectors=CONSENT_SELECTORS, consentLabels=CONSENT_LABELS,
+                consentNegations=CONSENT_NEGATIONS, closeSelectors=CONSENT_CLOSE_SELECTORS)
+
+pytestmark = pytest.mark.skipif(shutil.which("node") is None, reason="node 없음")
+
+@pytest.mark.parametrize("texts, want", [
+    (["설정", "모두 동의"], "모두 동의"),
+    (["동의하지 않음", "동의합니다"], "동의합니다"),
+    (["미동의", "비동의"], None),
+    (["필수 쿠키만 허용", "전체 허용"], "전체 허용"),
+    (["Disagree", "Do not accept", "Accept all"], "Accept all"),
+    (["Reject all", "Accept only necessary", "I agree"], "I agree"),
+    (["Allowlist settings", "Agreement terms"], None),
+    (["Don't allow", "No thanks"], None),
+    (["accept cookies", "Accept"], "Accept"),  # 정확히 같은 라벨이 우선
+])
+def test_consent_label_matching(texts, want):
+    assert _clicked(texts) == want
+
+def test_close_button_only_without_accept():
+    # OneTrust 닫기 버튼은 동의 없이 배너만 닫으므로 동의 버튼/라벨이 없을 때만 누름
+    close = ".onetrust-close-btn-handler"
+    assert _clicked(["Accept all"], [close]) == "Accept all"
+    assert _clicked([], [close, "#onetrust-accept-btn-handler"]) == "#onetrust-accept-btn-handler"
+    assert _clicked(["Settings"], [close]) == close
+
+def test_menus_skip_plain_collapsed_buttons():
+    # aria-expanded 만 있는 버튼(아코디언/필터 등)은 메뉴 트리거로 보지 않음
+    assert _run([], ["button[aria-expanded='false']"], consent=False, menus=True, menuSelectors=MENU_SELECTORS) is None
+    assert _run([], ["[data-toggle='dropdown']"], consent=False, menus=True,
+                menuSelectors=MENU_SELECTORS) == "[data-toggle='dropdown']"
@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+import asyncio
+from crawler.config import Settings
+from crawler.pipeline import distributed
+
+class RacyBackend:
+    """마지막 complete() 가 fetch_results 와 finished 사이에 커밋되는 상황"""
+    def __init__(self):
+        self.results = []
+        self.acked = []
+
+    def seed(self, items, signature=""):
+        list(items)
+        return True
+
+    def fetch_results(self, limit):
+        out, self.results = self.results[:limit], self.results[limit:]
+        return out
+
+    def ack_results(self, ids):
+        self.acked.extend(ids)
+
+    def finished(self):
+        if not self.acked and not self.results:
+            self.results = [(i, {"url": f"https://a.com/{i}"}) for i in range(300)]
+        return True
+
+    def counts(self):
+        return {}
+
+    def close(self):
+        pass
+
+class FakeDone:
+    def __init__(self):
+        self.urls = set()
+
+    def __contains__(self, url):
+        return url in self.urls
+
+    def add(self, url):
+        self.urls.add(url)
+
+    def on_flush(self, batch):
+        pass
+
+    def close(self):
+        pass
+
+class FakeSink:
+    def add_flush_hook(self, path, fn):
+        pass
+
+    async def close(self):
+        pass
+
+class FakeMetrics:
+    def start(self):
+        pass
+
+    async def close(self):
+        pass
+
+class FakeConvert:
+    submitted = []
+
+    def __init__(self, settings, sink, done, metrics):
+        pass
+
+    async def start(self):
+        pass
+
+    async def submit(self, job):
+        self.submitted.append(job["url"])
+
+    async def close(self):
+        pass
+
+def test_coordinator_drains_results_committed_before_finished(tmp_path, monkeypatch):
+    backend = RacyBackend()
+    monkeypatch.setattr(distributed, "open_done", lambda s: FakeDone())
+    monkeypatch.setattr(distributed, "_open_backend", lambda s: backend)
+    monkeypatch.setattr(distributed, "open_metrics", lambda s: FakeMetrics())
+    monkeypatch.setattr(distributed, "sink_from_settings", lambda s, m: FakeSink())
+    monkeypatch.setattr(distributed, "ConvertStage", FakeConvert)
+    settings = Settings(urls_path=tmp_path / "urls.txt", out_ok_html=tmp_path / "ok.html.jsonl",
+                        out_ok_md=tmp_path / "ok.md.jsonl", out_err=tmp_path / "err.jsonl")
+    asyncio.run(distributed.run_coordinator(settings))
+    assert len(FakeConvert.submitted) == 300 and len(backend.acked) == 300
@@ -0,0 +1,34 @@
+# -*- coding: utf-8 -*-
+import json
+from crawler.io.done_index import DoneIndex
+
+def test_append_compact_and_reopen(tmp_path):
+    path = tmp_path / "ok.done"
+    idx = DoneIndex.open(path, compact_threshold=4)
+    idx.append(["https://a.com/1", "https://a.com/2"])
+    assert "https://a.com/1" in idx and "https://a.com/3" not in idx
+    assert idx.log_path.exists() and not path.exists()
+    idx.append(["https://a.com/3", "https://a.com/4", "https://a.com/2"])  # 임계값 → base 로 병합
+    assert not idx.log_path.exists() and len(idx) == 4
+    idx.append(["https://b.com/1"])
+    idx.close()
+
+    idx = DoneIndex.open(path, compact_threshold=4)
+    assert all(f"https://a.com/{i}" in idx for i in range(1, 5))
+    assert "https://b.com/1" in idx and "https://b.com/2" not in idx
+    idx.close()
+
+def test_pending_until_flushed(tmp_path):
+    idx = DoneIndex.open(tmp_path / "ok.done")
+    idx.add("https://a.com/1")
+    assert "https://a.com/1" in idx and not idx.log_path.exists()
+    idx.on_flush([{"url": "https://a.com/1"}, {"error": "x"}])
+    assert not idx.pending and idx.log_path.exists()
+    idx.close()
+
+def test_rebuild_from_jsonl(tmp_path):
+    out = tmp_path / "ok.jsonl"
+    out.write_text("".join(json.dumps({"url": f"https://a.com/{i}"}) + "\n" for i in range(10)), encoding="utf-8")
+    idx = DoneIndex.rebuild(tmp_path / "ok.done", out)
+    assert len(idx) == 10 and "https://a.com/9" in idx and "https://a.com/10" not in idx
+    idx.close()
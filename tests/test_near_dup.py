@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+import random
+from crawler.io.near_dup import NearDupIndex
+from crawler.utils.simhash import hamming, simhash64, tokens
+
+def _doc(seed, n=400):
+    rnd = random.Random(seed)
+    return [f"w{rnd.randrange(5000)}" for _ in range(n)]
+
+def test_tokens_drop_markdown_links():
+    assert tokens("[Home](https://x.com/?utm=1) Hello, World https://y.com/a") == ["home", "hello", "world"]
+
+def test_simhash_distance_tracks_similarity():
+    base = _doc(1)
+    edited = base[:200] + ["changed"] + base[201:]
+    assert simhash64(base) == simhash64(list(base))
+    assert hamming(simhash64(base), simhash64(edited)) <= 3
+    assert hamming(simhash64(base), simhash64(_doc(2))) > 10
+    assert simhash64([]) == 0
+
+def test_near_dup_index_and_reopen(tmp_path):
+    path = tmp_path / "ok.simhash"
+    base = simhash64(_doc(1))
+    idx = NearDupIndex.open(path, threshold=3)
+    assert idx.check_and_add(base, "https://a.com/1") is None
+    assert idx.check_and_add(base ^ 0b101, "https://a.com/print/1") == ("https://a.com/1", 2)
+    assert idx.check_and_add(base, "https://a.com/1") is None  # 같은 URL, 같은 문서 → 다시 쓰지 않음
+    assert idx.check_and_add(base ^ 0xFF, "https://b.com/") is None  # 거리 8 → 별개 문서
+    assert len(idx.sigs) == 2
+    idx.close()
+
+    idx = NearDupIndex.open(path, threshold=3)
+    assert idx.check_and_add(base ^ (1 << 63), "https://c.com/") == ("https://a.com/1", 1)
+    assert len(idx.sigs) == 2 and idx.live == 2
+    idx.close()
+
+def test_changed_url_replaces_its_old_signature(tmp_path):
+    path = tmp_path / "ok.simhash"
+    old, new = simhash64(_doc(1)), simhash64(_doc(2))
+    idx = NearDupIndex.open(path, threshold=3)
+    idx.check_and_add(old, "https://a.com/1")
+    assert idx.check_and_add(new, "https://a.com/1") is None  # 페이지가 바뀜 → 새 서명으로 교체
+    assert idx.check_and_add(old, "https://b.com/") is None   # 이전 서명은 더 이상 대표가 아님
+    assert idx.check_and_add(new ^ 1, "https://c.com/") == ("https://a.com/1", 1)
+    idx.close()
+
+    idx = NearDupIndex.open(path, threshold=3)
+    assert idx.live == 2
+    assert idx.check_and_add(old ^ 1, "https://d.com/") == ("https://b.com/", 1)
+    idx.close()
+
+def test_url_slots_grow(tmp_path):
+    idx = NearDupIndex(tmp_path / "x", threshold=0)
+    for i in range(3000):
+        idx._insert(i * 0x9E3779B97F4A7C15 & (1 << 64) - 1, i, 0)
+    assert idx.live == 3000 and len(idx.slots) >= 6000
+    assert all(idx.slots[idx._slot(i)] == i for i in range(0, 3000, 7))
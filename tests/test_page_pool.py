@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+import asyncio
+import pytest
+from crawler.browser.page_pool import PagePool, PagePoolEmpty
+
+class FakePage:
+    def __init__(self):
+        self.closed = False
+
+    def on(self, event, fn):
+        pass
+
+    def set_default_navigation_timeout(self, ms):
+        pass
+
+    def set_default_timeout(self, ms):
+        pass
+
+    def is_closed(self):
+        return self.closed
+
+    async def close(self):
+        self.closed = True
+
+    async def goto(self, url, timeout=None):
+        if self.closed:
+            raise RuntimeError("closed")
+
+    async def evaluate(self, js):
+        return 0
+
+class FakeContext:
+    def __init__(self):
+        self.fail = 0  # 남은 new_page 실패 횟수 (-1 이면 계속 실패)
+        self.created = 0
+
+    async def new_page(self):
+        if self.fail:
+            if self.fail > 0:
+                self.fail -= 1
+            raise RuntimeError("context closed")
+        self.created += 1
+        return FakePage()
+
+def _pool(ctx, size=2):
+    return PagePool(ctx, size=size, new_page_attempts=3, new_page_backoff_s=0)
+
+def test_new_page_is_retried():
+    async def main():
+        ctx = FakeContext()
+        pool = _pool(ctx)
+        await pool.init()
+        page = await pool.acquire()
+        page.closed = True
+        ctx.fail = 2  # 두 번 실패 후 성공
+        await pool.release(page)
+        await asyncio.gather(*pool.resets)
+        assert pool.live == 2 and pool.pool.qsize() == 2
+        await pool.close()
+    asyncio.run(main())
+
+def test_acquire_raises_when_pool_is_gone():
+    async def main():
+        ctx = FakeContext()
+        pool = _pool(ctx)
+        await pool.init()
+        a, b = await pool.acquire(), await pool.acquire()
+        waiter = asyncio.create_task(pool.acquire())
+        await asyncio.sleep(0)
+        ctx.fail = -1
+        for p in (a, b):
+            p.closed = True
+            await pool.release(p)
+        await asyncio.gather(*pool.resets)
+        assert pool.live == 0
+        with pytest.raises(PagePoolEmpty):
+            await asyncio.wait_for(waiter, 1)  # 기다리던 쪽도 막히지 않고 실패
+        with pytest.raises(PagePoolEmpty):
+            await pool.acquire()
+        await pool.close()
+    asyncio.run(main())
+
+def test_init_fails_without_any_page():
+    ctx = FakeContext()
+    ctx.fail = -1
+    with pytest.raises(PagePoolEmpty):
+        asyncio.run(_pool(ctx).init())
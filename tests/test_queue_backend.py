@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+import pytest
+from crawler.io.queue_backend import ATTEMPTS_EXHAUSTED, SqliteQueue, open_queue_backend
+
+ITEMS = [(o, f"{o}/{i}") for o in ("https://a.com", "https://b.com", "https://c.com") for i in range(3)]
+
+@pytest.fixture
+def q(tmp_path):
+    q = SqliteQueue(tmp_path / "q.sqlite", max_attempts=2)
+    q.seed(ITEMS, "sig")
+    yield q
+    q.close()
+
+def _done(q, owner, leased):
+    return q.complete(owner, [(o, {"url": u}) for o, us in leased.items() for u in us])
+
+def test_seed_is_skipped_for_same_signature(q):
+    assert not q.seed(ITEMS, "sig")
+    assert q.counts()["pending"] == len(ITEMS)
+
+def test_origin_is_leased_to_one_owner(q):
+    a = q.lease("w1", 2, 10, 60)
+    b = q.lease("w2", 5, 10, 60)
+    assert len(a) == 2 and len(b) == 1 and not set(a) & set(b)
+    assert q.lease("w3", 5, 10, 60) == {}
+    assert _done(q, "w1", a) == set(a)
+    assert _done(q, "w2", b) == set(b)
+    assert q.finished()
+    got = [job["url"] for _, job in q.fetch_results(100)]
+    assert sorted(got) == sorted(u for _, u in ITEMS)
+
+def test_large_origin_is_leased_again_after_complete(q):
+    first = q.lease("w1", 1, 2, 60)
+    (origin, urls), = first.items()
+    assert len(urls) == 2
+    assert q.lease("w2", 5, 2, 60).keys().isdisjoint({origin})
+    _done(q, "w1", first)
+    again = q.lease("w1", 1, 2, 60)
+    assert list(again) == [origin] and len(again[origin]) == 1
+
+def test_expired_lease_is_requeued_then_failed(q):
+    first = q.lease("w1", 3, 10, -1)  # 이미 만료된 lease
+    assert q.requeue_expired() == len(ITEMS)
+    second = q.lease("w2", 3, 10, -1)
+    assert sorted(second) == sorted(first)
+    q.requeue_expired()  # max_attempts=2 → 실패 처리
+    assert q.counts()["failed"] == len(ITEMS) and q.finished()
+    assert q.complete("w2", [(o, {"url": u}) for o, u in ITEMS]) == set()  # 만료된 lease 의 결과는 버림
+    # 실패한 URL 마다 error 결과 하나 (coordinator 가 err 레코드로 기록)
+    jobs = [job for _, job in q.fetch_results(100)]
+    assert sorted(j["url"] for j in jobs) == sorted(u for _, u in ITEMS)
+    assert {j["error"] for j in jobs} == {ATTEMPTS_EXHAUSTED} and all(j["html"] is None for j in jobs)
+
+def test_release_after_max_attempts_records_error(q):
+    q.release("w1", list(q.lease("w1", 5, 10, 60)))
+    assert q.fetch_results(100) == []  # 아직 시도 횟수가 남음
+    q.release("w2", list(q.lease("w2", 5, 10, 60)))
+    assert q.counts()["failed"] == len(ITEMS) and q.lease("w3", 5, 10, 60) == {}
+    assert sorted(job["url"] for _, job in q.fetch_results(100)) == sorted(u for _, u in ITEMS)
+
+def test_release_and_requeue_missing(q):
+    leased = q.lease("w1", 3, 10, 60)
+    q.release("w1", list(leased))
+    assert q.counts()["pending"] == len(ITEMS)
+    _done(q, "w2", q.lease("w2", 3, 10, 60))
+    q.ack_results([i for i, _ in q.fetch_results(100)])
+    written = {u for _, u in ITEMS[:4]}
+    assert q.requeue_missing(written) == len(ITEMS) - 4
+    assert not q.finished()
+    assert sum(len(v) for v in q.lease("w3", 3, 10, 60).values()) == len(ITEMS) - 4
+
+def test_open_queue_backend(tmp_path):
+    q = open_queue_backend(f"sqlite://{tmp_path / 'x.sqlite'}")
+    assert isinstance(q, SqliteQueue)
+    q.close()
+    with pytest.raises(ValueError):
+        open_queue_backend("redis://localhost")
@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+import json, os
+from crawler.io.reader import OutputReader
+
+def _write(path, recs, mode="w"):
+    with open(path, mode, encoding="utf-8") as f:
+        for r in recs:
+            f.write(json.dumps(r, ensure_ascii=False) + "\n")
+
+def test_empty_output_has_no_entries(tmp_path):
+    path = tmp_path / "ok.jsonl"
+    path.write_bytes(b"")
+    with OutputReader(path) as r:
+        assert len(r) == 0
+        assert r.get("https://a.com/") is None
+        assert list(r.iter_origin("https://a.com")) == []
+        assert list(r.iter_raw()) == []
+    with OutputReader(path) as r:  # 이미 만든 인덱스로 다시 열기
+        assert len(r) == 0
+
+def test_empty_index_file_is_rebuilt(tmp_path):
+    path = tmp_path / "ok.jsonl"
+    _write(path, [{"url": "https://a.com/1", "markdown": "x"}])
+    (tmp_path / "ok.jsonl.ridx").write_bytes(b"")
+    with OutputReader(path) as r:
+        assert len(r) == 1 and r.get("https://a.com/1")["markdown"] == "x"
+
+def test_get_and_iter_origin_keep_record_order(tmp_path):
+    path = tmp_path / "ok.jsonl"
+    recs = [{"url": f"https://{h}.com/{i}", "markdown": f"{h}{i}"} for i in range(50) for h in ("a", "b")]
+    recs.append({"url": "https://a.com/3", "markdown": "again"})  # 같은 URL 은 마지막 레코드
+    _write(path, recs)
+    with OutputReader(path) as r:
+        assert len(r) == len(recs)
+        assert r.get("https://a.com/3")["markdown"] == "again"
+        assert r.get("https://b.com/7")["markdown"] == "b7"
+        assert r.get("https://c.com/") is None
+        got = [rec["markdown"] for rec in r.iter_origin("https://a.com")]
+        assert got == [f"a{i}" for i in range(50)] + ["again"]
+        assert b"".join(r.iter_raw()) == path.read_bytes()
+
+def test_index_is_rebuilt_after_append(tmp_path):
+    path = tmp_path / "ok.jsonl"
+    _write(path, [{"url": "https://a.com/1"}])
+    with OutputReader(path) as r:
+        assert r.get("https://a.com/2") is None
+    _write(path, [{"url": "https://a.com/2"}], mode="a")
+    st = path.stat()
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+    with OutputReader(path) as r:
+        assert len(r) == 2 and r.get("https://a.com/2") == {"url": "https://a.com/2"}
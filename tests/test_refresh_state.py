@@ -0,0 +1,35 @@
+# -*- coding: utf-8 -*-
+import time
+from crawler.io.refresh_state import RefreshState
+
+def test_readonly_opens_paths_with_uri_characters(tmp_path):
+    path = tmp_path / "run ?a=1#x" / "ok.state.sqlite"
+    st = RefreshState(path)
+    st.on_flush([{"url": "https://a.com/", "etag": '"v1"', "content_hash": "h", "change": "new"}])
+    st.close()
+    ro = RefreshState(path, readonly=True)
+    assert ro.get("https://a.com/").etag == '"v1"' and "https://a.com/" in ro
+    ro.close()
+
+def test_interval_lookup_and_pending(tmp_path):
+    st = RefreshState(tmp_path / "s.sqlite", default_interval_s=1000,
+                      intervals={"https://news.com": 0, "https://a.com/fast": 0})
+    st.on_flush([{"url": u} for u in ("https://a.com/slow", "https://a.com/fast", "https://news.com/1")])
+    assert "https://a.com/slow" in st
+    assert "https://a.com/fast" not in st and "https://news.com/1" not in st
+    st.add("https://b.com/")
+    assert "https://b.com/" in st and st.get("https://b.com/") is None
+    assert st.get("https://a.com/slow").checked_at <= time.time()
+    st.close()
+
+def test_error_records_do_not_advance_checked_at(tmp_path):
+    st = RefreshState(tmp_path / "s.sqlite", default_interval_s=1000)
+    st.on_flush([{"url": "https://a.com/1", "etag": '"v1"', "change": "new"}])
+    before = st.get("https://a.com/1")
+    st.add("https://a.com/1")
+    st.add("https://a.com/2")
+    st.on_flush([{"url": "https://a.com/1", "error": "timeout"}, {"url": "https://a.com/2", "error": "timeout"}])
+    assert not st.pending
+    assert st.get("https://a.com/1") == before
+    assert st.get("https://a.com/2") is None and "https://a.com/2" not in st  # 다음 실행에서 다시 시도
+    st.close()
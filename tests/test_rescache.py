@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+from crawler.browser.rescache import ResourceCache
+
+JS = {"content-type": "text/javascript", "cache-control": "max-age=600"}
+CORS_JS = {**JS, "Access-Control-Allow-Origin": "https://a.com", "Access-Control-Allow-Credentials": "true"}
+
+def _sum(cache):
+    return cache.db.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+
+def test_running_total_and_lru_eviction(tmp_path):
+    cache = ResourceCache(tmp_path / "c", max_bytes=1000)
+    for i in range(5):
+        assert cache.store(f"https://cdn.com/{i}.js", JS, bytes([i]) * 90)
+    cache.store("https://cdn.com/0.js", JS, b"x" * 50)  # 교체: 이전 크기는 빠짐
+    assert cache.total_bytes() == _sum(cache) == 4 * 90 + 50
+    cache.lookup("https://cdn.com/1.js")  # 최근 사용 → 남음
+    for i in range(5, 12):
+        cache.store(f"https://cdn.com/{i}.js", JS, bytes([i]) * 90)
+    assert cache.total_bytes() == _sum(cache) <= 1000
+    assert cache.lookup("https://cdn.com/1.js") is not None
+    assert cache.lookup("https://cdn.com/2.js") is None
+    assert cache.stats["evicted"] > 0
+    cache.close()
+
+    reopened = ResourceCache(tmp_path / "c", max_bytes=1000)
+    assert reopened.total_bytes() == _sum(reopened)
+    reopened.close()
+
+def test_cors_headers_are_kept_per_origin(tmp_path):
+    cache = ResourceCache(tmp_path / "c")
+    url = "https://cdn.com/m.js"
+    cache.store(url, CORS_JS, b"export{}", origin="https://a.com")
+    cache.store(url, CORS_JS, b"export{}")  # no-cors 요청: CORS 헤더 없이 공유
+    assert cache.lookup(url, "https://a.com").headers["access-control-allow-origin"] == "https://a.com"
+    assert cache.lookup(url, "https://b.com") is None
+    assert "access-control-allow-origin" not in cache.lookup(url).headers
+    assert cache.total_bytes() == 16
+    cache.close()
+
+def test_warm_from_other_cache(tmp_path):
+    old = ResourceCache(tmp_path / "run ?1#")
+    old.store("https://cdn.com/a.js", JS, b"a" * 10)
+    old.close()
+    cache = ResourceCache(tmp_path / "c")
+    assert cache.warm_from(tmp_path / "run ?1#") == 1
+    assert cache.lookup("https://cdn.com/a.js").body == b"a" * 10 and cache.total_bytes() == 10
+    cache.close()
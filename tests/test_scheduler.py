@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+import asyncio
+import pytest
+from crawler.pipeline.scheduler import OriginScheduler
+
+URLS = {o: [f"{o}/{i}" for i in range(3)] for o in ("a", "b", "c", "d", "e", "f")}
+
+async def _drain(sched, hold=0.0):
+    """worker 3 개로 작업을 모두 꺼내며 origin 별 동시 작업 수의 최대값을 기록"""
+    done, peak, running = [], {}, {}
+
+    async def worker():
+        while True:
+            job = await sched.next_job()
+            if job is None:
+                return
+            o, u = job
+            running[o] = running.get(o, 0) + 1
+            peak[o] = max(peak.get(o, 0), running[o])
+            await asyncio.sleep(hold)
+            running[o] -= 1
+            done.append(u)
+            await sched.task_done(o)
+
+    await asyncio.gather(*(worker() for _ in range(3)))
+    return done, peak
+
+def _sched(origins, **kw):
+    kw.setdefault("origin_concurrency", 1)
+    kw.setdefault("max_active_origins", 2)
+    return OriginScheduler(origins, lambda o: iter(URLS[o]), **kw)
+
+def test_all_urls_once_within_origin_concurrency():
+    async def main():
+        sched = _sched(list(URLS), origin_concurrency=2)
+        sched.start()
+        done, peak = await _drain(sched, hold=0.001)
+        await sched.close()
+        return done, peak
+    done, peak = asyncio.run(main())
+    assert sorted(done) == sorted(u for us in URLS.values() for u in us)
+    assert max(peak.values()) <= 2
+
+def test_async_origin_source():
+    async def origins():
+        for o in ("a", "b", "c"):
+            await asyncio.sleep(0)
+            yield o
+
+    async def main():
+        sched = _sched(origins())
+        sched.start()
+        done, _ = await _drain(sched)
+        await sched.close()
+        return done
+    assert sorted(asyncio.run(main())) == sorted(URLS["a"] + URLS["b"] + URLS["c"])
+
+def test_deferred_origin_waits_for_add_origin():
+    async def admit(batch):
+        return [o for o in batch if o != "b"]
+
+    async def main():
+        sched = _sched(["a", "b", "c"], admit=admit)
+        sched.start()
+        drain = asyncio.create_task(_drain(sched))
+        await asyncio.sleep(0.05)
+        assert not drain.done()  # 보류 중인 origin 이 있으면 끝나지 않음
+        await sched.add_origin("b")
+        done, _ = await drain
+        await sched.close()
+        return done
+    assert sorted(asyncio.run(main())) == sorted(URLS["a"] + URLS["b"] + URLS["c"])
+
+def test_admit_failure_skips_only_failing_origin():
+    # admit 이 예외를 내도 나머지 origin 은 계속 배정되고, 실패한 origin 은 on_error 로 넘어감
+    failed = []
+
+    async def admit(batch):
+        if "c" in batch:
+            raise RuntimeError("new_page failed")
+        return batch
+
+    async def on_error(origin, exc):
+        failed.append(origin)
+
+    async def main():
+        sched = _sched(list(URLS), admit=admit, on_error=on_error)
+        sched.start()
+        done, _ = await _drain(sched)
+        await sched.close()
+        return done
+    done = asyncio.run(main())
+    assert failed == ["c"]
+    assert sorted(done) == sorted(u for o, us in URLS.items() if o != "c" for u in us)
+
+def test_origin_source_error_is_raised_from_close():
+    def origins():
+        yield "a"
+        raise OSError("urls file gone")
+
+    async def main():
+        sched = _sched(origins(), max_active_origins=1)
+        sched.start()
+        done, _ = await _drain(sched)
+        assert done == URLS["a"]  # 이미 배정된 origin 은 마저 끝남
+        await sched.close()
+    with pytest.raises(OSError):
+        asyncio.run(main())
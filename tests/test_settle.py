@@ -0,0 +1,48 @@
+# -*- coding: utf-8 -*-
+import asyncio
+from crawler.nav.settle import InflightTracker
+
+class FakeRequest:
+    def __init__(self, resource_type):
+        self.resource_type = resource_type
+
+class FakeEmitter:
+    def __init__(self):
+        self.handlers = {}
+
+    def on(self, event, fn):
+        self.handlers.setdefault(event, []).append(fn)
+
+    def emit(self, event, arg):
+        for fn in self.handlers.get(event, ()):
+            fn(arg)
+
+class FakeContext(FakeEmitter):
+    def __init__(self):
+        super().__init__()
+        self.pages = []
+        self.bindings = {}
+
+    async def expose_binding(self, name, fn):
+        self.bindings[name] = fn
+
+def test_inflight_counts_fetch_and_xhr_per_page():
+    ctx = FakeContext()
+    tracker = InflightTracker()
+    asyncio.run(tracker.install(ctx))
+    page, other = FakeEmitter(), FakeEmitter()
+    ctx.emit("page", page)
+    ctx.emit("page", other)
+    read = lambda p: ctx.bindings["__h2mInflight"]({"page": p})
+
+    xhr, fetch, img = FakeRequest("xhr"), FakeRequest("fetch"), FakeRequest("image")
+    for r in (xhr, fetch, img):
+        page.emit("request", r)
+    assert read(page) == 2 and read(other) == 0
+    page.emit("requestfinished", xhr)
+    page.emit("requestfinished", xhr)  # 중복 이벤트에도 음수가 되지 않음
+    page.emit("requestfailed", fetch)
+    page.emit("requestfinished", img)
+    assert read(page) == 0
+    page.emit("close", page)
+    assert page not in tracker.pending